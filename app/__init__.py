@@ -3,6 +3,7 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager, current_user, logout_user
 from flask_migrate import Migrate
 import os
+import time
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 try:
@@ -16,140 +17,8 @@ db = SQLAlchemy()
 login_manager = LoginManager()
 migrate = Migrate()
 
-def _migrate_password_hash_column():
-    """Migrate password_hash column from varchar(128) to varchar(256) if needed"""
-    try:
-        from sqlalchemy import text
-        
-        # Check if using PostgreSQL
-        db_uri = db.engine.url
-        if 'postgresql' in str(db_uri):
-            # PostgreSQL: Use ALTER TABLE
-            with db.engine.connect() as conn:
-                # Check current column type
-                result = conn.execute(text("""
-                    SELECT character_maximum_length 
-                    FROM information_schema.columns 
-                    WHERE table_name = 'user' 
-                    AND column_name = 'password_hash'
-                """))
-                row = result.fetchone()
-                
-                if row and row[0] == 128:
-                    print("Migrating password_hash column from varchar(128) to varchar(256)...")
-                    conn.execute(text("ALTER TABLE \"user\" ALTER COLUMN password_hash TYPE VARCHAR(256)"))
-                    conn.commit()
-                    print("✓ Successfully migrated password_hash column to VARCHAR(256)")
-                elif row and row[0] == 256:
-                    pass  # Already correct, no action needed
-        # SQLite doesn't need migration as it doesn't enforce length constraints
-    except Exception as e:
-        # Silently fail - migration is optional and might fail if column doesn't exist yet
-        pass
-
-
-def _migrate_user_active_account_column():
-    """Compatibility migration: add user.is_active_account if missing."""
-    try:
-        from sqlalchemy import inspect, text
-
-        inspector = inspect(db.engine)
-        if 'user' not in inspector.get_table_names():
-            return
-
-        cols = {c['name'] for c in inspector.get_columns('user')}
-        if 'is_active_account' in cols:
-            return
-
-        db_uri = str(db.engine.url)
-        with db.engine.connect() as conn:
-            if 'postgresql' in db_uri:
-                conn.execute(
-                    text('ALTER TABLE "user" ADD COLUMN is_active_account BOOLEAN NOT NULL DEFAULT TRUE')
-                )
-            else:
-                # SQLite and others
-                conn.execute(
-                    text('ALTER TABLE "user" ADD COLUMN is_active_account BOOLEAN NOT NULL DEFAULT 1')
-                )
-            conn.commit()
-    except Exception:
-        # Keep startup resilient; proper Alembic migration still exists.
-        pass
-
-
-def _migrate_event_target_audience_column():
-    """Compatibility migration: add event.target_audience if missing."""
-    try:
-        from sqlalchemy import inspect, text
-
-        inspector = inspect(db.engine)
-        if 'event' not in inspector.get_table_names():
-            return
-
-        cols = {c['name'] for c in inspector.get_columns('event')}
-        if 'target_audience' in cols:
-            return
-
-        db_uri = str(db.engine.url)
-        with db.engine.connect() as conn:
-            if 'postgresql' in db_uri:
-                conn.execute(
-                    text("ALTER TABLE event ADD COLUMN target_audience VARCHAR(20) NOT NULL DEFAULT 'everyone'")
-                )
-            else:
-                conn.execute(
-                    text("ALTER TABLE event ADD COLUMN target_audience VARCHAR(20) NOT NULL DEFAULT 'everyone'")
-                )
-            conn.commit()
-    except Exception:
-        pass
-
-
-def _migrate_rsvp_attendee_fields():
-    """Compatibility migration: add RSVP attendee fields if missing."""
-    try:
-        from sqlalchemy import inspect, text
-
-        inspector = inspect(db.engine)
-        if 'rsvp' not in inspector.get_table_names():
-            return
-        cols = {c['name'] for c in inspector.get_columns('rsvp')}
-        with db.engine.connect() as conn:
-            if 'attendee_type' not in cols:
-                conn.execute(text("ALTER TABLE rsvp ADD COLUMN attendee_type VARCHAR(20)"))
-            if 'study_field' not in cols:
-                conn.execute(text("ALTER TABLE rsvp ADD COLUMN study_field VARCHAR(100)"))
-            if 'study_year' not in cols:
-                conn.execute(text("ALTER TABLE rsvp ADD COLUMN study_year VARCHAR(20)"))
-            if 'non_student_role' not in cols:
-                conn.execute(text("ALTER TABLE rsvp ADD COLUMN non_student_role VARCHAR(30)"))
-            conn.commit()
-    except Exception:
-        pass
-
-
-def _migrate_competition_enrollment_notice_fields():
-    """Compatibility migration: add competition enrollment notice fields if missing."""
-    try:
-        from sqlalchemy import inspect, text
-
-        inspector = inspect(db.engine)
-        if 'competition_enrollment' not in inspector.get_table_names():
-            return
-        cols = {c['name'] for c in inspector.get_columns('competition_enrollment')}
-        with db.engine.connect() as conn:
-            if 'admin_notice' not in cols:
-                conn.execute(text("ALTER TABLE competition_enrollment ADD COLUMN admin_notice TEXT"))
-            if 'admin_notice_by' not in cols:
-                conn.execute(text("ALTER TABLE competition_enrollment ADD COLUMN admin_notice_by INTEGER"))
-            if 'admin_notice_at' not in cols:
-                conn.execute(text("ALTER TABLE competition_enrollment ADD COLUMN admin_notice_at DATETIME"))
-            conn.commit()
-    except Exception:
-        pass
-
 def create_app():
+    boot_started = time.perf_counter()
     app = Flask(__name__)
     
     # Configuration
@@ -158,6 +27,8 @@ def create_app():
     
     app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL') or 'sqlite:///digital_club_01.db'
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    from app.database import engine_options, connection_budget, configure_sqlite
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
     app.config['UPLOAD_FOLDER'] = os.path.join(app.root_path, 'static', 'uploads')
     app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
     app.config['TURNSTILE_SITE_KEY'] = os.environ.get('TURNSTILE_SITE_KEY', '')
@@ -179,17 +50,21 @@ def create_app():
     
     # Initialize extensions
     db.init_app(app)
+    with app.app_context():
+        if configure_sqlite(db.engine):
+            print(f"[boot] SQLite tuned for concurrent workers (WAL, busy_timeout) (pid {os.getpid()})")
+    per_process, workers, total = connection_budget(app.config['SQLALCHEMY_ENGINE_OPTIONS'])
+    if total is not None:
+        print(f"[boot] DB pool: {per_process} connections per process x {workers} workers = "
+              f"up to {total} server connections (pid {os.getpid()})")
     login_manager.init_app(app)
-    migrate.init_app(app, db)
+    from app.search import include_object
+    migrate.init_app(app, db, include_object=include_object)
     
     # Do not auto-create tables here; schema changes must go through Alembic migrations.
-    with app.app_context():
-        # Keep this compatibility migration for existing databases.
-        _migrate_password_hash_column()
-        _migrate_user_active_account_column()
-        _migrate_event_target_audience_column()
-        _migrate_rsvp_attendee_fields()
-        _migrate_competition_enrollment_notice_fields()
+    # Compatibility migrations for existing databases run once per deployment, under a lock.
+    from app.schema_boot import reconcile_schema
+    reconcile_schema(app)
     
     # Configure login manager
     login_manager.login_view = 'auth.login'
@@ -203,29 +78,16 @@ def create_app():
     os.makedirs(os.path.join(app.config['UPLOAD_FOLDER'], 'digital_ids'), exist_ok=True)
     os.makedirs(os.path.join(app.config['UPLOAD_FOLDER'], 'competitions'), exist_ok=True)
 
+    # Sampled request profiles (registered first so they cover the other hooks)
+    from app import profiling
+    profiling.init_app(app)
+    
     @app.context_processor
     def inject_guards():
-        try:
-            from app.models import CompetitionGuard
-            all_guards = CompetitionGuard.query.order_by(
-                CompetitionGuard.created_at.desc(),
-                CompetitionGuard.id.desc()
-            ).all()
-            # Keep the latest guard per level so widget always shows current champions by level.
-            seen_levels = set()
-            guards = []
-            for g in all_guards:
-                if g.level in seen_levels:
-                    continue
-                guards.append(g)
-                seen_levels.add(g.level)
-                if len(guards) >= 3:
-                    break
-            guards.sort(key=lambda item: item.level)
-        except Exception:
-            db.session.rollback()
-            guards = []
-        return {'guards_week': guards, 'current_year': datetime.now().year}
+        from werkzeug.local import LocalProxy
+        from app.guards import get_current_guards
+        # Evaluated only when a template actually reads guards_week
+        return {'guards_week': LocalProxy(get_current_guards), 'current_year': datetime.now().year}
 
     @app.before_request
     def enforce_active_accounts():
@@ -245,34 +107,31 @@ def create_app():
             return
         if not (request.path.startswith('/admin') or request.path.startswith('/member')):
             return
-        try:
-            from app.models import DailyActiveUser
-            local_date = datetime.utcnow().date()
-            now_utc = datetime.utcnow()
-            entry = DailyActiveUser.query.filter_by(
-                user_id=current_user.id,
-                activity_date=local_date
-            ).first()
-            if entry:
-                entry.last_seen_at = now_utc
-            else:
-                entry = DailyActiveUser(
-                    user_id=current_user.id,
-                    activity_date=local_date,
-                    first_seen_at=now_utc,
-                    last_seen_at=now_utc
-                )
-                db.session.add(entry)
-            db.session.commit()
-        except Exception:
-            db.session.rollback()
+        from app.activity import activity_tracker
+        # Buffered per worker and upserted in batches by a background flusher
+        activity_tracker.record(current_user.id)
     
-    # User loader for Flask-Login
-    from app.models import User
+    # User loader for Flask-Login (user + member in one query, short-TTL cache per worker)
+    from app.identity import load_identity
     
     @login_manager.user_loader
     def load_user(user_id):
-        return User.query.get(int(user_id))
+        return load_identity(int(user_id))
+    
+    from app.activity import activity_tracker
+    activity_tracker.init_app(app)
+    from app.blog_views import blog_view_counter
+    blog_view_counter.init_app(app)
+    from app.member_index import member_index
+    member_index.init_app(app)
+    from app.checkin_rewards import checkin_rewards
+    checkin_rewards.init_app(app)
+    
+    # Query counts, N+1 warnings and Server-Timing per request
+    from app import instrumentation
+    instrumentation.init_app(app)
+    from app import metrics
+    metrics.init_app(app)
     
     # Register blueprints
     from app.routes.main import main_bp
@@ -280,11 +139,18 @@ def create_app():
     from app.routes.admin import admin_bp
     from app.routes.member import member_bp
     from app.routes.verification import verification_bp
+    from app.routes.ops import ops_bp
     
     app.register_blueprint(main_bp)
     app.register_blueprint(auth_bp, url_prefix='/auth')
     app.register_blueprint(admin_bp, url_prefix='/admin')
     app.register_blueprint(member_bp, url_prefix='/member')
     app.register_blueprint(verification_bp)
+    app.register_blueprint(ops_bp)
+    
+    from app.commands import register_commands
+    register_commands(app)
     
+    app.config['BOOT_TIME_MS'] = (time.perf_counter() - boot_started) * 1000
+    print(f"[boot] create_app finished in {app.config['BOOT_TIME_MS']:.1f} ms (pid {os.getpid()})")
     return app
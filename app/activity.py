@@ -0,0 +1,74 @@
+"""
+Daily active user tracking
+Page views only touch an in-memory buffer; the (user, day) rows are upserted in
+batches, so DAU numbers lag by at most the flush interval.
+"""
+
+import os
+from datetime import datetime
+from app.database import chunked, greatest, least, upsert_statement
+from app.write_buffer import CoalescingBuffer
+
+
+class DailyActivityBuffer(CoalescingBuffer):
+    """Buffers first/last seen timestamps per (user_id, activity_date)"""
+
+    def record(self, user_id, when=None):
+        when = when or datetime.utcnow()
+        self.add((user_id, when.date()), (when, when))
+
+    def merge(self, current, value):
+        return (min(current[0], value[0]), max(current[1], value[1]))
+
+    def write(self, connection, entries):
+        from app.models import DailyActiveUser
+
+        table = DailyActiveUser.__table__
+        dialect = connection.dialect.name
+        rows = [
+            {
+                'user_id': user_id,
+                'activity_date': activity_date,
+                'first_seen_at': first_seen,
+                'last_seen_at': last_seen,
+            }
+            for (user_id, activity_date), (first_seen, last_seen) in entries.items()
+        ]
+
+        # Keep each statement well under SQLite's bound-parameter limit
+        for batch in chunked(rows, 200):
+            stmt = upsert_statement(
+                dialect, table, batch,
+                index_elements=['user_id', 'activity_date'],
+                build_set=lambda excluded: {
+                    'first_seen_at': least(dialect, table.c.first_seen_at, excluded.first_seen_at),
+                    'last_seen_at': greatest(dialect, table.c.last_seen_at, excluded.last_seen_at),
+                }
+            )
+            if stmt is not None:
+                connection.execute(stmt)
+            else:
+                self._write_portable(connection, table, batch)
+
+    @staticmethod
+    def _write_portable(connection, table, rows):
+        """Update-then-insert fallback for databases without ON CONFLICT"""
+        for row in rows:
+            key = (table.c.user_id == row['user_id']) & (table.c.activity_date == row['activity_date'])
+            existing = connection.execute(
+                table.select().with_only_columns(table.c.first_seen_at, table.c.last_seen_at).where(key)
+            ).first()
+            if existing:
+                connection.execute(table.update().where(key).values(
+                    first_seen_at=min(existing.first_seen_at, row['first_seen_at']),
+                    last_seen_at=max(existing.last_seen_at, row['last_seen_at']),
+                ))
+            else:
+                connection.execute(table.insert().values(**row))
+
+
+activity_tracker = DailyActivityBuffer(
+    'daily-active-users',
+    flush_interval=float(os.environ.get('DAU_FLUSH_INTERVAL', '5')),
+    max_entries=int(os.environ.get('DAU_FLUSH_MAX_ENTRIES', '200')),
+)
@@ -0,0 +1,133 @@
+"""
+Blog view counter
+Reading a post no longer writes to the database: views are summed per post in
+a per-worker buffer and flushed as batched ``UPDATE blog SET views = views + n``
+statements, so blog_post is a plain read (and can be served from the page cache).
+
+Requests from crawlers are not counted, and each visitor counts once per post
+per day in a worker; the "seen" set is a Bloom filter, so memory stays fixed
+and a rare false positive drops a genuine view. Counts lag by up to the flush
+interval.
+
+Settings (environment):
+    BLOG_VIEWS_FLUSH_INTERVAL     seconds between flushes, default 10
+    BLOG_VIEWS_FLUSH_MAX_ENTRIES  posts buffered before an early flush, default 200
+    BLOG_VIEWS_FILTER_BOTS        1/0, default 1
+    BLOG_VIEWS_UNIQUE             1/0 (count repeat views too), default 1
+    BLOG_VIEWS_BLOOM_BITS         filter size, default 2**20 bits (128 KiB)
+"""
+
+import hashlib
+import math
+import os
+import re
+import threading
+from datetime import date
+from functools import wraps
+from flask import request
+from sqlalchemy import bindparam
+from app.write_buffer import CoalescingBuffer
+
+BOT_USER_AGENT = re.compile(
+    r'bot|crawl|spider|slurp|archiver|facebookexternalhit|embedly|preview|monitor|headless'
+    r'|curl|wget|python-requests|httpx|go-http-client|java/|libwww',
+    re.IGNORECASE,
+)
+
+
+class BloomFilter:
+    """Fixed-size set membership with false positives but no false negatives"""
+
+    def __init__(self, bits=2 ** 20, hashes=4):
+        self.bits = bits
+        self.hashes = hashes
+        self._array = bytearray(math.ceil(bits / 8))
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        # Double hashing: k positions from two 64-bit hashes
+        return [(first + i * second) % self.bits for i in range(self.hashes)]
+
+    def add(self, key):
+        """Add ``key``; returns False if it was (probably) already present"""
+        added = False
+        for position in self._positions(key):
+            byte, mask = position >> 3, 1 << (position & 7)
+            if not self._array[byte] & mask:
+                self._array[byte] |= mask
+                added = True
+        return added
+
+
+class BlogViewBuffer(CoalescingBuffer):
+    """Buffers view increments per blog slug"""
+
+    def __init__(self, name, bloom_bits=2 ** 20, **kwargs):
+        super().__init__(name, **kwargs)
+        self.bloom_bits = bloom_bits
+        self._seen = None
+        self._seen_day = None
+        self._seen_lock = threading.Lock()
+
+    def first_view_today(self, slug, visitor):
+        """True the first time this worker sees ``visitor`` on ``slug`` today"""
+        today = date.today()
+        with self._seen_lock:
+            if self._seen_day != today:
+                self._seen, self._seen_day = BloomFilter(self.bloom_bits), today
+            return self._seen.add(f'{slug}\x00{visitor}')
+
+    def record(self, slug):
+        self.add(slug, 1)
+
+    def merge(self, current, value):
+        return current + value
+
+    def write(self, connection, entries):
+        from app.models import Blog
+
+        table = Blog.__table__
+        connection.execute(
+            table.update().where(table.c.slug == bindparam('b_slug'))
+            .values(views=table.c.views + bindparam('b_views')),
+            [{'b_slug': slug, 'b_views': count} for slug, count in entries.items()],
+        )
+
+
+blog_view_counter = BlogViewBuffer(
+    'blog-views',
+    flush_interval=float(os.environ.get('BLOG_VIEWS_FLUSH_INTERVAL', '10')),
+    max_entries=int(os.environ.get('BLOG_VIEWS_FLUSH_MAX_ENTRIES', '200')),
+    bloom_bits=int(os.environ.get('BLOG_VIEWS_BLOOM_BITS', str(2 ** 20))),
+)
+
+
+def _visitor_key():
+    from flask_login import current_user
+
+    if current_user.is_authenticated:
+        return f'user:{current_user.id}'
+    return f"anon:{request.remote_addr}:{request.headers.get('User-Agent', '')}"
+
+
+def counts_blog_views(view):
+    """
+    Count a view of the post after a successful response
+
+    Goes above @cached_page so views served from the cache are counted too.
+    """
+    @wraps(view)
+    def wrapper(slug, *args, **kwargs):
+        response = view(slug, *args, **kwargs)
+        status = getattr(response, 'status_code', 200)
+        if status in (200, 304) and request.method == 'GET':
+            if os.environ.get('BLOG_VIEWS_FILTER_BOTS', '1') == '1' \
+                    and BOT_USER_AGENT.search(request.headers.get('User-Agent', '')):
+                return response
+            if os.environ.get('BLOG_VIEWS_UNIQUE', '1') == '1' \
+                    and not blog_view_counter.first_view_today(slug, _visitor_key()):
+                return response
+            blog_view_counter.record(slug)
+        return response
+    return wrapper
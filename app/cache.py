@@ -0,0 +1,128 @@
+"""
+In-process caches shared by request handlers
+Each gunicorn worker keeps its own copy; entries expire after a TTL
+"""
+
+import threading
+import time
+from app import metrics
+
+
+_caches = []
+
+
+class TTLCache:
+    """Thread-safe key/value cache whose entries expire after ``ttl`` seconds"""
+
+    _MISSING = object()
+
+    def __init__(self, name, ttl=60, max_entries=None):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._data = {}
+        self._lock = threading.Lock()
+        _caches.append(self)
+
+    def get(self, key, default=None):
+        """Return the cached value for ``key``, or ``default`` if missing or expired"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                hit, value = False, default
+            else:
+                self.hits += 1
+                hit, value = True, entry[1]
+        metrics.record_cache_lookup(self.name, hit)
+        return value
+
+    def set(self, key, value, ttl=None):
+        """Store ``value`` under ``key`` for ``ttl`` seconds (defaults to the cache TTL)"""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            if self.max_entries and key not in self._data and len(self._data) >= self.max_entries:
+                self._evict()
+            self._data[key] = (expires_at, value)
+        return value
+
+    def get_or_set(self, key, factory, ttl=None):
+        """Return the cached value for ``key``, computing and storing it with ``factory()`` on a miss"""
+        value = self.get(key, self._MISSING)
+        if value is self._MISSING:
+            value = self.set(key, factory(), ttl)
+        return value
+
+    def invalidate(self, key=None):
+        """Drop one entry, or every entry when ``key`` is None"""
+        with self._lock:
+            if key is None:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
+
+    def _evict(self):
+        """Drop expired entries, then the oldest entry if still full (lock must be held)"""
+        now = time.monotonic()
+        for key in [k for k, (expires_at, _) in self._data.items() if expires_at <= now]:
+            del self._data[key]
+        if len(self._data) >= self.max_entries:
+            oldest = min(self._data, key=lambda k: self._data[k][0])
+            del self._data[oldest]
+
+    def __len__(self):
+        return len(self._data)
+
+
+def all_caches():
+    """Every TTLCache created in this process"""
+    return list(_caches)
+
+
+_commit_hooks = []
+_listening = False
+
+
+def invalidate_on_commit(models, callback, key=None):
+    """
+    Call ``callback(keys)`` after a commit that inserted, updated or deleted instances of ``models``
+    
+    ``key(instance)`` is evaluated at flush time, while the instance is still loaded;
+    by default the key is the model class. Bulk ``Query.update()``/``delete()`` calls
+    bypass the unit of work and are not seen here.
+    """
+    global _listening
+    _commit_hooks.append((tuple(models), key or type, callback))
+    if not _listening:
+        from sqlalchemy import event
+        from app import db
+        event.listen(db.session, 'after_flush', _collect_changes)
+        event.listen(db.session, 'after_commit', _dispatch_changes)
+        event.listen(db.session, 'after_soft_rollback', _discard_changes)
+        _listening = True
+
+
+def _collect_changes(session, flush_context):
+    pending = session.info.setdefault('cache_invalidations', {})
+    for instances in (session.new, session.dirty, session.deleted):
+        for instance in instances:
+            for index, (models, key, _callback) in enumerate(_commit_hooks):
+                if isinstance(instance, models):
+                    pending.setdefault(index, set()).add(key(instance))
+
+
+def _dispatch_changes(session):
+    pending = session.info.pop('cache_invalidations', None)
+    if not pending:
+        return
+    for index, keys in pending.items():
+        _commit_hooks[index][2](keys)
+
+
+def _discard_changes(session, previous_transaction):
+    session.info.pop('cache_invalidations', None)
@@ -0,0 +1,208 @@
+"""
+Offline check-in for event scanners
+The scanner page keeps a manifest of an event's approved RSVPs (acceptance
+code, member ID number, name, check-in state) in the browser and queues
+check-ins while the network is down. Every RSVP change stamps the row with the
+event's next manifest_version, so a scanner holding version N downloads only
+the rows changed since N.
+
+Queued check-ins are posted in batches with the time they were scanned and
+applied in one transaction; replaying a check-in is a no-op. Deleting an RSVP
+bumps the version without a row to send: scanners drop it when a check-in for
+it comes back as not found, or on their next full download.
+"""
+
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import case, event as sa_event, func, or_, select
+from sqlalchemy.orm.attributes import set_committed_value
+from app import db
+from app.models import Event, Member, RSVP
+
+MANIFEST_FIELDS = ('id', 'code', 'member_id', 'name', 'checked_in', 'checked_in_at')
+MAX_BATCH = 500
+# Scans queued longer than this (or stamped in the future) are clamped
+MAX_QUEUE_AGE = timedelta(hours=24)
+
+
+def _isoformat(value):
+    return value.strftime('%Y-%m-%dT%H:%M:%SZ') if value else None
+
+
+def manifest_version(event_id):
+    return db.session.scalar(select(Event.manifest_version).where(Event.id == event_id)) or 0
+
+
+def manifest(event, since=None):
+    """
+    The event's check-in list as compact rows
+
+    With ``since``, only RSVPs changed after that version are returned, and
+    ones no longer approved are listed in ``removed``.
+
+    Returns:
+        dict: event_id, version, full, fields, rows (lists in MANIFEST_FIELDS order), removed
+    """
+    # Read first: a change committed while the rows load is sent again next time, never lost
+    version = manifest_version(event.id)
+    full = since is None or since > version
+    query = select(
+        RSVP.id, RSVP.acceptance_code, Member.member_id_number, RSVP.full_name, RSVP.checked_in,
+        RSVP.checked_in_at, RSVP.status,
+    ).outerjoin(Member, Member.id == RSVP.member_id).where(RSVP.event_id == event.id)
+    if full:
+        query = query.where(RSVP.status == 'approved')
+    else:
+        query = query.where(RSVP.manifest_version > since)
+
+    rows, removed = [], []
+    for row in db.session.execute(query.order_by(RSVP.full_name.asc(), RSVP.id.asc())):
+        if row.status != 'approved':
+            removed.append(row.id)
+            continue
+        rows.append([
+            row.id, row.acceptance_code, row.member_id_number, row.full_name, bool(row.checked_in),
+            _isoformat(row.checked_in_at),
+        ])
+    return {
+        'event_id': event.id,
+        'version': version,
+        'full': full,
+        'fields': list(MANIFEST_FIELDS),
+        'rows': rows,
+        'removed': removed,
+    }
+
+
+def check_in_counts(event_id):
+    """(approved RSVPs, checked in) from one query"""
+    total, checked_in = db.session.query(
+        func.count(RSVP.id),
+        func.coalesce(func.sum(case((RSVP.checked_in == True, 1), else_=0)), 0),
+    ).filter(RSVP.event_id == event_id, RSVP.status == 'approved').one()
+    return total or 0, checked_in or 0
+
+
+def client_time(value, now):
+    """A scanner's timestamp as naive UTC, clamped to [now - MAX_QUEUE_AGE, now]; ``now`` if unparseable"""
+    try:
+        when = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except (TypeError, ValueError):
+        return now
+    if when.tzinfo is not None:
+        when = when.astimezone(timezone.utc).replace(tzinfo=None)
+    return min(max(when, now - MAX_QUEUE_AGE), now)
+
+
+def apply_checkins(event, items, admin_id, now=None):
+    """
+    Check in queued scans for ``event`` (in the caller's transaction)
+
+    Each item names an RSVP by ``rsvp_id``, ``code`` (acceptance code) or
+    ``member_id`` (member ID number), with the ``scanned_at`` time; ``key`` is
+    echoed back so the scanner can clear its queue.
+
+    Returns:
+        tuple: (results, newly checked-in RSVPs); each result has key, status and rsvp_id,
+        status being checked_in, already_checked_in, not_found or invalid
+    """
+    now = now or datetime.utcnow()
+    ids, codes, numbers = set(), set(), set()
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        if isinstance(item.get('rsvp_id'), int):
+            ids.add(item['rsvp_id'])
+        elif item.get('code'):
+            codes.add(str(item['code']).strip().upper())
+        elif item.get('member_id'):
+            numbers.add(str(item['member_id']).strip().upper())
+
+    by_id, by_code, by_number = {}, {}, {}
+    if ids or codes or numbers:
+        criteria = []
+        if ids:
+            criteria.append(RSVP.id.in_(ids))
+        if codes:
+            criteria.append(func.upper(RSVP.acceptance_code).in_(codes))
+        if numbers:
+            criteria.append(func.upper(Member.member_id_number).in_(numbers))
+        # Locked so two scanners replaying the same queue cannot both check someone in
+        rows = db.session.query(RSVP, Member.member_id_number).outerjoin(Member, Member.id == RSVP.member_id) \
+            .filter(RSVP.event_id == event.id, RSVP.status == 'approved', or_(*criteria)) \
+            .with_for_update(of=RSVP).all()
+        for rsvp, number in rows:
+            by_id[rsvp.id] = rsvp
+            if rsvp.acceptance_code:
+                by_code[rsvp.acceptance_code.upper()] = rsvp
+            if number:
+                by_number[number.upper()] = rsvp
+
+    results, checked_in = [], []
+    for item in items:
+        if not isinstance(item, dict):
+            results.append({'key': None, 'status': 'invalid', 'rsvp_id': None})
+            continue
+        if isinstance(item.get('rsvp_id'), int):
+            rsvp = by_id.get(item['rsvp_id'])
+        elif item.get('code'):
+            rsvp = by_code.get(str(item['code']).strip().upper())
+        elif item.get('member_id'):
+            rsvp = by_number.get(str(item['member_id']).strip().upper())
+        else:
+            results.append({'key': item.get('key'), 'status': 'invalid', 'rsvp_id': None})
+            continue
+
+        if rsvp is None:
+            status = 'not_found'
+        elif rsvp.checked_in:
+            status = 'already_checked_in'
+        else:
+            rsvp.checked_in = True
+            rsvp.checked_in_at = client_time(item.get('scanned_at'), now)
+            rsvp.checked_in_by = admin_id
+            checked_in.append(rsvp)
+            status = 'checked_in'
+        results.append({'key': item.get('key'), 'status': status, 'rsvp_id': rsvp.id if rsvp else None})
+    return results, checked_in
+
+
+def _event_id(rsvp):
+    if rsvp.event_id is not None:
+        return rsvp.event_id
+    return rsvp.event.id if rsvp.event is not None else None
+
+
+def _stamp_versions(session, flush_context, instances):
+    changed = defaultdict(list)
+    for instance in session.new:
+        if isinstance(instance, RSVP):
+            changed[_event_id(instance)].append(instance)
+    for instance in session.dirty:
+        if isinstance(instance, RSVP) and session.is_modified(instance):
+            changed[_event_id(instance)].append(instance)
+    for instance in session.deleted:
+        if isinstance(instance, RSVP):
+            changed.setdefault(_event_id(instance), [])
+    # Events created in this flush have no scanners yet
+    changed.pop(None, None)
+    if not changed:
+        return
+
+    connection = session.connection()
+    table = Event.__table__
+    for event_id, rsvps in changed.items():
+        connection.execute(
+            table.update().where(table.c.id == event_id)
+            .values(manifest_version=func.coalesce(table.c.manifest_version, 0) + 1)
+        )
+        version = connection.scalar(select(table.c.manifest_version).where(table.c.id == event_id))
+        for rsvp in rsvps:
+            rsvp.manifest_version = version
+        loaded = session.identity_map.get(session.identity_key(Event, event_id))
+        if loaded is not None:
+            set_committed_value(loaded, 'manifest_version', version)
+
+
+if not sa_event.contains(db.session, 'before_flush', _stamp_versions):
+    sa_event.listen(db.session, 'before_flush', _stamp_versions)
@@ -0,0 +1,207 @@
+"""
+Deferred check-in rewards
+Checking someone in only marks their RSVP. Points and trophies are awarded a
+few seconds later in batches by a per-worker background step: the pending
+check-ins are claimed with one UPDATE ... RETURNING, the balances of the members involved
+come from one grouped query, newly crossed trophy thresholds are found with
+bisect over the sorted thresholds, and the reward transactions and trophies
+are written with one bulk insert each.
+
+A check-in is pending while rsvp.points_processed_at is unset, so check-ins
+recorded by a worker that stopped before its batch ran are picked up by the
+next batch in any worker, or by ``flask checkin award-points``.
+
+Settings (environment):
+    CHECKIN_REWARDS_FLUSH_INTERVAL     seconds between batches, default 5
+    CHECKIN_REWARDS_FLUSH_MAX_ENTRIES  check-ins queued before an early batch, default 50
+    CHECKIN_REWARDS_BATCH_SIZE         check-ins claimed per statement, default 500
+"""
+
+import os
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import datetime
+from sqlalchemy import func, insert, select
+from app.cache import TTLCache, invalidate_on_commit
+from app.member_index import member_index
+from app.models import Event, MemberTrophy, RewardTransaction, RSVP, Trophy, User
+from app.page_cache import model_versions, track_versions
+from app.write_buffer import CoalescingBuffer
+
+_ladder_cache = TTLCache('trophy_ladder', ttl=int(os.environ.get('TROPHY_LADDER_TTL', '600')), max_entries=4)
+
+
+class TrophyLadder:
+    """Active trophy thresholds, sorted for bisect lookups"""
+
+    def __init__(self, trophies):
+        ordered = sorted(trophies)  # (points_required, trophy id)
+        self.thresholds = [points for points, _trophy_id in ordered]
+        self.trophy_ids = [trophy_id for _points, trophy_id in ordered]
+
+    def crossed(self, old_points, new_points):
+        """Ids of trophies with old_points < points_required <= new_points"""
+        if new_points <= old_points:
+            return []
+        return self.trophy_ids[bisect_right(self.thresholds, old_points):bisect_right(self.thresholds, new_points)]
+
+
+def trophy_ladder(connection):
+    def load():
+        return TrophyLadder(connection.execute(
+            select(Trophy.points_required, Trophy.id).where(Trophy.is_active == True)
+        ).all())
+
+    return _ladder_cache.get_or_set(('ladder', model_versions(Trophy)), load)
+
+
+def _awarding_admin(rsvp):
+    """The admin a check-in reward is recorded under: who checked in, who approved, else the first admin"""
+    user = User.__table__
+    first_admin = select(user.c.id).where(user.c.role == 'admin') \
+        .order_by(user.c.is_super_admin.desc(), user.c.id).limit(1).scalar_subquery()
+    return func.coalesce(rsvp.c.checked_in_by, rsvp.c.approved_by, first_admin)
+
+
+def pending_count(connection):
+    """Check-ins still waiting for their reward"""
+    rsvp = RSVP.__table__
+    return connection.scalar(select(func.count()).select_from(rsvp).where(
+        rsvp.c.checked_in == True, rsvp.c.points_processed_at.is_(None),
+    )) or 0
+
+
+def award_pending(connection, limit=500):
+    """
+    Award points and trophies for up to ``limit`` pending check-ins (in the caller's transaction)
+
+    Returns:
+        tuple: (check-ins claimed, reward transactions written, ids of the members rewarded)
+    """
+    rsvp = RSVP.__table__
+    claimed_at = datetime.utcnow()
+    admin_id = _awarding_admin(rsvp)
+    # Without any admin to attribute the reward to, a check-in stays pending rather than being dropped
+    pending = select(rsvp.c.id).where(
+        rsvp.c.checked_in == True, rsvp.c.points_processed_at.is_(None), admin_id.isnot(None),
+    ).order_by(rsvp.c.checked_in_at, rsvp.c.id).limit(limit)
+    # Claim first: a batch running in another worker skips the rows stamped here. The conditions are
+    # repeated outside the subquery so a check-in undone while this waits for its row lock is skipped.
+    # The batch is then read back by the claimed ids, never by the timestamp
+    claim = rsvp.update().where(
+        rsvp.c.id.in_(pending.scalar_subquery()), rsvp.c.checked_in == True, rsvp.c.points_processed_at.is_(None),
+    ).values(points_processed_at=claimed_at)
+    if connection.dialect.update_returning:
+        claimed_ids = list(connection.execute(claim.returning(rsvp.c.id)).scalars())
+    else:
+        # No UPDATE ... RETURNING (MySQL): lock the pending rows, then stamp exactly those
+        claimed_ids = list(connection.execute(pending.with_for_update()).scalars())
+        if claimed_ids:
+            connection.execute(
+                rsvp.update().where(rsvp.c.id.in_(claimed_ids)).values(points_processed_at=claimed_at)
+            )
+    claimed = len(claimed_ids)
+    if not claimed:
+        return 0, 0, set()
+
+    event = Event.__table__
+    checkins = connection.execute(
+        select(
+            rsvp.c.member_id, rsvp.c.event_id, event.c.title, event.c.check_in_points,
+            admin_id.label('admin_id'),
+        )
+        .join(event, event.c.id == rsvp.c.event_id)
+        .where(
+            rsvp.c.id.in_(claimed_ids),
+            rsvp.c.member_id.isnot(None),
+            event.c.check_in_points > 0,
+        )
+        .order_by(rsvp.c.checked_in_at, rsvp.c.id)
+    ).all()
+    if not checkins:
+        return claimed, 0, set()
+
+    member_ids = {row.member_id for row in checkins}
+    balances = defaultdict(int, connection.execute(
+        select(RewardTransaction.member_id, func.sum(RewardTransaction.points))
+        .where(RewardTransaction.member_id.in_(member_ids))
+        .group_by(RewardTransaction.member_id)
+    ).all())
+    earned = set(connection.execute(
+        select(MemberTrophy.member_id, MemberTrophy.trophy_id).where(MemberTrophy.member_id.in_(member_ids))
+    ).all())
+    ladder = trophy_ladder(connection)
+
+    now = datetime.utcnow()
+    transactions, trophies = [], []
+    for row in checkins:
+        old_points = balances[row.member_id] or 0
+        new_points = old_points + row.check_in_points
+        balances[row.member_id] = new_points
+        transactions.append({
+            'member_id': row.member_id, 'points': row.check_in_points, 'transaction_type': 'event_checkin',
+            'reason': f'Attended: {row.title}', 'event_id': row.event_id, 'admin_id': row.admin_id,
+            'created_at': now,
+        })
+        for trophy_id in ladder.crossed(old_points, new_points):
+            if (row.member_id, trophy_id) not in earned:
+                earned.add((row.member_id, trophy_id))
+                trophies.append({'member_id': row.member_id, 'trophy_id': trophy_id, 'earned_at': now})
+
+    connection.execute(insert(RewardTransaction.__table__), transactions)
+    if trophies:
+        connection.execute(insert(MemberTrophy.__table__), trophies)
+    return claimed, len(transactions), member_ids
+
+
+def award_all_pending(connection, batch_size=500):
+    """Run award_pending until nothing is left; returns (claimed, transactions, member ids)"""
+    claimed_total, written_total, members = 0, 0, set()
+    while True:
+        claimed, written, affected = award_pending(connection, batch_size)
+        claimed_total += claimed
+        written_total += written
+        members |= affected
+        if claimed < batch_size:
+            return claimed_total, written_total, members
+
+
+def publish_rewards(member_ids):
+    """Refresh the door-scan index for members rewarded outside the ORM"""
+    member_index.publish({f'm:{member_id}' for member_id in member_ids})
+
+
+class CheckinRewardQueue(CoalescingBuffer):
+    """Wakes the reward batch after check-ins; the work itself is every pending RSVP in the database"""
+
+    def __init__(self, name, batch_size=500, **kwargs):
+        super().__init__(name, **kwargs)
+        self.batch_size = batch_size
+        self._rewarded = set()
+
+    def record(self, rsvp_id):
+        self.add(rsvp_id, True)
+
+    def write(self, connection, entries):
+        _claimed, _written, members = award_all_pending(connection, self.batch_size)
+        self._rewarded |= members
+
+    def flush(self):
+        written = super().flush()
+        rewarded, self._rewarded = self._rewarded, set()
+        if rewarded:
+            with self.app.app_context():
+                publish_rewards(rewarded)
+        return written
+
+
+checkin_rewards = CheckinRewardQueue(
+    'checkin-rewards',
+    flush_interval=float(os.environ.get('CHECKIN_REWARDS_FLUSH_INTERVAL', '5')),
+    max_entries=int(os.environ.get('CHECKIN_REWARDS_FLUSH_MAX_ENTRIES', '50')),
+    batch_size=int(os.environ.get('CHECKIN_REWARDS_BATCH_SIZE', '500')),
+)
+
+invalidate_on_commit((Trophy,), lambda _models: _ladder_cache.invalidate())
+# Threshold edits in any worker reach every other worker's ladder
+track_versions(Trophy)
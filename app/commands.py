@@ -0,0 +1,108 @@
+"""
+Flask CLI commands
+Run with ``flask --app main <group> <command>`` (FLASK_APP=main.py in docker-compose).
+"""
+
+import json
+import os
+import time
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+synthetic_cli = AppGroup('synthetic', help='Synthetic data for load testing.')
+
+
+@synthetic_cli.command('seed')
+@click.option('--scale', type=click.Choice(['small', 'medium', 'large']), default='small', show_default=True)
+@click.option('--users', type=int, help='Members to create (overrides the scale preset).')
+@click.option('--events', type=int)
+@click.option('--rsvps', type=int)
+@click.option('--rewards', type=int, help='Reward transactions to create.')
+@click.option('--competitions', type=int)
+@click.option('--weeks', type=int, help='Session weeks to create.')
+@click.option('--seed', type=int, help='Random seed for reproducible data.')
+@click.option('--manifest', type=click.Path(dir_okay=False),
+              help='Where to write the load-harness manifest (default: instance/loadtest_manifest.json).')
+def seed_command(scale, users, events, rsvps, rewards, competitions, weeks, seed, manifest):
+    """Bulk-insert a synthetic club (e.g. --scale large: 10k members, 100k RSVPs)."""
+    from app import db
+    from app.synthetic import seed_club
+
+    # Only creates missing tables, so it is safe on a migrated database
+    db.create_all()
+    started = time.perf_counter()
+    result = seed_club(
+        scale,
+        overrides={'users': users, 'events': events, 'rsvps': rsvps, 'rewards': rewards,
+                   'competitions': competitions, 'weeks': weeks},
+        seed=seed,
+        progress=lambda message: click.echo(f'  {message}'),
+    )
+    elapsed = time.perf_counter() - started
+
+    manifest = manifest or os.path.join(current_app.instance_path, 'loadtest_manifest.json')
+    os.makedirs(os.path.dirname(os.path.abspath(manifest)), exist_ok=True)
+    with open(manifest, 'w') as f:
+        json.dump(result, f, indent=2)
+    click.echo(f"Seeded run '{result['run']}' in {elapsed:.1f}s; manifest written to {manifest}")
+    click.echo(f"Accounts: lt-{result['run']}-admin0@loadtest.invalid / {result['password']}")
+
+
+finance_cli = AppGroup('finance', help='Financial bookkeeping maintenance.')
+
+
+@finance_cli.command('rebuild-rollups')
+@click.option('--period', 'period_ids', type=int, multiple=True, help='Period id to rebuild (repeatable; default all).')
+@click.option('--include-closed', is_flag=True, help='Also re-snapshot closed (frozen) periods.')
+def rebuild_rollups_command(period_ids, include_closed):
+    """Recompute the financial_rollup table from the transactions."""
+    from app import db
+    from app.financial_rollup import rebuild_rollups
+
+    started = time.perf_counter()
+    rebuilt = rebuild_rollups(period_ids or None, include_closed=include_closed)
+    db.session.commit()
+    click.echo(f'Rebuilt rollups for {len(rebuilt)} period(s) in {time.perf_counter() - started:.2f}s')
+
+
+projects_cli = AppGroup('projects', help='Project maintenance.')
+
+
+@projects_cli.command('relink-tags')
+def relink_tags_command():
+    """Rebuild project_technology links from the Project.technologies text."""
+    from app import db
+    from app.project_tags import relink_all
+
+    started = time.perf_counter()
+    count = relink_all()
+    db.session.commit()
+    click.echo(f'Relinked technology tags for {count} project(s) in {time.perf_counter() - started:.2f}s')
+
+
+checkin_cli = AppGroup('checkin', help='Event check-in maintenance.')
+
+
+@checkin_cli.command('award-points')
+def award_points_command():
+    """Award points and trophies for check-ins still waiting for the reward batch."""
+    from app import db
+    from app.checkin_rewards import award_all_pending, pending_count, publish_rewards
+
+    started = time.perf_counter()
+    with db.engine.begin() as connection:
+        claimed, written, members = award_all_pending(connection)
+        waiting = pending_count(connection)
+    publish_rewards(members)
+    click.echo(f'Processed {claimed} check-in(s), {written} reward(s) for {len(members)} member(s) '
+               f'in {time.perf_counter() - started:.2f}s')
+    if waiting:
+        click.echo(f'{waiting} check-in(s) still pending: no admin account to record their rewards under', err=True)
+
+
+def register_commands(app):
+    app.cli.add_command(synthetic_cli)
+    app.cli.add_command(finance_cli)
+    app.cli.add_command(projects_cli)
+    app.cli.add_command(checkin_cli)
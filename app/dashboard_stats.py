@@ -0,0 +1,137 @@
+"""
+Admin dashboard statistics
+The landing page's counters, current financial period totals and recent-activity
+lists are computed with a handful of aggregate queries and cached per worker in
+three sections, each rebuilt after a short TTL or as soon as a commit in this
+worker touches the rows behind it (approvals, payments, transactions, ...).
+Other workers pick the change up when their TTL expires.
+"""
+
+import os
+from datetime import datetime
+from types import SimpleNamespace
+from flask import current_app
+from sqlalchemy import case, func, select
+from app import db
+from app.cache import TTLCache, invalidate_on_commit
+from app.models import (
+    DailyActiveUser, Event, FinancialPeriod, FinancialRollup, FinancialTransaction, MembershipPayment,
+    Member, News, Newsletter, User,
+)
+
+_stats_cache = TTLCache('dashboard', ttl=int(os.environ.get('DASHBOARD_STATS_TTL', '30')))
+
+
+def _count(model, *criteria):
+    return select(func.count()).select_from(model).where(*criteria).scalar_subquery()
+
+
+def _load_counts():
+    """Headline counters in a single statement"""
+    now = datetime.utcnow()
+    row = db.session.execute(select(
+        select(func.count(Member.id)).join(User, User.id == Member.user_id)
+        .where(User.is_approved == True).scalar_subquery().label('total_members'),
+        _count(User, User.role == 'student', User.is_approved == False).label('pending_approvals'),
+        _count(Event, Event.event_date >= now).label('upcoming_events'),
+        _count(Newsletter, Newsletter.is_active == True).label('newsletter_subscribers'),
+        _count(DailyActiveUser, DailyActiveUser.activity_date == now.date()).label('daily_active_users'),
+    )).one()
+    return dict(row._mapping)
+
+
+def _load_finance():
+    """The open financial period with its revenue and expense totals"""
+    amount = FinancialRollup.total_amount
+    kind = FinancialRollup.transaction_type
+    row = db.session.execute(
+        select(
+            FinancialPeriod.id, FinancialPeriod.name, FinancialPeriod.start_date, FinancialPeriod.end_date,
+            func.coalesce(func.sum(case((kind == 'revenue', amount), else_=0)), 0).label('revenue'),
+            func.coalesce(func.sum(case((kind == 'expense', amount), else_=0)), 0).label('expenses'),
+        )
+        .outerjoin(FinancialRollup, FinancialRollup.financial_period_id == FinancialPeriod.id)
+        .where(FinancialPeriod.status == 'open')
+        .group_by(FinancialPeriod.id, FinancialPeriod.name, FinancialPeriod.start_date, FinancialPeriod.end_date)
+        .order_by(FinancialPeriod.id)
+        .limit(1)
+    ).first()
+    if row is None:
+        return {'current_period': None, 'current_revenue': 0, 'current_expenses': 0, 'current_balance': 0}
+    period = SimpleNamespace(id=row.id, name=row.name, start_date=row.start_date, end_date=row.end_date)
+    return {
+        'current_period': period,
+        'current_revenue': row.revenue,
+        'current_expenses': row.expenses,
+        'current_balance': row.revenue - row.expenses,
+    }
+
+
+def _load_recent():
+    """Recent news, pending registrations and recently active users (with emails joined in)"""
+    recent_news = [
+        SimpleNamespace(id=row.id, title=row.title, published_date=row.published_date)
+        for row in db.session.execute(
+            select(News.id, News.title, News.published_date).order_by(News.published_date.desc()).limit(5)
+        )
+    ]
+    pending_users = [
+        SimpleNamespace(id=row.id, email=row.email, created_at=row.created_at)
+        for row in db.session.execute(
+            select(User.id, User.email, User.created_at)
+            .where(User.role == 'student', User.is_approved == False).limit(5)
+        )
+    ]
+    recent_active_users = [
+        SimpleNamespace(
+            user_id=row.user_id, activity_date=row.activity_date, last_seen_at=row.last_seen_at,
+            user=SimpleNamespace(email=row.email) if row.email else None,
+        )
+        for row in db.session.execute(
+            select(DailyActiveUser.user_id, DailyActiveUser.activity_date, DailyActiveUser.last_seen_at, User.email)
+            .outerjoin(User, User.id == DailyActiveUser.user_id)
+            .order_by(DailyActiveUser.last_seen_at.desc()).limit(10)
+        )
+    ]
+    return {'recent_news': recent_news, 'pending_users': pending_users, 'recent_active_users': recent_active_users}
+
+
+_SECTIONS = {'counts': _load_counts, 'finance': _load_finance, 'recent': _load_recent}
+
+# Rendered when a section fails to load
+_DEFAULTS = {
+    'total_members': 0, 'pending_approvals': 0, 'upcoming_events': 0, 'newsletter_subscribers': 0,
+    'daily_active_users': 0, 'current_period': None, 'current_revenue': 0, 'current_expenses': 0,
+    'current_balance': 0, 'recent_news': [], 'pending_users': [], 'recent_active_users': [],
+}
+
+
+def get_dashboard_stats():
+    """Template context for admin/dashboard.html, served from the per-worker cache"""
+    stats = dict(_DEFAULTS)
+    for section, loader in _SECTIONS.items():
+        try:
+            stats.update(_stats_cache.get_or_set(section, loader))
+        except Exception:
+            db.session.rollback()
+            current_app.logger.exception('Failed to load dashboard %s', section)
+    return stats
+
+
+def invalidate_dashboard_stats(*sections):
+    """Forget cached sections (all of them when none are named)"""
+    if not sections:
+        _stats_cache.invalidate()
+    for section in sections:
+        _stats_cache.invalidate(section)
+
+
+def _invalidates(*sections):
+    return lambda _models: invalidate_dashboard_stats(*sections)
+
+
+# Daily-active rows change on every request; those counters only follow the TTL
+invalidate_on_commit((User, Member), _invalidates('counts', 'recent'))
+invalidate_on_commit((Event, Newsletter), _invalidates('counts'))
+invalidate_on_commit((News,), _invalidates('recent'))
+invalidate_on_commit((FinancialPeriod, FinancialTransaction, MembershipPayment), _invalidates('finance'))
@@ -0,0 +1,226 @@
+"""
+Database helpers shared across modules
+"""
+
+import logging
+import os
+import random
+import time
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+from app import db
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    try:
+        return int(value) if value not in (None, '') else default
+    except ValueError:
+        return default
+
+
+def _env_bool(name, default):
+    value = os.environ.get(name)
+    if value is None or value.strip() == '':
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def engine_options(database_uri):
+    """
+    SQLALCHEMY_ENGINE_OPTIONS for the configured database, driven by environment
+    
+    DB_POOL_SIZE / DB_MAX_OVERFLOW / DB_POOL_TIMEOUT size the per-process pool,
+    DB_POOL_PRE_PING and DB_POOL_RECYCLE guard against dropped connections, and on
+    PostgreSQL DB_CONNECT_TIMEOUT, DB_STATEMENT_TIMEOUT_MS and DB_IDLE_TX_TIMEOUT_MS
+    are applied to every new connection (0 disables a timeout).
+    """
+    options = {
+        'pool_pre_ping': _env_bool('DB_POOL_PRE_PING', True),
+        'pool_recycle': _env_int('DB_POOL_RECYCLE', 1800),
+    }
+    if database_uri.startswith('sqlite'):
+        # SQLite connections are local files; server pool sizing does not apply
+        return options
+
+    options.update({
+        'pool_size': _env_int('DB_POOL_SIZE', 5),
+        'max_overflow': _env_int('DB_MAX_OVERFLOW', 5),
+        'pool_timeout': _env_int('DB_POOL_TIMEOUT', 10),
+    })
+    if database_uri.startswith('postgresql'):
+        connect_args = {'connect_timeout': _env_int('DB_CONNECT_TIMEOUT', 10)}
+        server_options = []
+        statement_timeout = _env_int('DB_STATEMENT_TIMEOUT_MS', 30000)
+        idle_tx_timeout = _env_int('DB_IDLE_TX_TIMEOUT_MS', 60000)
+        if statement_timeout > 0:
+            server_options.append(f'-c statement_timeout={statement_timeout}')
+        if idle_tx_timeout > 0:
+            server_options.append(f'-c idle_in_transaction_session_timeout={idle_tx_timeout}')
+        if server_options:
+            connect_args['options'] = ' '.join(server_options)
+        options['connect_args'] = connect_args
+    return options
+
+
+def connection_budget(options):
+    """
+    Worst-case server connections across all gunicorn workers
+    
+    Returns:
+        tuple: (per_process, workers, total); per_process is None when unpooled
+    """
+    workers = _env_int('GUNICORN_WORKERS', 2 * (os.cpu_count() or 1) + 1)
+    if 'pool_size' not in options:
+        return None, workers, None
+    per_process = options['pool_size'] + options['max_overflow']
+    return per_process, workers, per_process * workers
+
+
+def sqlite_pragmas():
+    """
+    PRAGMAs applied to every SQLite connection (set SQLITE_TUNING=0 to disable)
+    
+    WAL lets readers proceed while one worker writes, synchronous=NORMAL is durable
+    across application crashes in WAL mode, and busy_timeout makes writers wait for
+    the lock instead of failing immediately with "database is locked".
+    """
+    if not _env_bool('SQLITE_TUNING', True):
+        return []
+    return [
+        ('journal_mode', os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')),
+        ('synchronous', os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')),
+        ('busy_timeout', _env_int('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+        ('mmap_size', _env_int('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+        # Negative values are KiB rather than pages
+        ('cache_size', _env_int('SQLITE_CACHE_SIZE', -32000)),
+    ]
+
+
+def configure_sqlite(engine):
+    """Install the connect-time PRAGMAs on a SQLite engine; no-op for other databases"""
+    if engine.dialect.name != 'sqlite':
+        return False
+    pragmas = sqlite_pragmas()
+    if not pragmas:
+        return False
+    in_memory = engine.url.database in (None, '', ':memory:')
+
+    @event.listens_for(engine, 'connect')
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas:
+                if name == 'journal_mode' and in_memory:
+                    continue
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
+    return True
+
+
+def is_lock_error(exc):
+    """True for transient lock contention errors worth retrying"""
+    if not isinstance(exc, OperationalError):
+        return False
+    message = str(getattr(exc, 'orig', exc)).lower()
+    return 'database is locked' in message or 'database table is locked' in message
+
+
+def retry_on_lock(work, attempts=None, base_delay=None, rollback=True):
+    """
+    Run a write transaction, retrying with jittered backoff while the database is locked
+    
+    ``work`` must be safe to call again from scratch: it should add/update and
+    commit itself. The session is rolled back between attempts unless
+    ``rollback`` is False (for callers using their own connection).
+    """
+    attempts = attempts or _env_int('DB_LOCK_RETRIES', 5)
+    base_delay = base_delay if base_delay is not None else _env_int('DB_LOCK_RETRY_DELAY_MS', 50) / 1000
+    for attempt in range(1, attempts + 1):
+        try:
+            return work()
+        except OperationalError as e:
+            if rollback:
+                db.session.rollback()
+            if attempt == attempts or not is_lock_error(e):
+                raise
+            delay = base_delay * (2 ** (attempt - 1))
+            logging.getLogger(__name__).warning(
+                'Database locked, retrying in %.0f ms (attempt %s/%s)', delay * 1000, attempt, attempts
+            )
+            time.sleep(delay + random.uniform(0, delay))
+
+
+def pool_status():
+    """Snapshot of this process's connection pool for the utilization gauge"""
+    pool = db.engine.pool
+    status = {'pool': type(pool).__name__}
+    if not hasattr(pool, 'checkedout'):
+        return status
+    
+    size = pool.size()
+    checked_out = pool.checkedout()
+    # overflow() goes negative while the pool has not filled up yet
+    capacity = size + max(getattr(pool, '_max_overflow', 0), 0)
+    status.update({
+        'size': size,
+        'checked_in': pool.checkedin(),
+        'checked_out': checked_out,
+        'overflow': max(pool.overflow(), 0),
+        'capacity': capacity,
+        'utilization': round(checked_out / capacity, 3) if capacity else 0.0,
+    })
+    return status
+
+
+def dialect_name():
+    """Name of the active SQLAlchemy dialect, e.g. 'postgresql' or 'sqlite'"""
+    return db.engine.dialect.name
+
+
+def least(dialect, left, right):
+    """SQL expression for the smaller of two values on the given dialect"""
+    if dialect == 'postgresql':
+        return db.func.least(left, right)
+    # SQLite's two-argument min() is a scalar function
+    return db.func.min(left, right)
+
+
+def greatest(dialect, left, right):
+    """SQL expression for the larger of two values on the given dialect"""
+    if dialect == 'postgresql':
+        return db.func.greatest(left, right)
+    return db.func.max(left, right)
+
+
+def upsert_statement(dialect, table, rows, index_elements, build_set):
+    """
+    Build a multi-row INSERT ... ON CONFLICT DO UPDATE statement
+    
+    Args:
+        dialect: dialect name ('postgresql' or 'sqlite')
+        table: Table to write to
+        rows: list of column dicts
+        index_elements: columns of the unique constraint to conflict on
+        build_set: callable(excluded) returning the SET mapping for conflicting rows
+    
+    Returns:
+        The statement, or None when the dialect has no ON CONFLICT support
+    """
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+    
+    stmt = insert(table).values(rows)
+    return stmt.on_conflict_do_update(index_elements=index_elements, set_=build_set(stmt.excluded))
+
+
+def chunked(items, size):
+    """Yield successive lists of at most ``size`` items"""
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
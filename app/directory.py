@@ -0,0 +1,90 @@
+"""
+Public member directories
+The alumni and students pages show one page of approved members at a time.
+Trophies and points for the visible page come from one IN query each, and the
+header stats and course/year filter options from aggregate queries cached per
+status until a member or user changes (in any worker).
+"""
+
+import os
+from collections import defaultdict
+from sqlalchemy import func, or_
+from app import db
+from app.cache import TTLCache
+from app.models import Member, MemberTrophy, RewardTransaction, Trophy, User
+from app.page_cache import model_versions, track_versions
+
+_stats_cache = TTLCache('directory_stats', ttl=int(os.environ.get('DIRECTORY_STATS_TTL', '600')), max_entries=20)
+
+
+def directory_query(status, course='', year='', search=''):
+    """Approved members with ``status``, filtered and ordered by name"""
+    query = Member.query.join(User, User.id == Member.user_id).filter(
+        User.is_approved == True,
+        Member.status == status,
+    )
+    if course:
+        query = query.filter(Member.course == course)
+    if year:
+        query = query.filter(Member.year == year)
+    search = (search or '').strip()
+    if search:
+        query = query.filter(or_(Member.full_name.ilike(f'%{search}%'), Member.title.ilike(f'%{search}%')))
+    return query.order_by(Member.full_name.asc(), Member.id.asc())
+
+
+def attach_badges(members):
+    """Set ``trophies`` and ``total_points`` on each member with one query apiece"""
+    members = list(members)
+    if not members:
+        return members
+    ids = [member.id for member in members]
+
+    points = dict(db.session.query(RewardTransaction.member_id, func.sum(RewardTransaction.points))
+                  .filter(RewardTransaction.member_id.in_(ids))
+                  .group_by(RewardTransaction.member_id))
+
+    trophies = defaultdict(list)
+    rows = db.session.query(MemberTrophy.member_id, Trophy).join(Trophy, Trophy.id == MemberTrophy.trophy_id) \
+        .filter(MemberTrophy.member_id.in_(ids)).order_by(Trophy.display_order.asc(), Trophy.id.asc())
+    for member_id, trophy in rows:
+        trophies[member_id].append(trophy)
+
+    for member in members:
+        member.total_points = points.get(member.id) or 0
+        member.trophies = trophies[member.id]
+    return members
+
+
+def _load_stats(status):
+    approved = db.session.query(Member).join(User, User.id == Member.user_id).filter(
+        User.is_approved == True,
+        Member.status == status,
+    )
+    total, companies = approved.with_entities(
+        func.count(Member.id),
+        func.count(func.distinct(func.nullif(Member.title, ''))),
+    ).one()
+    courses = approved.with_entities(Member.course).filter(Member.course.isnot(None), Member.course != '') \
+        .distinct().order_by(Member.course.asc())
+    years = approved.with_entities(Member.year).filter(Member.year.isnot(None), Member.year != '') \
+        .distinct().order_by(Member.year.asc())
+    return {
+        'count': total or 0,
+        'companies_count': companies or 0,
+        'courses': [row[0] for row in courses],
+        'years': [row[0] for row in years],
+    }
+
+
+def directory_stats(status):
+    """
+    Returns:
+        dict: ``count``, ``companies_count`` (distinct titles), and the ``courses`` and ``years``
+        filter options for approved members with ``status``
+    """
+    key = (status, model_versions(Member, User))
+    return _stats_cache.get_or_set(key, lambda: _load_stats(status))
+
+
+track_versions(Member, User)
@@ -0,0 +1,262 @@
+"""
+Financial rollups
+Totals and transaction counts per (period, category, type) live in the
+financial_rollup table, so the financial overview, period, category and report
+pages read them with one grouped query instead of several SUM/COUNT queries
+per period or category.
+
+Every ORM insert, edit or delete of a FinancialTransaction adjusts the rows in
+the same flush. Closed periods are frozen: their rows are rebuilt as a snapshot
+when the period is closed and left alone until it is reopened. Writes that
+bypass the ORM (bulk imports, raw SQL) need ``flask finance rebuild-rollups``.
+"""
+
+from collections import defaultdict
+from datetime import datetime
+from sqlalchemy import delete, event, exists, func, insert, literal, or_, select
+from app import db
+from app.database import upsert_statement
+from app.models import FinancialCategory, FinancialPeriod, FinancialRollup, FinancialTransaction
+
+_KEY_COLUMNS = ('financial_period_id', 'category_id', 'transaction_type')
+
+
+class PeriodTotals:
+    """Revenue and expense totals for one period (or several combined)"""
+
+    def __init__(self):
+        self.revenue = 0
+        self.expenses = 0
+        self.revenue_count = 0
+        self.expense_count = 0
+
+    @property
+    def net(self):
+        return self.revenue - self.expenses
+
+    @property
+    def count(self):
+        return self.revenue_count + self.expense_count
+
+    def add(self, transaction_type, amount, count):
+        if transaction_type == 'revenue':
+            self.revenue += amount or 0
+            self.revenue_count += count or 0
+        elif transaction_type == 'expense':
+            self.expenses += amount or 0
+            self.expense_count += count or 0
+
+
+class CategoryTotals:
+    """Total amount and transaction count for one category"""
+
+    def __init__(self):
+        self.total = 0
+        self.count = 0
+
+
+def period_totals(period_ids=None):
+    """
+    Totals per period from one grouped query
+
+    Returns:
+        defaultdict: period id -> PeriodTotals (zeros for periods without transactions)
+    """
+    query = db.session.query(
+        FinancialRollup.financial_period_id,
+        FinancialRollup.transaction_type,
+        func.sum(FinancialRollup.total_amount),
+        func.sum(FinancialRollup.transaction_count),
+    ).group_by(FinancialRollup.financial_period_id, FinancialRollup.transaction_type)
+    if period_ids is not None:
+        query = query.filter(FinancialRollup.financial_period_id.in_(list(period_ids)))
+
+    totals = defaultdict(PeriodTotals)
+    for period_id, transaction_type, amount, count in query:
+        totals[period_id].add(transaction_type, amount, count)
+    return totals
+
+
+def combined_totals(totals):
+    """All-time totals from a period_totals() result"""
+    combined = PeriodTotals()
+    for item in totals.values():
+        combined.add('revenue', item.revenue, item.revenue_count)
+        combined.add('expense', item.expenses, item.expense_count)
+    return combined
+
+
+def category_totals(category_ids=None, period_id=None):
+    """
+    Totals per category (optionally within one period) from one grouped query
+
+    Returns:
+        defaultdict: category id -> CategoryTotals
+    """
+    query = db.session.query(
+        FinancialRollup.category_id,
+        func.sum(FinancialRollup.total_amount),
+        func.sum(FinancialRollup.transaction_count),
+    ).group_by(FinancialRollup.category_id)
+    if category_ids is not None:
+        query = query.filter(FinancialRollup.category_id.in_(list(category_ids)))
+    if period_id is not None:
+        query = query.filter(FinancialRollup.financial_period_id == period_id)
+
+    totals = defaultdict(CategoryTotals)
+    for category_id, amount, count in query:
+        totals[category_id].total = amount or 0
+        totals[category_id].count = count or 0
+    return totals
+
+
+def category_breakdown(period_id=None):
+    """(name, type, total) rows per category with transactions, largest first"""
+    total = func.sum(FinancialRollup.total_amount)
+    query = db.session.query(
+        FinancialCategory.name,
+        FinancialCategory.type,
+        total.label('total'),
+    ).join(FinancialRollup, FinancialRollup.category_id == FinancialCategory.id)
+    if period_id is not None:
+        query = query.filter(FinancialRollup.financial_period_id == period_id)
+    return query.group_by(
+        FinancialCategory.id, FinancialCategory.name, FinancialCategory.type
+    ).having(func.sum(FinancialRollup.transaction_count) > 0).order_by(total.desc()).all()
+
+
+def rebuild_rollups(period_ids=None, include_closed=False):
+    """
+    Recompute rollup rows from the transactions (in the caller's transaction)
+
+    Closed periods keep their snapshot unless ``include_closed`` is set or they
+    have never been rolled up.
+
+    Returns:
+        list: ids of the periods rebuilt
+    """
+    query = select(FinancialPeriod.id)
+    if period_ids is not None:
+        query = query.where(FinancialPeriod.id.in_(list(period_ids)))
+    if not include_closed:
+        has_rollup = exists().where(FinancialRollup.financial_period_id == FinancialPeriod.id)
+        query = query.where(or_(FinancialPeriod.status != 'closed', ~has_rollup))
+    ids = list(db.session.execute(query).scalars())
+    if not ids:
+        return []
+
+    table = FinancialRollup.__table__
+    db.session.execute(delete(table).where(table.c.financial_period_id.in_(ids)))
+    grouped = select(
+        FinancialTransaction.financial_period_id,
+        FinancialTransaction.category_id,
+        FinancialTransaction.transaction_type,
+        func.sum(FinancialTransaction.amount),
+        func.count(FinancialTransaction.id),
+        literal(datetime.utcnow(), type_=db.DateTime),
+    ).where(FinancialTransaction.financial_period_id.in_(ids)).group_by(
+        FinancialTransaction.financial_period_id,
+        FinancialTransaction.category_id,
+        FinancialTransaction.transaction_type,
+    )
+    db.session.execute(insert(table).from_select(
+        [*_KEY_COLUMNS, 'total_amount', 'transaction_count', 'updated_at'], grouped
+    ))
+    return ids
+
+
+def _collect_deltas(session, connection):
+    """Net (amount, count) change per rollup key from the pending unit of work"""
+    deltas = defaultdict(lambda: [0.0, 0])
+
+    def add(key, amount, count):
+        deltas[key][0] += amount or 0
+        deltas[key][1] += count
+
+    changed = [
+        instance for instance in session.dirty
+        if isinstance(instance, FinancialTransaction) and session.is_modified(instance)
+    ]
+    removed = [instance for instance in session.deleted if isinstance(instance, FinancialTransaction)]
+
+    # Stored values, read before the UPDATE/DELETE runs (expired instances carry no history)
+    stored_ids = [instance.id for instance in changed + removed if instance.id is not None]
+    if stored_ids:
+        table = FinancialTransaction.__table__
+        for row in connection.execute(
+            select(table.c.financial_period_id, table.c.category_id, table.c.transaction_type, table.c.amount)
+            .where(table.c.id.in_(stored_ids))
+        ):
+            add((row.financial_period_id, row.category_id, row.transaction_type), -(row.amount or 0), -1)
+
+    for instance in list(session.new) + changed:
+        if isinstance(instance, FinancialTransaction):
+            add(tuple(getattr(instance, k) for k in _KEY_COLUMNS), instance.amount, 1)
+
+    return {key: value for key, value in deltas.items() if value[1] or value[0]}
+
+
+def _apply_deltas(connection, deltas):
+    table = FinancialRollup.__table__
+    dialect = connection.dialect.name
+    now = datetime.utcnow()
+    rows = [
+        {
+            'financial_period_id': period_id, 'category_id': category_id, 'transaction_type': transaction_type,
+            'total_amount': amount, 'transaction_count': count, 'updated_at': now,
+        }
+        for (period_id, category_id, transaction_type), (amount, count) in deltas.items()
+    ]
+    stmt = upsert_statement(
+        dialect, table, rows,
+        index_elements=list(_KEY_COLUMNS),
+        build_set=lambda excluded: {
+            'total_amount': table.c.total_amount + excluded.total_amount,
+            'transaction_count': table.c.transaction_count + excluded.transaction_count,
+            'updated_at': excluded.updated_at,
+        }
+    )
+    if stmt is not None:
+        connection.execute(stmt)
+        return
+
+    # Update-then-insert fallback for databases without ON CONFLICT
+    for row in rows:
+        key = (
+            (table.c.financial_period_id == row['financial_period_id'])
+            & (table.c.category_id == row['category_id'])
+            & (table.c.transaction_type == row['transaction_type'])
+        )
+        result = connection.execute(table.update().where(key).values(
+            total_amount=table.c.total_amount + row['total_amount'],
+            transaction_count=table.c.transaction_count + row['transaction_count'],
+            updated_at=now,
+        ))
+        if not result.rowcount:
+            connection.execute(table.insert().values(**row))
+
+
+def _maintain_rollups(session, flush_context, instances):
+    if not any(
+        isinstance(instance, FinancialTransaction)
+        for group in (session.new, session.dirty, session.deleted) for instance in group
+    ):
+        return
+    connection = session.connection()
+    deltas = _collect_deltas(session, connection)
+    if not deltas:
+        return
+    frozen = set(connection.execute(
+        select(FinancialPeriod.id).where(
+            FinancialPeriod.id.in_({key[0] for key in deltas}),
+            FinancialPeriod.status == 'closed',
+        )
+    ).scalars())
+    deltas = {key: value for key, value in deltas.items() if key[0] not in frozen}
+    if deltas:
+        _apply_deltas(connection, deltas)
+
+
+# before_flush: the stored values of edited and deleted rows are still in the database
+if not event.contains(db.session, 'before_flush', _maintain_rollups):
+    event.listen(db.session, 'before_flush', _maintain_rollups)
@@ -0,0 +1,73 @@
+"""
+Guards of the Week widget data
+The current guard per competition level is cached per worker and rebuilt after a TTL
+or once a guard or member commit in any worker moves the shared versions.
+"""
+
+import os
+from types import SimpleNamespace
+from flask import current_app
+from app import db
+from app.cache import TTLCache
+from app.models import CompetitionGuard, Member
+from app.page_cache import model_versions, track_versions
+
+_guards_cache = TTLCache('guards', ttl=int(os.environ.get('GUARDS_CACHE_TTL', '300')), max_entries=20)
+
+
+def _load_current_guards():
+    """Latest guard per level, read with one windowed query"""
+    ranked = db.session.query(
+        CompetitionGuard.id.label('id'),
+        db.func.row_number().over(
+            partition_by=CompetitionGuard.level,
+            order_by=(CompetitionGuard.created_at.desc(), CompetitionGuard.id.desc())
+        ).label('position')
+    ).subquery()
+
+    rows = db.session.query(
+        CompetitionGuard.level,
+        CompetitionGuard.week_start,
+        CompetitionGuard.week_end,
+        CompetitionGuard.work_link,
+        Member.full_name,
+        Member.profile_image,
+    ).join(ranked, ranked.c.id == CompetitionGuard.id).join(
+        Member, Member.id == CompetitionGuard.member_id
+    ).filter(ranked.c.position == 1).order_by(
+        CompetitionGuard.created_at.desc(),
+        CompetitionGuard.id.desc()
+    ).limit(3).all()
+
+    # Plain records rather than ORM objects, so cached values never touch a closed session
+    guards = [
+        SimpleNamespace(
+            level=row.level,
+            week_start=row.week_start,
+            week_end=row.week_end,
+            work_link=row.work_link,
+            member=SimpleNamespace(full_name=row.full_name, profile_image=row.profile_image),
+        )
+        for row in rows
+    ]
+    guards.sort(key=lambda item: item.level)
+    return guards
+
+
+def get_current_guards():
+    """Current guard per level for the widget, served from the process-wide cache"""
+    try:
+        return _guards_cache.get_or_set(model_versions(CompetitionGuard, Member), _load_current_guards)
+    except Exception:
+        db.session.rollback()
+        current_app.logger.exception('Failed to load guards of the week')
+        return []
+
+
+def invalidate_guards():
+    """Forget this worker's cached guards at once (other workers follow the shared versions)"""
+    _guards_cache.invalidate()
+
+
+# Guards (and the winners' names and photos) follow commits made in any worker
+track_versions(CompetitionGuard, Member)
@@ -13,9 +13,22 @@ from io import BytesIO
 from flask import current_app, request
 import requests
 import math
+from app import metrics
+
+
+_font_cache = None
+_logo_cache = {}
 
 
 def load_fonts():
+    """Load fonts once per process (shared copy-on-write by preloaded gunicorn workers)"""
+    global _font_cache
+    if _font_cache is None:
+        _font_cache = _load_fonts()
+    return _font_cache
+
+
+def _load_fonts():
     """Load fonts with proper fallbacks - includes bold variants"""
     fonts = {}
     
@@ -190,6 +203,15 @@ def create_glass_effect(draw, x, y, width, height, radius=20):
 
 
 def load_and_process_logo(logo_path, target_size):
+    """Rasterised logo for ``target_size``, rendered once per process and copied per card"""
+    key = (logo_path, tuple(target_size))
+    if key not in _logo_cache:
+        _logo_cache[key] = _render_logo(logo_path, target_size)
+    logo = _logo_cache[key]
+    return logo.copy() if logo is not None else None
+
+
+def _render_logo(logo_path, target_size):
     """Load SVG logo and convert to usable image"""
     try:
         # Try to use cairosvg if available for best quality
@@ -241,6 +263,14 @@ def load_and_process_logo(logo_path, target_size):
         return None
 
 
+def warm_assets(app):
+    """Load fonts and rasterise the card logos ahead of the first ID render"""
+    load_fonts()
+    logo_path = os.path.join(app.root_path, 'static', 'DigitalClub_LOGO copy.svg')
+    for size in ((140, 140), (100, 100)):
+        load_and_process_logo(logo_path, size)
+
+
 def generate_digital_id_front(member, base_url="https://databd.auriumlabs.com"):
     """
     Generate the FRONT side of the digital ID card - PREMIUM EDITION
@@ -922,6 +952,7 @@ def generate_digital_id_back(member, base_url="https://databd.auriumlabs.com"):
     return img
 
 
+@metrics.timed(metrics.ID_RENDER_TIME)
 def generate_digital_id(member, base_url=None):
     """
     Generate both front and back digital ID cards for a member
@@ -957,12 +988,74 @@ def generate_digital_id(member, base_url=None):
     front_img.save(front_path, 'PNG', quality=95)
     back_img.save(back_path, 'PNG', quality=95)
     
+    # Small previews for the admin ID gallery
+    _save_thumbnail(front_img, get_thumbnail_path(front_filename))
+    _save_thumbnail(back_img, get_thumbnail_path(back_filename))
+    
     # Update member record (store front path for backward compatibility)
     member.digital_id_path = front_filename
     
     return front_filename, back_filename
 
 
+THUMBNAIL_WIDTH = 360
+THUMBNAIL_QUALITY = 82
+
+
+def get_back_filename(front_filename):
+    """Return the back-side filename for a stored front-side ID filename"""
+    back_filename = front_filename.replace('_front.png', '_back.png')
+    if not back_filename.endswith('_back.png'):
+        # Handle old format (no _front suffix)
+        back_filename = front_filename.replace('.png', '_back.png')
+    return back_filename
+
+
+def get_thumbnail_path(filename):
+    """Absolute path of the preview thumbnail for a digital ID image"""
+    name = os.path.splitext(os.path.basename(filename))[0]
+    return os.path.join(current_app.config['UPLOAD_FOLDER'], 'digital_ids', 'thumbs', f"{name}.jpg")
+
+
+def _save_thumbnail(img, thumb_path):
+    """Save a downscaled JPEG copy of a card image"""
+    os.makedirs(os.path.dirname(thumb_path), exist_ok=True)
+    thumb = img.convert('RGB')
+    height = round(thumb.height * THUMBNAIL_WIDTH / thumb.width)
+    thumb = thumb.resize((THUMBNAIL_WIDTH, height), Image.Resampling.LANCZOS)
+    thumb.save(thumb_path, 'JPEG', quality=THUMBNAIL_QUALITY, optimize=True)
+
+
+def ensure_thumbnail(filename):
+    """
+    Return the thumbnail path for a digital ID image, creating it if missing or stale
+    
+    Cards generated before thumbnails existed get their preview rendered lazily
+    on first request and reused afterwards.
+    
+    Returns:
+        str or None: thumbnail path, or None if the source image does not exist
+    """
+    source_path = os.path.join(current_app.config['UPLOAD_FOLDER'], 'digital_ids', os.path.basename(filename))
+    if not os.path.exists(source_path):
+        return None
+    
+    thumb_path = get_thumbnail_path(filename)
+    if not os.path.exists(thumb_path) or os.path.getmtime(thumb_path) < os.path.getmtime(source_path):
+        with Image.open(source_path) as img:
+            _save_thumbnail(img, thumb_path)
+    return thumb_path
+
+
+def get_image_version(filename):
+    """Modification time of a digital ID image, used to cache-bust preview URLs"""
+    path = os.path.join(current_app.config['UPLOAD_FOLDER'], 'digital_ids', os.path.basename(filename))
+    try:
+        return int(os.path.getmtime(path))
+    except OSError:
+        return 0
+
+
 def delete_digital_id(member):
     """Delete a member's digital ID files (both front and back)"""
     if not member.digital_id_path:
@@ -979,11 +1072,7 @@ def delete_digital_id(member):
             os.remove(front_path)
         
         # Delete back card
-        back_filename = member.digital_id_path.replace('_front.png', '_back.png')
-        if not back_filename.endswith('_back.png'):
-            # Handle old format (no _front suffix)
-            back_filename = member.digital_id_path.replace('.png', '_back.png')
-        
+        back_filename = get_back_filename(member.digital_id_path)
         back_path = os.path.join(
             current_app.config['UPLOAD_FOLDER'], 
             'digital_ids', 
@@ -991,5 +1080,11 @@ def delete_digital_id(member):
         )
         if os.path.exists(back_path):
             os.remove(back_path)
+        
+        # Delete preview thumbnails
+        for filename in (member.digital_id_path, back_filename):
+            thumb_path = get_thumbnail_path(filename)
+            if os.path.exists(thumb_path):
+                os.remove(thumb_path)
     except Exception as e:
         print(f"Error deleting digital ID: {e}")
\ No newline at end of file
@@ -0,0 +1,80 @@
+"""
+Identity cache for Flask-Login
+The user and member profile are loaded with one joined query and kept per
+worker for a short TTL, so hot sessions skip the database on every request.
+Entries are stored with the shared User and Member versions: a role change,
+deactivation, password reset or profile edit committed in any worker drops
+every worker's entries on their next request.
+"""
+
+import os
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import joinedload, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+from app import db
+from app.cache import TTLCache, invalidate_on_commit
+from app.models import User, Member
+from app.page_cache import model_versions, track_versions
+
+_identity_cache = TTLCache(
+    'identity',
+    ttl=int(os.environ.get('IDENTITY_CACHE_TTL', '30')),
+    max_entries=int(os.environ.get('IDENTITY_CACHE_MAX_ENTRIES', '5000')),
+)
+
+
+def _columns(instance):
+    return {attr.key: getattr(instance, attr.key) for attr in sa_inspect(type(instance)).column_attrs}
+
+
+def _snapshot(user):
+    """Plain column values of a user and its member profile"""
+    return _columns(user), (_columns(user.member) if user.member else None)
+
+
+def _restore(snapshot):
+    """Rebuild a session-bound user (and member) from a snapshot without querying"""
+    user_columns, member_columns = snapshot
+    user = User(**user_columns)
+    member = Member(**member_columns) if member_columns else None
+    set_committed_value(user, 'member', member)
+    make_transient_to_detached(user)
+    if member is not None:
+        set_committed_value(member, 'user', user)
+        make_transient_to_detached(member)
+    # Fresh objects per request; load=False attaches them as if just loaded
+    return db.session.merge(user, load=False)
+
+
+def load_identity(user_id):
+    """Return the user for ``user_id`` with its member profile already loaded"""
+    version = model_versions(User, Member)
+    cached = _identity_cache.get(user_id)
+    if cached is not None and cached[0] == version:
+        return _restore(cached[1])
+    
+    # populate_existing: a snapshot restored earlier in this session must not shadow the fresh row
+    user = User.query.options(joinedload(User.member)).filter(User.id == user_id).populate_existing().first()
+    if user is not None:
+        _identity_cache.set(user_id, (version, _snapshot(user)))
+    return user
+
+
+def invalidate_identity(user_id=None):
+    """Drop a cached identity (or all of them)"""
+    _identity_cache.invalidate(user_id)
+
+
+def _identity_key(instance):
+    return instance.id if isinstance(instance, User) else instance.user_id
+
+
+def _invalidate_identities(user_ids):
+    for user_id in user_ids:
+        _identity_cache.invalidate(user_id)
+
+
+# Role changes, (de)activation, password and profile edits all flush User/Member rows
+invalidate_on_commit((User, Member), _invalidate_identities, key=_identity_key)
+# Other workers follow User/Member commits through the shared versions
+track_versions(User, Member)
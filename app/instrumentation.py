@@ -0,0 +1,231 @@
+"""
+Per-request SQL instrumentation
+Counts queries and database time for every request, flags statements that run
+many times with the same shape (the N+1 pattern: one lazy load per row), and
+reports them through log lines, a Server-Timing header and an admin-only panel.
+Views can declare a budget with ``@perf_budget``; the benchmark suite
+(tests/test_benchmarks.py) enforces it and requests over it are logged.
+
+Settings (environment):
+    QUERY_INSTRUMENTATION   1/0, default 1
+    N_PLUS_ONE_THRESHOLD    repeats of one statement shape that count as N+1, default 5
+    QUERY_COUNT_WARNING     log requests running more queries than this, default 50
+    SERVER_TIMING           1/0, send the Server-Timing header, default 1
+"""
+
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from flask import g, has_request_context, render_template, request, session
+from sqlalchemy import event
+
+_PLACEHOLDER = r'(?:\?|%s|%\(\w+\)s|:\w+|\$\d+)'
+_IN_LIST = re.compile(r'\(\s*' + _PLACEHOLDER + r'(?:\s*,\s*' + _PLACEHOLDER + r')*\s*\)')
+_NUMBER = re.compile(r'\b\d+\b')
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_WHITESPACE = re.compile(r'\s+')
+
+
+def statement_shape(statement):
+    """Normalise a SQL statement so queries differing only in parameters compare equal"""
+    shape = _STRING.sub('?', statement)
+    shape = _NUMBER.sub('?', shape)
+    shape = _IN_LIST.sub('(?)', shape)
+    return _WHITESPACE.sub(' ', shape).strip()
+
+
+class QueryStats:
+    """Queries seen during one request (or one QueryCounter block)"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration_ms = 0.0
+        self.shapes = Counter()
+        self.shape_ms = Counter()
+        self.statements = []
+
+    def record(self, statement, duration_ms, keep_statements=False):
+        shape = statement_shape(statement)
+        self.count += 1
+        self.duration_ms += duration_ms
+        self.shapes[shape] += 1
+        self.shape_ms[shape] += duration_ms
+        if keep_statements:
+            self.statements.append(statement)
+
+    def repeated(self, threshold):
+        """Statement shapes executed at least ``threshold`` times, most frequent first"""
+        return [
+            {'shape': shape, 'count': count, 'duration_ms': round(self.shape_ms[shape], 2)}
+            for shape, count in self.shapes.most_common()
+            if count >= threshold
+        ]
+
+
+def perf_budget(queries, ms):
+    """
+    Declare a view's query-count and wall-time budget
+
+    Place it directly under the route decorator so the registered view carries it:
+
+        @admin_bp.route('/members')
+        @perf_budget(queries=60, ms=1500)
+        @login_required
+        def members(): ...
+
+    Budgets are measured against the benchmark dataset in tests/test_benchmarks.py.
+    """
+    def decorator(view):
+        view.perf_budget = {'queries': queries, 'ms': ms}
+        return view
+    return decorator
+
+
+def budget_for(app, endpoint):
+    """The budget declared on ``endpoint``'s view, or None"""
+    view = app.view_functions.get(endpoint)
+    return getattr(view, 'perf_budget', None)
+
+
+# QueryCounter blocks currently listening (test helper); consulted on every query
+_active_counters = []
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get('query_started')
+    if not started:
+        return
+    duration_ms = (time.perf_counter() - started.pop()) * 1000
+    for counter in _active_counters:
+        counter.record(statement, duration_ms, keep_statements=True)
+    if has_request_context():
+        stats = g.get('query_stats')
+        if stats is not None:
+            stats.record(statement, duration_ms)
+
+
+def _debug_panel_enabled():
+    from flask_login import current_user
+    if not (current_user.is_authenticated and current_user.role == 'admin'):
+        return False
+    toggle = request.args.get('sql_debug')
+    if toggle is not None:
+        session['sql_debug'] = toggle == '1'
+    return session.get('sql_debug', False)
+
+
+def init_app(app):
+    """Attach the cursor listeners to this app's engine and the per-request hooks"""
+    import os
+    from app import db
+
+    app.config.setdefault('QUERY_INSTRUMENTATION', os.environ.get('QUERY_INSTRUMENTATION', '1') == '1')
+    app.config.setdefault('N_PLUS_ONE_THRESHOLD', int(os.environ.get('N_PLUS_ONE_THRESHOLD', '5')))
+    app.config.setdefault('QUERY_COUNT_WARNING', int(os.environ.get('QUERY_COUNT_WARNING', '50')))
+    app.config.setdefault('SERVER_TIMING', os.environ.get('SERVER_TIMING', '1') == '1')
+    if not app.config['QUERY_INSTRUMENTATION']:
+        return
+
+    with app.app_context():
+        engine = db.engine
+    if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+    @app.before_request
+    def start_query_stats():
+        g.query_stats = QueryStats()
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def report_query_stats(response):
+        stats = g.get('query_stats')
+        if stats is None or request.endpoint == 'static':
+            return response
+
+        total_ms = (time.perf_counter() - g.request_started) * 1000
+        threshold = app.config['N_PLUS_ONE_THRESHOLD']
+        repeated = stats.repeated(threshold)
+        for item in repeated:
+            app.logger.warning(
+                'N+1 suspected on %s %s: %d x %.1f ms %s',
+                request.method, request.path, item['count'], item['duration_ms'], item['shape'][:200]
+            )
+        if stats.count > app.config['QUERY_COUNT_WARNING']:
+            app.logger.warning(
+                '%s %s ran %d queries (%.1f ms in the database)',
+                request.method, request.path, stats.count, stats.duration_ms
+            )
+        budget = budget_for(app, request.endpoint)
+        if budget and stats.count > budget['queries']:
+            app.logger.warning(
+                '%s %s is over its query budget: %d > %d',
+                request.method, request.path, stats.count, budget['queries']
+            )
+
+        if app.config['SERVER_TIMING']:
+            response.headers.add(
+                'Server-Timing',
+                f'db;dur={stats.duration_ms:.1f};desc="{stats.count} queries", app;dur={total_ms:.1f}'
+            )
+
+        if (response.mimetype == 'text/html' and not response.direct_passthrough
+                and not response.is_streamed and _debug_panel_enabled()):
+            panel = render_template(
+                'admin/sql_debug_panel.html',
+                stats=stats,
+                repeated=repeated,
+                threshold=threshold,
+                total_ms=total_ms,
+                top_shapes=stats.shapes.most_common(15),
+            )
+            body = response.get_data(as_text=True)
+            if '</body>' in body:
+                response.set_data(body.replace('</body>', panel + '</body>', 1))
+        return response
+
+
+class QueryCounter:
+    """
+    Collects every statement run on any instrumented engine while active
+
+    Usage:
+        with QueryCounter() as queries:
+            client.get('/events')
+        assert queries.count <= 5
+    """
+
+    def __enter__(self):
+        self.stats = QueryStats()
+        _active_counters.append(self.stats)
+        return self.stats
+
+    def __exit__(self, *exc_info):
+        _active_counters.remove(self.stats)
+        return False
+
+
+@contextmanager
+def assert_max_queries(limit, allow_repeats=None):
+    """
+    Fail if the block runs more than ``limit`` queries
+
+    When ``allow_repeats`` is given, also fail if any single statement shape
+    repeats more than that many times (an N+1 that a loose budget would hide).
+    """
+    with QueryCounter() as stats:
+        yield stats
+    problems = []
+    if stats.count > limit:
+        problems.append(f'{stats.count} queries ran, budget is {limit}')
+    if allow_repeats is not None:
+        for item in stats.repeated(allow_repeats + 1):
+            problems.append(f"statement repeated {item['count']} times: {item['shape'][:200]}")
+    if problems:
+        listing = '\n'.join(f'  {i + 1}. {s[:200]}' for i, s in enumerate(stats.statements))
+        raise AssertionError('; '.join(problems) + '\nQueries:\n' + listing)
@@ -0,0 +1,355 @@
+"""
+Member index for QR scans at the door
+admin.member_lookup answers each scan from a per-worker dict of
+member_id_number -> MemberSummary, a compact record holding everything the
+scan card shows. The index is built with a few bulk queries (in the gunicorn
+master under preload, otherwise on a worker's first scan) and a miss falls
+back to the database for that one member.
+
+Commits touching a member, their user, points, trophies, payments or
+check-ins append the member to a change log shared by every worker; each
+worker drops those entries before its next lookup. Renaming a trophy or an
+event drops the whole index. Writes that bypass the ORM show up after the
+periodic rebuild.
+
+Settings (environment):
+    MEMBER_INDEX            1/0, default 1
+    MEMBER_INDEX_DIR        change log directory, default <instance>/member_index
+    MEMBER_INDEX_MAX_AGE    seconds before a full rebuild, default 3600
+"""
+
+import os
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from sqlalchemy import func, inspect, select
+from sqlalchemy.orm import object_session
+from app import db, metrics
+from app.cache import invalidate_on_commit
+from app.models import Event, Member, MemberTrophy, MembershipPayment, RewardTransaction, RSVP, Trophy, User
+
+RECENT_ATTENDANCE = 5
+# The log is replaced once it grows past this; every worker then rebuilds
+MAX_LOG_BYTES = 256 * 1024
+_DROP_ALL = '*'
+
+
+class MemberSummary:
+    """What a door scan shows about one member"""
+
+    __slots__ = (
+        'id', 'user_id', 'member_id_number', 'full_name', 'email', 'phone', 'profile_image',
+        'course', 'year', 'status', 'total_points', 'trophies', 'payment_periods',
+        'latest_payment', 'recent_attendance',
+    )
+
+    def __init__(self, **values):
+        for name in self.__slots__:
+            setattr(self, name, values.get(name))
+
+    def membership_status(self, today):
+        """'valid', 'expired' or 'none', as Member.get_membership_status()"""
+        if not self.payment_periods:
+            return 'none'
+        if any(start <= today <= end for start, end in self.payment_periods):
+            return 'valid'
+        return 'expired'
+
+    def to_dict(self):
+        today = datetime.utcnow().date()
+        latest = None
+        if self.latest_payment:
+            amount, end_date = self.latest_payment
+            latest = {
+                'amount': amount,
+                'end_date': end_date.strftime('%Y-%m-%d'),
+                'days_remaining': (end_date - today).days,
+            }
+        return {
+            'id': self.id,
+            'member_id_number': self.member_id_number,
+            'full_name': self.full_name,
+            'email': self.email,
+            'phone': self.phone,
+            'profile_image': self.profile_image,
+            'course': self.course,
+            'year': self.year,
+            'status': self.status,
+            'total_points': self.total_points,
+            'membership_status': self.membership_status(today),
+            'trophies': [{'name': name, 'icon': icon} for name, icon in self.trophies],
+            'latest_payment': latest,
+            'recent_attendance': [{'event': title, 'date': day} for title, day in self.recent_attendance],
+        }
+
+
+def load_summaries(member_ids=None, member_id_number=None):
+    """
+    Build summaries with one query per related table
+
+    Returns:
+        list: MemberSummary for every member, the given ids, or the given ID number
+    """
+    query = select(
+        Member.id, Member.user_id, Member.member_id_number, Member.full_name, User.email, Member.phone,
+        Member.profile_image, Member.course, Member.year, Member.status,
+    ).join(User, User.id == Member.user_id).where(Member.member_id_number.isnot(None))
+    if member_id_number is not None:
+        query = query.where(Member.member_id_number == member_id_number)
+    elif member_ids is not None:
+        query = query.where(Member.id.in_(list(member_ids)))
+    rows = db.session.execute(query).all()
+    if not rows:
+        return []
+
+    def scoped(statement, column):
+        # A full build reads whole tables; a partial one only the members it loads
+        if member_ids is None and member_id_number is None:
+            return statement
+        return statement.where(column.in_([row.id for row in rows]))
+
+    points = dict(db.session.execute(scoped(
+        select(RewardTransaction.member_id, func.sum(RewardTransaction.points)).group_by(RewardTransaction.member_id),
+        RewardTransaction.member_id,
+    )).all())
+
+    trophies = defaultdict(list)
+    for member_id, name, icon in db.session.execute(scoped(
+        select(MemberTrophy.member_id, Trophy.name, Trophy.icon).join(Trophy, Trophy.id == MemberTrophy.trophy_id)
+        .order_by(Trophy.display_order.asc(), Trophy.id.asc()),
+        MemberTrophy.member_id,
+    )):
+        trophies[member_id].append((name, icon))
+
+    periods, latest = defaultdict(list), {}
+    for member_id, amount, start_date, end_date in db.session.execute(scoped(
+        select(MembershipPayment.member_id, MembershipPayment.amount, MembershipPayment.start_date,
+               MembershipPayment.end_date).order_by(MembershipPayment.end_date.desc()),
+        MembershipPayment.member_id,
+    )):
+        periods[member_id].append((start_date, end_date))
+        latest.setdefault(member_id, (amount, end_date))
+
+    ranked = scoped(
+        select(
+            RSVP.member_id, Event.title, RSVP.checked_in_at,
+            func.row_number().over(partition_by=RSVP.member_id, order_by=RSVP.checked_in_at.desc()).label('position'),
+        ).join(Event, Event.id == RSVP.event_id).where(RSVP.checked_in == True, RSVP.member_id.isnot(None)),
+        RSVP.member_id,
+    ).subquery()
+    attendance = defaultdict(list)
+    for member_id, title, checked_in_at in db.session.execute(
+        select(ranked.c.member_id, ranked.c.title, ranked.c.checked_in_at)
+        .where(ranked.c.position <= RECENT_ATTENDANCE)
+        .order_by(ranked.c.member_id, ranked.c.position)
+    ):
+        attendance[member_id].append((title, checked_in_at.strftime('%Y-%m-%d') if checked_in_at else ''))
+
+    return [
+        MemberSummary(
+            id=row.id, user_id=row.user_id, member_id_number=row.member_id_number, full_name=row.full_name,
+            email=row.email, phone=row.phone, profile_image=row.profile_image, course=row.course,
+            year=row.year, status=row.status,
+            total_points=points.get(row.id) or 0,
+            trophies=tuple(trophies[row.id]),
+            payment_periods=tuple(periods[row.id]),
+            latest_payment=latest.get(row.id),
+            recent_attendance=tuple(attendance[row.id]),
+        )
+        for row in rows
+    ]
+
+
+class MemberIndex:
+    """Per-worker member_id_number -> MemberSummary map kept current through a shared change log"""
+
+    def __init__(self):
+        self.app = None
+        self.enabled = True
+        self.max_age = 3600
+        self.log_path = None
+        self.hits = 0
+        self.misses = 0
+        self._by_number = {}
+        self._number_of = {}    # member id -> member_id_number
+        self._member_of = {}    # user id -> member id
+        self._built_at = None
+        self._log_position = (None, 0)  # (inode, bytes read)
+        self._lock = threading.RLock()
+
+    def init_app(self, app):
+        if self.app is not None:
+            return
+        self.app = app
+        self.enabled = os.environ.get('MEMBER_INDEX', '1') == '1'
+        self.max_age = int(os.environ.get('MEMBER_INDEX_MAX_AGE', '3600'))
+        directory = os.environ.get('MEMBER_INDEX_DIR') or os.path.join(app.instance_path, 'member_index')
+        os.makedirs(directory, exist_ok=True)
+        self.log_path = os.path.join(directory, 'changes.log')
+
+    def __len__(self):
+        return len(self._by_number)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._by_number),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else None,
+            'built_at': self._built_at,
+        }
+
+    def build(self):
+        """Load every member with an ID number (needs an app context); returns the entry count"""
+        with self._lock:
+            # Changes logged while the queries run are replayed on the next lookup
+            position = self._log_stat()
+            summaries = load_summaries()
+            self._clear()
+            for summary in summaries:
+                self._store(summary)
+            self._log_position = position
+            self._built_at = time.time()
+            return len(summaries)
+
+    def lookup(self, member_id_number):
+        """
+        Returns:
+            MemberSummary or None when no member has that ID number
+        """
+        if not self.enabled or self.log_path is None:
+            summaries = load_summaries(member_id_number=member_id_number)
+            return summaries[0] if summaries else None
+
+        with self._lock:
+            self._sync()
+            if self._built_at is None or time.time() - self._built_at > self.max_age:
+                self.build()
+            summary = self._by_number.get(member_id_number)
+            hit = summary is not None
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        metrics.record_cache_lookup('member_index', hit)
+        if hit:
+            return summary
+
+        summaries = load_summaries(member_id_number=member_id_number)
+        if not summaries:
+            return None
+        with self._lock:
+            self._store(summaries[0])
+        return summaries[0]
+
+    def forget(self, keys):
+        """Drop the entries for ``keys`` ('m:<member id>', 'u:<user id>' or '*')"""
+        with self._lock:
+            for key in keys:
+                if key == _DROP_ALL:
+                    self._clear()
+                    return
+                kind, _, value = key.partition(':')
+                if not value.isdigit():
+                    continue
+                member_id = int(value) if kind == 'm' else self._member_of.get(int(value))
+                number = self._number_of.pop(member_id, None)
+                summary = self._by_number.pop(number, None)
+                if summary is not None:
+                    self._member_of.pop(summary.user_id, None)
+
+    def publish(self, keys):
+        """Forget ``keys`` here and append them to the log for the other workers"""
+        keys = {key for key in keys if key}
+        if not keys:
+            return
+        self.forget(keys)
+        if self.log_path is None:
+            return
+        data = ''.join(f'{key}\n' for key in sorted(keys)).encode('ascii')
+        try:
+            fd = os.open(self.log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, data)
+                size = os.fstat(fd).st_size
+            finally:
+                os.close(fd)
+            if size > MAX_LOG_BYTES:
+                self._rotate_log()
+        except OSError:
+            self.app.logger.exception('Could not write the member index change log')
+
+    def _store(self, summary):
+        previous = self._number_of.get(summary.id)
+        if previous is not None and previous != summary.member_id_number:
+            self._by_number.pop(previous, None)
+        self._by_number[summary.member_id_number] = summary
+        self._number_of[summary.id] = summary.member_id_number
+        self._member_of[summary.user_id] = summary.id
+
+    def _clear(self):
+        self._by_number, self._number_of, self._member_of = {}, {}, {}
+        self._built_at = None
+
+    def _log_stat(self):
+        try:
+            stat = os.stat(self.log_path)
+        except FileNotFoundError:
+            return None, 0
+        return stat.st_ino, stat.st_size
+
+    def _sync(self):
+        """Apply changes other workers logged since the last lookup"""
+        if self._built_at is None:
+            return
+        inode, size = self._log_stat()
+        known_inode, offset = self._log_position
+        if inode != known_inode or size < offset:
+            # The log was replaced: changes may have been lost, start over
+            self._clear()
+            return
+        if size == offset:
+            return
+        with open(self.log_path, 'rb') as f:
+            f.seek(offset)
+            data = f.read(size - offset)
+        # Only whole lines; a write in progress is picked up next time
+        complete = data[:data.rfind(b'\n') + 1]
+        self._log_position = (inode, offset + len(complete))
+        self.forget(complete.decode('ascii', 'ignore').split())
+
+    def _rotate_log(self):
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(self.log_path), prefix='.tmp-')
+        os.close(fd)
+        os.replace(temp_path, self.log_path)
+
+
+member_index = MemberIndex()
+
+
+def _member_key(instance):
+    member_id = instance.id if isinstance(instance, Member) else instance.member_id
+    return f'm:{member_id}' if member_id is not None else None
+
+
+def _renamed(instance):
+    """Drop everything when a trophy or event shown on scans is edited or deleted"""
+    session = object_session(instance)
+    if session is not None and instance in session.new:
+        return None
+    if session is not None and instance in session.deleted:
+        return _DROP_ALL
+    state = inspect(instance)
+    for attribute in ('title', 'name', 'icon', 'display_order'):
+        if attribute in state.attrs and state.attrs[attribute].history.has_changes():
+            return _DROP_ALL
+    return None
+
+
+invalidate_on_commit((Member, RewardTransaction, MemberTrophy, MembershipPayment, RSVP),
+                     member_index.publish, key=_member_key)
+invalidate_on_commit((User,), member_index.publish, key=lambda user: f'u:{user.id}')
+invalidate_on_commit((Trophy, Event), member_index.publish, key=_renamed)
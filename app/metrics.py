@@ -0,0 +1,200 @@
+"""
+Prometheus metrics
+Request latency per endpoint, database time and query counts, outbound call
+latency (Beem, SMTP, Turnstile), ID-card render and PDF export durations,
+background notification depth, database pool usage and cache hit/miss counters.
+
+Under gunicorn each worker writes its samples to PROMETHEUS_MULTIPROC_DIR
+(set up by gunicorn_conf.py) and /metrics merges every worker's files, so the
+numbers are per deployment rather than per process. Without prometheus_client
+installed every helper here is a no-op.
+"""
+
+import os
+import time
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+
+try:
+    import prometheus_client
+    from prometheus_client import Counter, Gauge, Histogram
+except ImportError:  # pragma: no cover - optional dependency
+    prometheus_client = None
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+RENDER_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60)
+
+
+class _NullMetric:
+    """Stand-in used when prometheus_client is not installed"""
+
+    def labels(self, *args, **kwargs):
+        return self
+
+    def observe(self, *args, **kwargs):
+        pass
+
+    def inc(self, *args, **kwargs):
+        pass
+
+    def dec(self, *args, **kwargs):
+        pass
+
+    def set(self, *args, **kwargs):
+        pass
+
+    def time(self):
+        return nullcontext()
+
+
+if prometheus_client is not None:
+    REQUEST_LATENCY = Histogram(
+        'http_request_duration_seconds', 'Request latency by endpoint',
+        ['blueprint', 'endpoint', 'method'], buckets=LATENCY_BUCKETS,
+    )
+    REQUESTS = Counter(
+        'http_requests_total', 'Requests by endpoint and status code',
+        ['blueprint', 'endpoint', 'method', 'status'],
+    )
+    REQUEST_DB_TIME = Histogram(
+        'http_request_db_seconds', 'Database time spent per request',
+        ['blueprint', 'endpoint'], buckets=LATENCY_BUCKETS,
+    )
+    REQUEST_QUERIES = Histogram(
+        'http_request_queries', 'SQL statements executed per request',
+        ['blueprint', 'endpoint'], buckets=QUERY_COUNT_BUCKETS,
+    )
+    OUTBOUND_LATENCY = Histogram(
+        'outbound_request_duration_seconds', 'Latency of calls to external services',
+        ['service', 'outcome'], buckets=LATENCY_BUCKETS,
+    )
+    ID_RENDER_TIME = Histogram(
+        'id_card_render_seconds', 'Time to render and save a member digital ID (front and back)',
+        buckets=RENDER_BUCKETS,
+    )
+    PDF_EXPORT_TIME = Histogram(
+        'member_ids_pdf_export_seconds', 'Time to build a member ID PDF export',
+        ['layout'], buckets=RENDER_BUCKETS,
+    )
+    NOTIFICATIONS_IN_FLIGHT = Gauge(
+        'notification_emails_in_flight', 'Background email sends currently running',
+        multiprocess_mode='livesum',
+    )
+    CACHE_REQUESTS = Counter(
+        'cache_requests_total', 'In-process cache lookups by result',
+        ['cache', 'result'],
+    )
+    DB_POOL_CONNECTIONS = Gauge(
+        'db_pool_connections', 'Database pool connections by state (size, checked_out, overflow)',
+        ['state'], multiprocess_mode='livesum',
+    )
+else:  # pragma: no cover - optional dependency
+    REQUEST_LATENCY = REQUESTS = REQUEST_DB_TIME = REQUEST_QUERIES = _NullMetric()
+    OUTBOUND_LATENCY = ID_RENDER_TIME = PDF_EXPORT_TIME = _NullMetric()
+    NOTIFICATIONS_IN_FLIGHT = CACHE_REQUESTS = DB_POOL_CONNECTIONS = _NullMetric()
+
+
+def enabled():
+    return prometheus_client is not None
+
+
+@contextmanager
+def track_outbound(service):
+    """Time a call to an external service; outcome is 'error' if the block raises"""
+    started = time.perf_counter()
+    outcome = 'ok'
+    try:
+        yield
+    except Exception:
+        outcome = 'error'
+        raise
+    finally:
+        OUTBOUND_LATENCY.labels(service=service, outcome=outcome).observe(time.perf_counter() - started)
+
+
+def timed(histogram, **labels):
+    """Decorator recording the wrapped function's duration in ``histogram``"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                metric = histogram.labels(**labels) if labels else histogram
+                metric.observe(time.perf_counter() - started)
+        return wrapper
+    return decorator
+
+
+def record_cache_lookup(cache_name, hit):
+    CACHE_REQUESTS.labels(cache=cache_name, result='hit' if hit else 'miss').inc()
+
+
+def record_pool_status():
+    """Set the pool gauge from this worker's pool (summed over live workers in multiprocess mode)"""
+    from app.database import pool_status
+
+    status = pool_status()
+    for state in ('size', 'checked_out', 'overflow'):
+        if state in status:
+            DB_POOL_CONNECTIONS.labels(state=state).set(status[state])
+
+
+def observe_request(blueprint, endpoint, method, status, duration, query_stats=None):
+    blueprint = blueprint or 'app'
+    endpoint = endpoint or 'unmatched'
+    REQUEST_LATENCY.labels(blueprint=blueprint, endpoint=endpoint, method=method).observe(duration)
+    REQUESTS.labels(blueprint=blueprint, endpoint=endpoint, method=method, status=str(status)).inc()
+    if query_stats is not None:
+        REQUEST_DB_TIME.labels(blueprint=blueprint, endpoint=endpoint).observe(query_stats.duration_ms / 1000)
+        REQUEST_QUERIES.labels(blueprint=blueprint, endpoint=endpoint).observe(query_stats.count)
+
+
+def render_latest():
+    """
+    Exposition text for every worker (multiprocess mode) or this process
+
+    Returns:
+        tuple: (body, content_type)
+    """
+    from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, generate_latest
+    from prometheus_client import multiprocess
+
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = prometheus_client.REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid):
+    """Drop a dead worker's live gauges (called from gunicorn's child_exit)"""
+    if prometheus_client is None or not os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        return
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(pid)
+
+
+def init_app(app):
+    """Record latency, status and SQL totals (and the pool gauge) for every request"""
+    from flask import g, request
+
+    @app.before_request
+    def start_request_timer():
+        g.metrics_started = time.perf_counter()
+
+    @app.after_request
+    def observe_request_metrics(response):
+        started = g.get('metrics_started')
+        if started is None or request.endpoint == 'static':
+            return response
+        observe_request(
+            request.blueprint, request.endpoint, request.method, response.status_code,
+            time.perf_counter() - started, g.get('query_stats'),
+        )
+        # Every worker refreshes its own share, so the summed gauge tracks the whole deployment
+        record_pool_status()
+        return response
@@ -71,6 +71,9 @@ class Member(db.Model):
     digital_id_path = db.Column(db.String(200))  # Path to generated ID image
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # Public directories list one status ordered by name
+    __table_args__ = (db.Index('ix_member_status_full_name', 'status', 'full_name'),)
+    
     # Relationship to projects
     projects = db.relationship('Project', backref='member', lazy='dynamic')
     
@@ -220,7 +223,7 @@ class Event(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text)
-    event_date = db.Column(db.DateTime, nullable=False)
+    event_date = db.Column(db.DateTime, nullable=False, index=True)
     location = db.Column(db.String(200))
     category = db.Column(db.String(50), default='workshop')  # hackathon, workshop, tech_talk, social_event
     image = db.Column(db.String(200))  # Event banner image
@@ -228,6 +231,7 @@ class Event(db.Model):
     target_audience = db.Column(db.String(20), default='everyone', nullable=False)  # everyone, members, paid_members
     allows_check_in = db.Column(db.Boolean, default=True)  # Enable attendance tracking
     check_in_points = db.Column(db.Integer, default=0)  # Points awarded for attending
+    manifest_version = db.Column(db.Integer, default=0, nullable=False)  # Bumped on every RSVP change (check-in manifest)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     def is_upcoming(self):
@@ -252,10 +256,43 @@ class Event(db.Model):
             'approved': approved,
             'rejected': rejected
         }
+
+    @staticmethod
+    def rsvp_stats_for(event_ids):
+        """get_rsvp_stats() for many events from one grouped query"""
+        stats = {event_id: {'total': 0, 'pending': 0, 'approved': 0, 'rejected': 0} for event_id in event_ids}
+        if not stats:
+            return stats
+        rows = db.session.query(RSVP.event_id, RSVP.status, db.func.count(RSVP.id)).filter(
+            RSVP.event_id.in_(list(stats))
+        ).group_by(RSVP.event_id, RSVP.status)
+        for event_id, status, count in rows:
+            stats[event_id]['total'] += count
+            if status in stats[event_id]:
+                stats[event_id][status] += count
+        return stats
+
+    @staticmethod
+    def timing_counts(query, now=None):
+        """(upcoming, past) counts for an Event query, from one aggregate"""
+        now = now or datetime.utcnow()
+        upcoming, past = query.order_by(None).with_entities(
+            db.func.coalesce(db.func.sum(db.case((Event.event_date > now, 1), else_=0)), 0),
+            db.func.coalesce(db.func.sum(db.case((Event.event_date <= now, 1), else_=0)), 0),
+        ).one()
+        return int(upcoming), int(past)
     
     def __repr__(self):
         return f'<Event {self.title}>'
 
+# Normalized Project.technologies tags (kept in sync by app.project_tags)
+project_technology = db.Table(
+    'project_technology',
+    db.Column('project_id', db.Integer, db.ForeignKey('project.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('technology_id', db.Integer, db.ForeignKey('technology.id', ondelete='CASCADE'), primary_key=True,
+              index=True),
+)
+
 class Project(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
@@ -273,6 +310,9 @@ class Project(db.Model):
     is_featured = db.Column(db.Boolean, default=False)  # Admin can feature on homepage
     is_admin_project = db.Column(db.Boolean, default=False)  # Distinguish admin vs member projects
     
+    # Technology rows named in ``technologies``
+    technology_tags = db.relationship('Technology', secondary=project_technology, backref='projects')
+    
     def get_technologies_list(self):
         if self.technologies:
             return [tech.strip() for tech in self.technologies.split(',')]
@@ -299,7 +339,7 @@ class Gallery(db.Model):
 class Technology(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False, unique=True)
-    category = db.Column(db.String(50), nullable=False)  # web, mobile, ai, iot, data, other
+    category = db.Column(db.String(50), nullable=False, index=True)  # web, mobile, ai, iot, data, other
     description = db.Column(db.Text)
     icon = db.Column(db.String(100))  # Font Awesome icon class
     is_active = db.Column(db.Boolean, default=True)
@@ -384,6 +424,10 @@ class RSVP(db.Model):
     checked_in = db.Column(db.Boolean, default=False)
     checked_in_at = db.Column(db.DateTime)
     checked_in_by = db.Column(db.Integer, db.ForeignKey('user.id'))
+    manifest_version = db.Column(db.Integer, default=0, nullable=False)  # Event.manifest_version of the last change
+    points_processed_at = db.Column(db.DateTime, index=True)  # Set once check-in points are awarded (checkin_rewards)
+    
+    __table_args__ = (db.Index('ix_rsvp_event_manifest_version', 'event_id', 'manifest_version'),)
     
     # Relationships
     event = db.relationship('Event', backref='rsvps')
@@ -409,7 +453,7 @@ class RSVP(db.Model):
 class RewardTransaction(db.Model):
     """Track reward points awarded or deducted from members"""
     id = db.Column(db.Integer, primary_key=True)
-    member_id = db.Column(db.Integer, db.ForeignKey('member.id'), nullable=False)
+    member_id = db.Column(db.Integer, db.ForeignKey('member.id'), nullable=False, index=True)
     points = db.Column(db.Integer, nullable=False)  # Positive for awards, negative for deductions
     transaction_type = db.Column(db.String(50), nullable=False)  # 'manual', 'event_checkin', 'achievement', etc.
     reason = db.Column(db.Text, nullable=False)  # Description of why points were awarded/deducted
@@ -666,6 +710,25 @@ class FinancialTransaction(db.Model):
         return f'<FinancialTransaction {self.description}: Tsh {self.amount} ({self.transaction_type})>'
 
 
+class FinancialRollup(db.Model):
+    """Transaction totals per period, category and type (maintained by app/financial_rollup.py)"""
+    __tablename__ = 'financial_rollup'
+    id = db.Column(db.Integer, primary_key=True)
+    financial_period_id = db.Column(db.Integer, db.ForeignKey('financial_period.id'), nullable=False)
+    category_id = db.Column(db.Integer, db.ForeignKey('financial_category.id'), nullable=False)
+    transaction_type = db.Column(db.String(20), nullable=False)  # revenue, expense
+    total_amount = db.Column(db.Float, nullable=False, default=0)
+    transaction_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('financial_period_id', 'category_id', 'transaction_type', name='uq_financial_rollup'),
+    )
+
+    def __repr__(self):
+        return f'<FinancialRollup {self.financial_period_id}/{self.category_id} {self.transaction_type}: {self.total_amount}>'
+
+
 # Competitions
 class CompetitionSponsor(db.Model):
     id = db.Column(db.Integer, primary_key=True)
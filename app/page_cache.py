@@ -0,0 +1,255 @@
+"""
+Full-page cache for anonymous visitors
+Public pages are stored as rendered responses, keyed by path and query string,
+in a directory shared by every gunicorn worker. Each page declares the models
+it renders; a commit touching one of them (in any worker) bumps that model's
+version file, and entries stored under the old version are never served again.
+Responses carry ETag/Last-Modified so browsers revalidate with a 304.
+A request that hit a database error (a view falling back to empty lists) or
+called skip_page_cache() is sent with no-store and never cached.
+
+Settings (environment):
+    PAGE_CACHE              1/0, default 1
+    PAGE_CACHE_DIR          default <instance>/page_cache
+    PAGE_CACHE_TTL          seconds an entry is served, default 300 (bounds
+                            time-dependent content such as "upcoming" events)
+    PAGE_CACHE_MAX_ENTRIES  entries kept on disk, default 2000
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+import uuid
+from functools import wraps
+from flask import Response, current_app, g, has_request_context, request, session
+from sqlalchemy import event as sa_event
+from sqlalchemy.engine import Engine
+from app import metrics
+from app.cache import invalidate_on_commit
+
+# Shown on every page by base.html (Guards of the Week widget)
+BASE_DEPENDENCIES = ('CompetitionGuard',)
+
+_tracked_models = set()
+
+
+def _config(app):
+    app.config.setdefault('PAGE_CACHE', os.environ.get('PAGE_CACHE', '1') == '1')
+    app.config.setdefault('PAGE_CACHE_DIR', os.environ.get('PAGE_CACHE_DIR') or os.path.join(app.instance_path, 'page_cache'))
+    app.config.setdefault('PAGE_CACHE_TTL', int(os.environ.get('PAGE_CACHE_TTL', '300')))
+    app.config.setdefault('PAGE_CACHE_MAX_ENTRIES', int(os.environ.get('PAGE_CACHE_MAX_ENTRIES', '2000')))
+    return app.config
+
+
+def _atomic_write(path, data):
+    directory = os.path.dirname(path)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except Exception:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+class FilePageStore:
+    """Entries and model version tags as files; safe to share between processes"""
+
+    def __init__(self, directory, max_entries=2000):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.tags_dir = os.path.join(directory, 'tags')
+        os.makedirs(self.tags_dir, exist_ok=True)
+
+    def version(self, tag):
+        try:
+            with open(os.path.join(self.tags_dir, tag), 'rb') as f:
+                return f.read().decode('ascii')
+        except FileNotFoundError:
+            return '0'
+
+    def bump(self, tag):
+        _atomic_write(os.path.join(self.tags_dir, tag), uuid.uuid4().hex.encode('ascii'))
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha1(key.encode('utf-8')).hexdigest() + '.page')
+
+    def get(self, key, ttl):
+        """
+        Returns:
+            tuple: (meta, body) or None when missing or older than ``ttl`` seconds
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                header = f.readline()
+                body = f.read()
+            meta = json.loads(header)
+        except (OSError, ValueError):
+            return None
+        if time.time() - meta['stored_at'] > ttl:
+            return None
+        return meta, body
+
+    def set(self, key, meta, body):
+        _atomic_write(self._path(key), json.dumps(meta).encode('utf-8') + b'\n' + body)
+        self._prune()
+
+    def clear(self):
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.page'):
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
+
+    def _prune(self):
+        """Drop the oldest entries beyond max_entries (stale versions are never read again)"""
+        entries = [entry for entry in os.scandir(self.directory) if entry.name.endswith('.page')]
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in entries[:len(entries) - self.max_entries]:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+
+_stores = {}
+
+
+def get_store(app=None):
+    app = app or current_app
+    config = _config(app)
+    directory = config['PAGE_CACHE_DIR']
+    store = _stores.get(directory)
+    if store is None:
+        store = _stores[directory] = FilePageStore(directory, config['PAGE_CACHE_MAX_ENTRIES'])
+    return store
+
+
+def _bump_models(models):
+    """after_commit callback: invalidate pages rendering these models, in every worker"""
+    try:
+        store = get_store()
+    except RuntimeError:  # committed outside an app context
+        return
+    for model in models:
+        store.bump(model.__name__)
+
+
+def track_versions(*models):
+    """
+    Bump the version tags of ``models`` on every commit touching them
+
+    Call at import time: a worker only bumps tags for models it has registered,
+    so registering lazily would miss writes made by workers that never got there.
+    """
+    new = [model for model in models if model not in _tracked_models]
+    if new:
+        _tracked_models.update(new)
+        invalidate_on_commit(tuple(new), _bump_models)
+
+
+def model_versions(*models):
+    """
+    Current version tags of ``models``, shared by every worker
+
+    They change on each commit touching the models, so other per-process caches
+    can include them in their keys to follow writes made in any worker. The
+    models must be registered with track_versions() when the caller is imported.
+    """
+    track_versions(*models)
+    store = get_store()
+    return tuple(store.version(model.__name__) for model in models)
+
+
+def skip_page_cache():
+    """Keep this request's response out of the page cache (e.g. a degraded fallback page)"""
+    if has_request_context():
+        g.skip_page_cache = True
+
+
+def _database_error(exception_context):
+    skip_page_cache()
+
+
+sa_event.listen(Engine, 'handle_error', _database_error)
+
+
+def _cacheable_request():
+    from flask_login import current_user
+
+    if request.method != 'GET' or not _config(current_app)['PAGE_CACHE']:
+        return False
+    if current_user.is_authenticated:
+        return False
+    # Pending flash messages are rendered once for this visitor only
+    return not session.get('_flashes')
+
+
+def cached_page(*models):
+    """
+    Serve the view from the page cache for anonymous GETs
+
+    ``models`` are the classes the page renders; commits touching any of them
+    (or the models in BASE_DEPENDENCIES) invalidate it.
+    """
+    from app import models as model_module
+
+    dependencies = tuple(models) + tuple(getattr(model_module, name) for name in BASE_DEPENDENCIES)
+    track_versions(*dependencies)
+    tags = sorted(model.__name__ for model in dependencies)
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not _cacheable_request():
+                return view(*args, **kwargs)
+
+            config = _config(current_app)
+            store = get_store()
+            versions = ','.join(f'{tag}:{store.version(tag)}' for tag in tags)
+            key = f'{request.full_path}|{versions}'
+
+            cached = store.get(key, config['PAGE_CACHE_TTL'])
+            metrics.record_cache_lookup('page', cached is not None)
+            if cached is not None:
+                meta, body = cached
+                response = Response(body, status=meta['status'], headers=meta['headers'])
+                response.headers['X-Page-Cache'] = 'hit'
+                return response.make_conditional(request)
+
+            response = current_app.make_response(view(*args, **kwargs))
+            if g.get('skip_page_cache'):
+                response.cache_control.no_store = True
+                return response
+            if response.status_code != 200 or response.direct_passthrough or response.is_streamed \
+                    or 'Set-Cookie' in response.headers or session.modified:
+                return response
+
+            body = response.get_data()
+            response.set_etag(hashlib.sha1(body).hexdigest())
+            response.last_modified = time.time()
+            response.cache_control.no_cache = True
+            try:
+                headers = [(name, value) for name, value in response.headers.items()]
+                store.set(key, {'status': response.status_code, 'headers': headers, 'stored_at': time.time()}, body)
+            except OSError:
+                current_app.logger.exception('Could not store page cache entry for %s', request.path)
+            response.headers['X-Page-Cache'] = 'miss'
+            return response.make_conditional(request)
+        return wrapper
+    return decorator
+
+
+def clear_page_cache(app=None):
+    """Drop every cached page (e.g. after a deploy that changes templates)"""
+    get_store(app).clear()
@@ -12,6 +12,7 @@ from reportlab.lib.utils import ImageReader
 from reportlab.pdfgen import canvas
 from PIL import Image
 from flask import current_app
+from app.id_generator import get_back_filename
 
 
 def generate_member_ids_pdf(members, layout='bundle', page_size='letter'):
@@ -158,7 +159,7 @@ def generate_member_ids_pdf(members, layout='bundle', page_size='letter'):
                 y = page_height - margin - 30 - (row + 1) * (card_height + spacing)
                 
                 # Draw back side
-                back_filename = member.digital_id_path.replace('_front.png', '_back.png')
+                back_filename = get_back_filename(member.digital_id_path)
                 back_path = os.path.join(
                     current_app.config['UPLOAD_FOLDER'],
                     'digital_ids',
@@ -0,0 +1,254 @@
+"""
+Request profiling
+Opt-in: a fraction of requests (PROFILE_SAMPLE_RATE, e.g. 0.01) plus any request
+from an admin carrying the ``X-Profile: 1`` header are profiled, and the result
+is written to PROFILE_DIR for the admin profiles page.
+
+Two modes (PROFILE_MODE):
+    sampling  (default) a helper thread records the request thread's stack every
+              PROFILE_INTERVAL_MS and writes collapsed stacks (flamegraph input);
+              overhead is limited to the sampled requests and stays small
+    cprofile  deterministic cProfile, written as a .prof pstats file; slower,
+              better for call counts
+
+Only one request per worker is profiled at a time; others are simply not sampled.
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from flask import g, request
+
+PROFILE_HEADER = 'X-Profile'
+
+# One profile at a time per process; never block a request waiting for it
+_profile_lock = threading.Lock()
+
+
+class StackSampler:
+    """Periodically captures the stack of one thread"""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            self.stacks[_collapse(frame)] += 1
+            self.samples += 1
+
+    def collapsed(self):
+        """Stacks in Brendan Gregg's collapsed format: ``root;child;leaf count``"""
+        return '\n'.join(f'{stack} {count}' for stack, count in self.stacks.most_common()) + '\n'
+
+
+def _frame_label(code):
+    filename = code.co_filename
+    for marker in ('site-packages/', '/app/'):
+        if marker in filename:
+            filename = filename.rsplit(marker, 1)[-1]
+            break
+    return f'{filename}:{code.co_name}:{code.co_firstlineno}'
+
+
+def _collapse(frame):
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame.f_code))
+        frame = frame.f_back
+    return ';'.join(reversed(labels))
+
+
+def _safe_name(value):
+    return re.sub(r'[^A-Za-z0-9_.-]+', '_', value or 'unknown')[:80]
+
+
+def _prune(directory, keep):
+    """Remove the oldest profiles beyond ``keep``"""
+    metadata = sorted(
+        (entry for entry in os.scandir(directory) if entry.name.endswith('.json')),
+        key=lambda entry: entry.stat().st_mtime,
+    )
+    for entry in metadata[:max(len(metadata) - keep, 0)]:
+        stem = entry.path[:-len('.json')]
+        for suffix in ('.json', '.collapsed', '.prof'):
+            try:
+                os.remove(stem + suffix)
+            except FileNotFoundError:
+                pass
+
+
+def list_profiles(directory, limit=50):
+    """Captured profiles, slowest first"""
+    if not os.path.isdir(directory):
+        return []
+    profiles = []
+    for entry in os.scandir(directory):
+        if not entry.name.endswith('.json'):
+            continue
+        try:
+            with open(entry.path) as f:
+                profiles.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    profiles.sort(key=lambda p: p.get('duration_ms', 0), reverse=True)
+    return profiles[:limit]
+
+
+def profile_summary(directory, name, limit=40):
+    """
+    Human-readable summary of one profile
+
+    Returns:
+        tuple: (metadata, text) or (None, None) if it does not exist
+    """
+    stem = os.path.join(directory, _safe_name(name))
+    try:
+        with open(stem + '.json') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None, None
+
+    if meta['mode'] == 'cprofile':
+        out = io.StringIO()
+        stats = pstats.Stats(stem + '.prof', stream=out)
+        stats.sort_stats('cumulative').print_stats(limit)
+        return meta, out.getvalue()
+
+    # Sampling: time attributed to each frame (inclusive), most expensive first
+    inclusive = Counter()
+    total = 0
+    with open(stem + '.collapsed') as f:
+        for line in f:
+            stack, _, count = line.rstrip('\n').rpartition(' ')
+            if not stack:
+                continue
+            count = int(count)
+            total += count
+            for label in set(stack.split(';')):
+                inclusive[label] += count
+    lines = [f'{total} samples, {meta.get("interval_ms")} ms apart', '', '  share  samples  frame']
+    for label, count in inclusive.most_common(limit):
+        lines.append(f'{count / total:7.1%}  {count:7d}  {label}' if total else label)
+    return meta, '\n'.join(lines)
+
+
+def init_app(app):
+    """Register the profiling hooks (no-op unless sampling or the admin header is used)"""
+    app.config.setdefault('PROFILE_SAMPLE_RATE', float(os.environ.get('PROFILE_SAMPLE_RATE', '0') or 0))
+    app.config.setdefault('PROFILE_MODE', os.environ.get('PROFILE_MODE', 'sampling'))
+    app.config.setdefault('PROFILE_INTERVAL_MS', float(os.environ.get('PROFILE_INTERVAL_MS', '5')))
+    app.config.setdefault('PROFILE_DIR', os.environ.get('PROFILE_DIR') or os.path.join(app.instance_path, 'profiles'))
+    app.config.setdefault('PROFILE_MAX_FILES', int(os.environ.get('PROFILE_MAX_FILES', '500')))
+
+    def _requested_by_admin():
+        if request.headers.get(PROFILE_HEADER) != '1':
+            return False
+        from flask_login import current_user
+        return current_user.is_authenticated and current_user.role == 'admin'
+
+    @app.before_request
+    def start_profile():
+        if request.endpoint == 'static':
+            return
+        rate = app.config['PROFILE_SAMPLE_RATE']
+        sampled = rate > 0 and random.random() < rate
+        if not (sampled or _requested_by_admin()):
+            return
+        if not _profile_lock.acquire(blocking=False):
+            return
+
+        try:
+            if app.config['PROFILE_MODE'] == 'cprofile':
+                profiler = cProfile.Profile()
+                profiler.enable()
+            else:
+                profiler = StackSampler(threading.get_ident(), app.config['PROFILE_INTERVAL_MS'] / 1000)
+                profiler.start()
+        except Exception:
+            _profile_lock.release()
+            app.logger.exception('Could not start request profiler')
+            return
+        g.profiler = profiler
+        g.profile_started = time.perf_counter()
+        g.profile_trigger = 'header' if not sampled else 'sample'
+
+    @app.teardown_request
+    def finish_profile(exc=None):
+        profiler = g.pop('profiler', None)
+        if profiler is None:
+            return
+        try:
+            duration_ms = (time.perf_counter() - g.profile_started) * 1000
+            if isinstance(profiler, cProfile.Profile):
+                profiler.disable()
+            else:
+                profiler.stop()
+            _write_profile(app, profiler, duration_ms, g.get('profile_trigger'))
+        except Exception:
+            app.logger.exception('Could not save request profile')
+        finally:
+            _profile_lock.release()
+
+
+def _write_profile(app, profiler, duration_ms, trigger):
+    directory = app.config['PROFILE_DIR']
+    os.makedirs(directory, exist_ok=True)
+    captured_at = datetime.utcnow()
+    name = _safe_name(
+        f"{captured_at.strftime('%Y%m%dT%H%M%S%f')}_{os.getpid()}_{request.endpoint}_{int(duration_ms)}ms"
+    )
+    stem = os.path.join(directory, name)
+
+    meta = {
+        'name': name,
+        'endpoint': request.endpoint,
+        'method': request.method,
+        'path': request.path,
+        'duration_ms': round(duration_ms, 1),
+        'captured_at': captured_at.isoformat(timespec='seconds'),
+        'pid': os.getpid(),
+        'trigger': trigger,
+    }
+    query_stats = g.get('query_stats')
+    if query_stats is not None:
+        meta['queries'] = query_stats.count
+        meta['db_ms'] = round(query_stats.duration_ms, 1)
+
+    if isinstance(profiler, cProfile.Profile):
+        meta['mode'] = 'cprofile'
+        profiler.dump_stats(stem + '.prof')
+    else:
+        meta['mode'] = 'sampling'
+        meta['samples'] = profiler.samples
+        meta['interval_ms'] = app.config['PROFILE_INTERVAL_MS']
+        with open(stem + '.collapsed', 'w') as f:
+            f.write(profiler.collapsed())
+
+    # Metadata last: the admin page only lists profiles whose data file is complete
+    with open(stem + '.json', 'w') as f:
+        json.dump(meta, f)
+    _prune(directory, app.config['PROFILE_MAX_FILES'])
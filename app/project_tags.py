@@ -0,0 +1,162 @@
+"""
+Project technology tags
+Project.technologies stays the comma-separated text members and admins edit;
+the project_technology table links each project to the Technology rows it
+names (exact, case-insensitive match), so category filters are an indexed
+join instead of substring matches over the text column. Categories without
+any active technology fall back to the built-in FALLBACK_TECHNOLOGIES lists,
+matched against the text as the projects page always did.
+
+Links follow ORM writes in the same flush: saving a project relinks it, and
+adding or renaming a technology relinks the projects that name it. Writes that
+bypass the ORM need ``flask projects relink-tags``.
+"""
+
+import os
+from sqlalchemy import case, event, func, inspect, or_, select
+from app import db
+from app.cache import TTLCache
+from app.models import Project, Technology, project_technology
+from app.page_cache import model_versions, track_versions
+
+_counts_cache = TTLCache('project_tags', ttl=int(os.environ.get('PROJECT_TAG_COUNTS_TTL', '300')), max_entries=20)
+
+# Used for a category only while admins have no active technology in it
+FALLBACK_TECHNOLOGIES = {
+    'web': ['html', 'css', 'javascript', 'react', 'vue', 'angular', 'node', 'express', 'django', 'flask', 'php',
+            'laravel', 'wordpress', 'bootstrap', 'tailwind'],
+    'mobile': ['react native', 'flutter', 'swift', 'kotlin', 'android', 'ios', 'xamarin', 'ionic', 'cordova'],
+    'ai': ['python', 'tensorflow', 'pytorch', 'keras', 'scikit-learn', 'opencv', 'numpy', 'pandas',
+           'machine learning', 'deep learning', 'neural network', 'ai', 'artificial intelligence'],
+    'iot': ['arduino', 'raspberry pi', 'esp32', 'esp8266', 'sensors', 'mqtt', 'iot', 'internet of things',
+            'embedded', 'microcontroller'],
+    'data': ['python', 'r', 'sql', 'pandas', 'numpy', 'matplotlib', 'seaborn', 'plotly', 'jupyter', 'data science',
+             'analytics', 'visualization', 'machine learning'],
+}
+
+
+def normalize(name):
+    return ' '.join((name or '').lower().split())
+
+
+def tag_names(project):
+    """Normalized technology names listed on a project"""
+    return {normalize(name) for name in project.get_technologies_list()} - {''}
+
+
+def _active_categories():
+    return set(db.session.scalars(select(Technology.category).where(Technology.is_active == True).distinct()))
+
+
+def active_categories():
+    """Categories with at least one active technology, cached until a project or technology commit in any worker"""
+    return _counts_cache.get_or_set(('categories', model_versions(Project, Technology)), _active_categories)
+
+
+def _fallback_match(category):
+    return or_(*(Project.technologies.icontains(name) for name in FALLBACK_TECHNOLOGIES[category]))
+
+
+def in_category(category):
+    """Filter criterion: project tagged with an active technology in ``category`` (or in its fallback list)"""
+    if category in FALLBACK_TECHNOLOGIES and category not in active_categories():
+        return _fallback_match(category)
+    tagged = select(project_technology.c.project_id).join(
+        Technology, Technology.id == project_technology.c.technology_id
+    ).where(Technology.category == category, Technology.is_active == True)
+    return Project.id.in_(tagged)
+
+
+def _load_counts():
+    """Public project count overall and per technology category (fallback categories in one extra query)"""
+    counts = dict(db.session.execute(
+        select(Technology.category, func.count(func.distinct(project_technology.c.project_id)))
+        .join(project_technology, project_technology.c.technology_id == Technology.id)
+        .join(Project, Project.id == project_technology.c.project_id)
+        .where(Project.is_public == True, Technology.is_active == True)
+        .group_by(Technology.category)
+    ).all())
+    counts['all'] = db.session.scalar(select(func.count(Project.id)).where(Project.is_public == True))
+    fallback = [category for category in FALLBACK_TECHNOLOGIES if category not in active_categories()]
+    if fallback:
+        row = db.session.execute(
+            select(*(func.sum(case((_fallback_match(category), 1), else_=0)) for category in fallback))
+            .where(Project.is_public == True)
+        ).one()
+        counts.update({category: count or 0 for category, count in zip(fallback, row)})
+    return counts
+
+
+
+def category_counts():
+    """
+    Returns:
+        dict: category -> number of public projects (``'all'`` for the total), cached until a
+        project or technology commit in any worker
+    """
+    return _counts_cache.get_or_set(('counts', model_versions(Project, Technology)), _load_counts)
+
+
+def link_project(project, technologies=None):
+    """Point project.technology_tags at the Technology rows its text names"""
+    names = tag_names(project)
+    if technologies is None:
+        technologies = Technology.query.filter(func.lower(Technology.name).in_(names)).all() if names else []
+    project.technology_tags = [technology for technology in technologies if normalize(technology.name) in names]
+
+
+def relink_all():
+    """Rebuild every project's links (in the caller's transaction)"""
+    technologies = Technology.query.all()
+    projects = Project.query.all()
+    for project in projects:
+        link_project(project, technologies)
+    return len(projects)
+
+
+def _changed(instance, attribute):
+    return inspect(instance).attrs[attribute].history.has_changes()
+
+
+def _maintain_links(session, flush_context, instances):
+    projects = [
+        instance for instance in session.new | session.dirty
+        if isinstance(instance, Project) and (instance in session.new or _changed(instance, 'technologies'))
+    ]
+    technologies = [
+        instance for instance in session.new | session.dirty
+        if isinstance(instance, Technology) and (instance in session.new or _changed(instance, 'name'))
+    ]
+    if not projects and not technologies:
+        return
+
+    with session.no_autoflush:
+        # Technologies created in this flush are not queryable yet
+        pending = [instance for instance in session.new if isinstance(instance, Technology)]
+        for project in projects:
+            names = tag_names(project)
+            stored = Technology.query.filter(func.lower(Technology.name).in_(names)).all() if names else []
+            link_project(project, stored + pending)
+
+        for technology in technologies:
+            name = normalize(technology.name)
+            candidates = set(technology.projects)
+            if name:
+                # autoescape: '%' and '_' in a technology name are literal characters
+                matching = Project.technologies.icontains(technology.name.strip(), autoescape=True)
+                candidates.update(Project.query.filter(matching))
+            for project in candidates:
+                if project in projects:
+                    continue
+                tagged = name in tag_names(project)
+                if tagged and technology not in project.technology_tags:
+                    project.technology_tags.append(technology)
+                elif not tagged and technology in project.technology_tags:
+                    project.technology_tags.remove(technology)
+
+
+if not event.contains(db.session, 'before_flush', _maintain_links):
+    event.listen(db.session, 'before_flush', _maintain_links)
+
+# Other workers follow Project/Technology commits through the shared versions
+track_versions(Project, Technology)
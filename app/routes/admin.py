@@ -1,4 +1,4 @@
-from flask import render_template, request, flash, redirect, url_for, jsonify, current_app, make_response
+from flask import render_template, request, flash, redirect, url_for, jsonify, current_app, make_response, send_file, abort
 from flask_login import login_required, current_user
 from werkzeug.utils import secure_filename
 from app.routes import admin_bp
@@ -10,11 +10,24 @@ from app.models import (
     CompetitionSubmission, CompetitionScore, CompetitionReward,
     CompetitionSponsor, CompetitionSponsorLink, CompetitionWinner, CompetitionGuard,
     CompetitionEnrollment, SessionWeek, SessionSchedule, SessionReport, Team, TeamMember,
-    DailyActiveUser
+    DailyActiveUser, project_technology
 )
 from app import db
 from app.utils import get_notification_service
 from app.pdf_generator import generate_member_ids_pdf
+from app.id_generator import ensure_thumbnail, get_back_filename, get_image_version
+from app.guards import invalidate_guards
+from app.dashboard_stats import get_dashboard_stats
+from app.search import filter_members, search_members
+from app.member_index import member_index
+from app import checkin
+from app.checkin_rewards import checkin_rewards
+from app.database import retry_on_lock
+from app.financial_rollup import (
+    category_breakdown, category_totals, combined_totals, period_totals, rebuild_rollups,
+)
+from app import metrics
+from app.instrumentation import perf_budget
 from datetime import datetime, timedelta
 try:
     from zoneinfo import ZoneInfo
@@ -24,6 +37,8 @@ import os
 import json
 import csv
 import io
+from sqlalchemy import case
+from sqlalchemy.orm import contains_eager
 
 def admin_required(f):
     """Decorator to require admin role"""
@@ -37,44 +52,11 @@ def admin_required(f):
     return decorated_function
 
 @admin_bp.route('/')
+@perf_budget(queries=7, ms=500)
 @login_required
 @admin_required
 def dashboard():
-    # Get statistics
-    total_members = Member.query.join(User).filter(User.is_approved == True).count()
-    pending_approvals = User.query.filter_by(role='student', is_approved=False).count()
-    upcoming_events = Event.query.filter(Event.event_date >= datetime.utcnow()).count()
-    newsletter_subscribers = Newsletter.query.filter_by(is_active=True).count()
-    try:
-        today_local = datetime.utcnow().date()
-        daily_active_users = DailyActiveUser.query.filter_by(activity_date=today_local).count()
-    except Exception:
-        daily_active_users = 0
-    recent_active_users = DailyActiveUser.query.order_by(DailyActiveUser.last_seen_at.desc()).limit(10).all()
-    
-    # Get financial statistics
-    current_period = FinancialPeriod.query.filter_by(status='open').first()
-    current_revenue = current_period.get_total_revenue() if current_period else 0
-    current_expenses = current_period.get_total_expenses() if current_period else 0
-    current_balance = current_revenue - current_expenses
-    
-    # Get recent activity
-    recent_news = News.query.order_by(News.published_date.desc()).limit(5).all()
-    pending_users = User.query.filter_by(role='student', is_approved=False).limit(5).all()
-    
-    return render_template('admin/dashboard.html',
-                         total_members=total_members,
-                         pending_approvals=pending_approvals,
-                         upcoming_events=upcoming_events,
-                         newsletter_subscribers=newsletter_subscribers,
-                         daily_active_users=daily_active_users,
-                         recent_active_users=recent_active_users,
-                         recent_news=recent_news,
-                         pending_users=pending_users,
-                         current_period=current_period,
-                         current_revenue=current_revenue,
-                         current_expenses=current_expenses,
-                         current_balance=current_balance)
+    return render_template('admin/dashboard.html', **get_dashboard_stats())
 
 @admin_bp.route('/users')
 @login_required
@@ -183,25 +165,20 @@ def events():
     if category_filter:
         query = query.filter_by(category=category_filter)
     
-    # Get all events and group them
-    all_events = query.order_by(Event.event_date.desc()).all()
-    
+    # Tab counts from one aggregate; the status filter runs in SQL
     now = datetime.utcnow()
-    upcoming_events = [e for e in all_events if e.event_date > now]
-    past_events = [e for e in all_events if e.event_date <= now]
-    
-    # Filter based on status
+    upcoming_count, past_count = Event.timing_counts(query, now)
     if status_filter == 'upcoming':
-        events = upcoming_events
+        query = query.filter(Event.event_date > now)
     elif status_filter == 'past':
-        events = past_events
-    else:
-        events = all_events
+        query = query.filter(Event.event_date <= now)
+    events = query.order_by(Event.event_date.desc()).all()
     
     return render_template('admin/events.html', 
                          events=events,
-                         upcoming_count=len(upcoming_events),
-                         past_count=len(past_events),
+                         rsvp_stats=Event.rsvp_stats_for([event.id for event in events]),
+                         upcoming_count=upcoming_count,
+                         past_count=past_count,
                          current_status=status_filter,
                          current_category=category_filter)
 
@@ -1155,13 +1132,18 @@ def _delete_member_account_data(user):
 
         CompetitionSubmission.query.filter_by(member_id=member_id).delete(synchronize_session=False)
         CompetitionWinner.query.filter_by(member_id=member_id).delete(synchronize_session=False)
-        CompetitionGuard.query.filter_by(member_id=member_id).delete(synchronize_session=False)
+        # Through the ORM so cached pages showing these guards are invalidated on commit
+        for guard in CompetitionGuard.query.filter_by(member_id=member_id):
+            db.session.delete(guard)
         CompetitionEnrollment.query.filter_by(member_id=member_id).delete(synchronize_session=False)
         TeamMember.query.filter_by(member_id=member_id).delete(synchronize_session=False)
         MembershipPayment.query.filter_by(member_id=member_id).delete(synchronize_session=False)
         MemberTrophy.query.filter_by(member_id=member_id).delete(synchronize_session=False)
         RewardTransaction.query.filter_by(member_id=member_id).delete(synchronize_session=False)
         RSVP.query.filter_by(member_id=member_id).delete(synchronize_session=False)
+        # Bulk deletes skip the ORM's secondary cleanup (and SQLite does not enforce ON DELETE CASCADE)
+        project_ids = db.session.query(Project.id).filter_by(member_id=member_id).scalar_subquery()
+        db.session.execute(project_technology.delete().where(project_technology.c.project_id.in_(project_ids)))
         Project.query.filter_by(member_id=member_id).delete(synchronize_session=False)
 
         db.session.delete(member)
@@ -1184,7 +1166,26 @@ def _delete_member_account_data(user):
 
     db.session.delete(user)
 
+def _membership_payment_clauses():
+    """EXISTS clauses for 'has any payment' and 'has a payment covering today'"""
+    today = datetime.utcnow().date()
+    has_payment = db.exists().where(MembershipPayment.member_id == Member.id)
+    has_valid_payment = db.exists().where(
+        MembershipPayment.member_id == Member.id,
+        MembershipPayment.start_date <= today,
+        MembershipPayment.end_date >= today
+    )
+    return has_payment, has_valid_payment
+
+
+def _membership_status_column():
+    """'valid', 'expired' or 'none' per member, as Member.get_membership_status()"""
+    has_payment, has_valid_payment = _membership_payment_clauses()
+    return case((has_valid_payment, 'valid'), (has_payment, 'expired'), else_='none')
+
+
 @admin_bp.route('/members')
+@perf_budget(queries=9, ms=500)
 @login_required
 @admin_required
 def members():
@@ -1216,45 +1217,45 @@ def members():
     
     # Apply search filter
     if search:
-        query = query.filter(
-            db.or_(
-                Member.full_name.ilike(f'%{search}%'),
-                Member.member_id_number.ilike(f'%{search}%'),
-                User.email.ilike(f'%{search}%')
-            )
-        )
-    
-    members = query.order_by(Member.full_name.asc()).all()
+        query = filter_members(query, search)
     
-    # Filter by payment status
+    # Membership status in SQL, so the status filter and statistics need no per-member queries
+    status_column = _membership_status_column()
     if status_filter != 'all':
-        filtered_members = []
-        for member in members:
-            member_status = member.get_membership_status()
-            if status_filter == member_status:
-                filtered_members.append(member)
-        members = filtered_members
+        query = query.filter(status_column == status_filter)
     
-    # Paginate filtered members list
-    total_filtered = len(members)
+    # Paginate in the database
+    total_filtered = query.order_by(None).count()
     total_pages = max((total_filtered + per_page - 1) // per_page, 1)
     if page > total_pages:
         page = total_pages
-    start_idx = (page - 1) * per_page
-    end_idx = start_idx + per_page
-    members_page = members[start_idx:end_idx]
+    rows = query.options(contains_eager(Member.user)).add_columns(status_column) \
+        .order_by(Member.full_name.asc(), Member.id.asc()) \
+        .offset((page - 1) * per_page).limit(per_page).all()
+    members_page = []
+    for member, membership_status in rows:
+        member.membership_status = membership_status
+        members_page.append(member)
+    points = dict(db.session.query(RewardTransaction.member_id, db.func.sum(RewardTransaction.points))
+                  .filter(RewardTransaction.member_id.in_([member.id for member in members_page]))
+                  .group_by(RewardTransaction.member_id))
+    for member in members_page:
+        member.total_points = points.get(member.id) or 0
 
     # Get statistics
-    all_members = Member.query.join(User).filter(User.is_approved == True).all()
-    total_members = len(all_members)
-    valid_count = sum(1 for m in all_members if m.get_membership_status() == 'valid')
-    expired_count = sum(1 for m in all_members if m.get_membership_status() == 'expired')
-    none_count = sum(1 for m in all_members if m.get_membership_status() == 'none')
-    
-    # Role statistics
-    admin_count = sum(1 for m in all_members if m.user.role == 'admin')
-    member_count = sum(1 for m in all_members if m.user.role == 'student')
-    super_admin_count = sum(1 for m in all_members if m.user.is_super_admin)
+    def counted(condition):
+        return db.func.coalesce(db.func.sum(case((condition, 1), else_=0)), 0)
+
+    (total_members, valid_count, expired_count, none_count,
+     admin_count, member_count, super_admin_count) = db.session.query(
+        db.func.count(Member.id),
+        counted(status_column == 'valid'),
+        counted(status_column == 'expired'),
+        counted(status_column == 'none'),
+        counted(User.role == 'admin'),
+        counted(User.role == 'student'),
+        counted(User.is_super_admin == True),
+    ).select_from(Member).join(User, User.id == Member.user_id).filter(User.is_approved == True).one()
     
     # Get unique courses and years for filter dropdowns
     courses = db.session.query(Member.course).filter(
@@ -1322,13 +1323,7 @@ def export_members():
         
         # Apply search filter
         if search:
-            query = query.filter(
-                db.or_(
-                    Member.full_name.ilike(f'%{search}%'),
-                    Member.member_id_number.ilike(f'%{search}%'),
-                    User.email.ilike(f'%{search}%')
-                )
-            )
+            query = filter_members(query, search)
     
     members = query.order_by(Member.full_name.asc()).all()
     
@@ -1397,6 +1392,19 @@ def export_members():
     return response
 
 
+def _filter_by_membership_status(query, status_filter):
+    """Restrict a Member query to 'valid', 'expired' or 'none' membership in SQL"""
+    if status_filter not in ('valid', 'expired', 'none'):
+        return query
+    
+    has_payment, has_valid_payment = _membership_payment_clauses()
+    if status_filter == 'valid':
+        return query.filter(has_valid_payment)
+    if status_filter == 'expired':
+        return query.filter(has_payment, ~has_valid_payment)
+    return query.filter(~has_payment)
+
+
 @admin_bp.route('/member-ids')
 @login_required
 @admin_required
@@ -1404,49 +1412,60 @@ def member_ids():
     """View all member digital IDs with flip functionality"""
     search = request.args.get('search', '')
     status_filter = request.args.get('status', 'all')  # all, valid, expired, none
+    page = request.args.get('page', 1, type=int) or 1
+    per_page = request.args.get('per_page', 24, type=int) or 24
+    per_page = max(12, min(per_page, 96))
     
     # Query members with digital IDs
-    query = Member.query.join(User).filter(
+    base_query = Member.query.join(User).filter(
         User.is_approved == True,
         Member.digital_id_path.isnot(None)
     )
+    query = base_query
     
     # Apply search filter
     if search:
-        query = query.filter(
-            db.or_(
-                Member.full_name.ilike(f'%{search}%'),
-                Member.member_id_number.ilike(f'%{search}%'),
-                User.email.ilike(f'%{search}%')
-            )
-        )
+        query = filter_members(query, search)
     
-    members = query.order_by(Member.full_name.asc()).all()
+    # Filter by payment status in SQL so only one page of rows is loaded
+    query = _filter_by_membership_status(query, status_filter)
     
-    # Filter by payment status if needed
-    if status_filter != 'all':
-        filtered_members = []
-        for member in members:
-            member_status = member.get_membership_status()
-            if status_filter == member_status:
-                filtered_members.append(member)
-        members = filtered_members
+    pagination = query.order_by(Member.full_name.asc()).paginate(page=page, per_page=per_page, error_out=False)
+    members = pagination.items
     
-    # Get statistics
-    all_members_with_ids = Member.query.join(User).filter(
-        User.is_approved == True,
-        Member.digital_id_path.isnot(None)
-    ).all()
+    # Cache-busting versions for the thumbnail URLs (changes when a card is regenerated)
+    id_versions = {m.id: get_image_version(m.digital_id_path) for m in members}
     
-    total_with_ids = len(all_members_with_ids)
+    total_with_ids = base_query.count()
     
     return render_template('admin/member_ids.html',
                          members=members,
+                         pagination=pagination,
+                         per_page=per_page,
+                         id_versions=id_versions,
+                         back_filenames={member.id: get_back_filename(member.digital_id_path) for member in members},
                          search_query=search,
                          current_status=status_filter,
                          total_with_ids=total_with_ids)
 
 
+@admin_bp.route('/member-ids/thumbnail/<path:filename>')
+@login_required
+@admin_required
+def member_id_thumbnail(filename):
+    """Serve a small preview of a digital ID card, generating it on first use"""
+    thumb_path = ensure_thumbnail(filename)
+    if not thumb_path:
+        return make_response('Not found', 404)
+    
+    response = send_file(thumb_path, mimetype='image/jpeg', max_age=31536000, conditional=True)
+    # URLs carry the source version, so previews can be cached for a year
+    response.cache_control.public = False
+    response.cache_control.private = True
+    response.cache_control.immutable = True
+    return response
+
+
 @admin_bp.route('/member-ids/export-pdf')
 @login_required
 @admin_required
@@ -1465,28 +1484,15 @@ def export_member_ids_pdf():
     
     # Apply search filter
     if search:
-        query = query.filter(
-            db.or_(
-                Member.full_name.ilike(f'%{search}%'),
-                Member.member_id_number.ilike(f'%{search}%'),
-                User.email.ilike(f'%{search}%')
-            )
-        )
+        query = filter_members(query, search)
     
+    query = _filter_by_membership_status(query, status_filter)
     members = query.order_by(Member.full_name.asc()).all()
     
-    # Filter by payment status if needed
-    if status_filter != 'all':
-        filtered_members = []
-        for member in members:
-            member_status = member.get_membership_status()
-            if status_filter == member_status:
-                filtered_members.append(member)
-        members = filtered_members
-    
     try:
         # Generate PDF
-        pdf_buffer = generate_member_ids_pdf(members, layout=layout, page_size=page_size)
+        with metrics.PDF_EXPORT_TIME.labels(layout=layout).time():
+            pdf_buffer = generate_member_ids_pdf(members, layout=layout, page_size=page_size)
         
         # Create response
         from flask import Response
@@ -1645,6 +1651,7 @@ def delete_member_account(member_id):
         display_name = member.full_name
         _delete_member_account_data(user)
         db.session.commit()
+        invalidate_guards()
         flash(f'{display_name} account and related records were deleted.', 'success')
     except Exception as exc:
         db.session.rollback()
@@ -1713,46 +1720,13 @@ def member_lookup():
     if not member_id_number:
         return jsonify({'success': False, 'error': 'Member ID is required'})
     
-    member = Member.query.filter_by(member_id_number=member_id_number).first()
+    # Served from the per-worker index; a miss reads this one member from the database
+    member = member_index.lookup(member_id_number)
     
     if not member:
         return jsonify({'success': False, 'error': 'Member not found'})
     
-    # Get member data
-    total_points = member.get_total_points()
-    membership_status = member.get_membership_status()
-    trophies = member.get_current_trophies()
-    latest_payment = member.get_latest_payment()
-    recent_attendance = RSVP.query.filter_by(member_id=member.id, checked_in=True).order_by(RSVP.checked_in_at.desc()).limit(5).all()
-    
-    return jsonify({
-        'success': True,
-        'member': {
-            'id': member.id,
-            'member_id_number': member.member_id_number,
-            'full_name': member.full_name,
-            'email': member.user.email,
-            'phone': member.phone,
-            'profile_image': member.profile_image,
-            'course': member.course,
-            'year': member.year,
-            'status': member.status,
-            'total_points': total_points,
-            'membership_status': membership_status,
-            'trophies': [{'name': t.name, 'icon': t.icon} for t in trophies],
-            'latest_payment': {
-                'amount': latest_payment.amount,
-                'end_date': latest_payment.end_date.strftime('%Y-%m-%d'),
-                'days_remaining': latest_payment.days_remaining()
-            } if latest_payment else None,
-            'recent_attendance': [
-                {
-                    'event': a.event.title,
-                    'date': a.checked_in_at.strftime('%Y-%m-%d')
-                } for a in recent_attendance
-            ]
-        }
-    })
+    return jsonify({'success': True, 'member': member.to_dict()})
 
 
 @admin_bp.route('/members/search')
@@ -1765,18 +1739,7 @@ def members_search():
     limit = max(1, min(limit, 50))
 
     query = Member.query.join(User).filter(User.is_approved == True)
-    if q:
-        like = f"%{q}%"
-        query = query.filter(
-            db.or_(
-                Member.full_name.ilike(like),
-                Member.member_id_number.ilike(like),
-                User.email.ilike(like),
-                Member.course.ilike(like),
-            )
-        )
-
-    members = query.order_by(Member.full_name.asc()).limit(limit).all()
+    members = search_members(query, q, limit)
     return jsonify({
         'results': [
             {
@@ -1985,6 +1948,7 @@ def check_and_award_trophies(member, old_points, new_points):
 # ============================================================================
 
 @admin_bp.route('/payments')
+@perf_budget(queries=18, ms=750)
 @login_required
 @admin_required
 def payments():
@@ -2240,6 +2204,53 @@ def export_payments():
     return response
 
 
+@admin_bp.route('/settings/db-pool')
+@login_required
+@admin_required
+def db_pool_status():
+    """Connection pool utilization for the worker serving this request"""
+    from app.database import pool_status
+    return jsonify({'pid': os.getpid(), **pool_status()})
+
+
+@admin_bp.route('/settings/profiles')
+@login_required
+@admin_required
+def profiles():
+    """Slowest request profiles captured by the sampling profiler"""
+    from app.profiling import list_profiles
+    return render_template(
+        'admin/profiles.html',
+        profiles=list_profiles(current_app.config['PROFILE_DIR']),
+        sample_rate=current_app.config['PROFILE_SAMPLE_RATE'],
+        mode=current_app.config['PROFILE_MODE'],
+    )
+
+
+@admin_bp.route('/settings/profiles/<name>')
+@login_required
+@admin_required
+def profile_detail(name):
+    from app.profiling import profile_summary
+    profile, summary = profile_summary(current_app.config['PROFILE_DIR'], name)
+    if profile is None:
+        abort(404)
+    return render_template('admin/profile_detail.html', profile=profile, summary=summary)
+
+
+@admin_bp.route('/settings/profiles/<name>/download')
+@login_required
+@admin_required
+def profile_download(name):
+    from app.profiling import profile_summary
+    profile, _ = profile_summary(current_app.config['PROFILE_DIR'], name)
+    if profile is None:
+        abort(404)
+    suffix = '.prof' if profile['mode'] == 'cprofile' else '.collapsed'
+    path = os.path.join(current_app.config['PROFILE_DIR'], profile['name'] + suffix)
+    return send_file(path, as_attachment=True, download_name=profile['name'] + suffix)
+
+
 @admin_bp.route('/settings', methods=['GET', 'POST'])
 @login_required
 @admin_required
@@ -2287,29 +2298,82 @@ def settings():
 @login_required
 @admin_required
 def event_checkin(event_id):
-    """Event check-in page"""
+    """Event check-in page; the attendee list is loaded from the manifest by the scanner script"""
     event = Event.query.get_or_404(event_id)
     
     if not event.allows_check_in:
         flash('Check-in is not enabled for this event.', 'warning')
         return redirect(url_for('admin.events'))
     
-    # Get all approved RSVPs for this event
-    rsvps = RSVP.query.filter_by(event_id=event.id, status='approved').order_by(RSVP.full_name.asc()).all()
-    
     # Statistics
-    total_rsvps = len(rsvps)
-    checked_in = sum(1 for r in rsvps if r.checked_in)
+    total_rsvps, checked_in = checkin.check_in_counts(event.id)
     not_checked_in = total_rsvps - checked_in
     
     return render_template('admin/event_checkin.html',
                          event=event,
-                         rsvps=rsvps,
                          total_rsvps=total_rsvps,
                          checked_in=checked_in,
                          not_checked_in=not_checked_in)
 
 
+@admin_bp.route('/events/<int:event_id>/checkin/manifest.json')
+@login_required
+@admin_required
+def event_checkin_manifest(event_id):
+    """Versioned check-in manifest; ``?since=<version>`` returns only the changes"""
+    event = Event.query.get_or_404(event_id)
+    since = request.args.get('since', type=int)
+    data = checkin.manifest(event, since)
+    response = jsonify(data)
+    response.set_etag(f"{event.id}-{data['version']}-{'full' if data['full'] else since}")
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+
+@admin_bp.route('/events/<int:event_id>/checkin/batch', methods=['POST'])
+@login_required
+@admin_required
+def event_checkin_batch(event_id):
+    """
+    Apply check-ins queued by a scanner, in one transaction
+
+    Body: {"since": <manifest version>, "checkins": [{"key", "rsvp_id" | "code" | "member_id", "scanned_at"}]}.
+    Returns a result per check-in plus the manifest changes since ``since``.
+    """
+    event = Event.query.get_or_404(event_id)
+    payload = request.get_json(silent=True) or {}
+    items = payload.get('checkins') or []
+    if not isinstance(items, list) or len(items) > checkin.MAX_BATCH:
+        return jsonify({'success': False, 'error': f'checkins must be a list of at most {checkin.MAX_BATCH}'}), 400
+    if items and not event.allows_check_in:
+        return jsonify({'success': False, 'error': 'Check-in is not enabled for this event'}), 400
+    
+    results = []
+    if items:
+        def apply_batch():
+            applied, newly_checked_in = checkin.apply_checkins(event, items, current_user.id)
+            db.session.commit()
+            return applied, [rsvp.id for rsvp in newly_checked_in]
+        
+        try:
+            results, checked_in_ids = retry_on_lock(apply_batch)
+        except Exception:
+            db.session.rollback()
+            current_app.logger.exception('Check-in batch failed for event %s', event.id)
+            return jsonify({'success': False, 'error': 'Check-ins could not be saved, retry later'}), 503
+        # Points and trophies follow in the reward batch
+        for rsvp_id in checked_in_ids:
+            checkin_rewards.record(rsvp_id)
+    
+    since = payload.get('since')
+    return jsonify({
+        'success': True,
+        'results': results,
+        'manifest': checkin.manifest(event, since if isinstance(since, int) else None),
+    })
+
+
 @admin_bp.route('/rsvps/checkin/<int:rsvp_id>', methods=['POST'])
 @login_required
 @admin_required
@@ -2320,31 +2384,12 @@ def checkin_rsvp(rsvp_id):
     if rsvp.checked_in:
         return jsonify({'success': False, 'error': 'Already checked in'})
     
-    # Mark as checked in
+    # Mark as checked in; points and trophies are awarded by the reward batch a few seconds later
     rsvp.checked_in = True
     rsvp.checked_in_at = datetime.utcnow()
     rsvp.checked_in_by = current_user.id
-    
-    # Award points if member and event has points
-    if rsvp.member_id and rsvp.event.check_in_points > 0:
-        member = rsvp.member
-        old_points = member.get_total_points()
-        
-        transaction = RewardTransaction(
-            member_id=member.id,
-            points=rsvp.event.check_in_points,
-            transaction_type='event_checkin',
-            reason=f'Attended: {rsvp.event.title}',
-            event_id=rsvp.event.id,
-            admin_id=current_user.id
-        )
-        db.session.add(transaction)
-        
-        # Check for trophies
-        new_points = old_points + rsvp.event.check_in_points
-        check_and_award_trophies(member, old_points, new_points)
-    
     db.session.commit()
+    checkin_rewards.record(rsvp.id)
     
     return jsonify({
         'success': True,
@@ -2358,7 +2403,8 @@ def checkin_rsvp(rsvp_id):
 @admin_required
 def undo_checkin(rsvp_id):
     """Undo check-in for an RSVP"""
-    rsvp = RSVP.query.get_or_404(rsvp_id)
+    # Locked so a reward batch that has claimed this check-in finishes first
+    rsvp = RSVP.query.filter_by(id=rsvp_id).with_for_update().first_or_404()
     
     if not rsvp.checked_in:
         return jsonify({'success': False, 'error': 'Not checked in'})
@@ -2367,9 +2413,13 @@ def undo_checkin(rsvp_id):
     rsvp.checked_in = False
     rsvp.checked_in_at = None
     rsvp.checked_in_by = None
+    # A later check-in is rewarded again
+    rsvp.points_processed_at = None
+    # On SQLite the write lock is what waits for the batch; its points are visible after this
+    db.session.flush()
     
     # Remove points if they were awarded
-    if rsvp.member_id and rsvp.event.check_in_points > 0:
+    if rsvp.member_id:
         # Find and remove the transaction
         transaction = RewardTransaction.query.filter_by(
             member_id=rsvp.member_id,
@@ -2393,6 +2443,7 @@ def undo_checkin(rsvp_id):
 # ============================================================================
 
 @admin_bp.route('/financial')
+@perf_budget(queries=12, ms=750)
 @login_required
 @admin_required
 def financial():
@@ -2408,16 +2459,12 @@ def financial():
     open_periods = FinancialPeriod.query.filter_by(status='open').count()
     closed_periods = FinancialPeriod.query.filter_by(status='closed').count()
     
-    # Calculate all-time totals
-    all_time_revenue = db.session.query(db.func.sum(FinancialTransaction.amount)).filter(
-        FinancialTransaction.transaction_type == 'revenue'
-    ).scalar() or 0
-    
-    all_time_expenses = db.session.query(db.func.sum(FinancialTransaction.amount)).filter(
-        FinancialTransaction.transaction_type == 'expense'
-    ).scalar() or 0
-    
-    all_time_balance = all_time_revenue - all_time_expenses
+    # Per-period and all-time totals from the rollup table
+    totals = period_totals()
+    all_time = combined_totals(totals)
+    all_time_revenue = all_time.revenue
+    all_time_expenses = all_time.expenses
+    all_time_balance = all_time.net
 
     membership_payments_total = db.session.query(db.func.sum(MembershipPayment.amount)).scalar() or 0
     membership_payments_count = MembershipPayment.query.count()
@@ -2432,6 +2479,7 @@ def financial():
     
     return render_template('admin/financial.html',
                          periods=periods,
+                         period_totals=totals,
                          current_period=current_period,
                          total_periods=total_periods,
                          open_periods=open_periods,
@@ -2483,6 +2531,7 @@ def create_financial_period():
             existing_open.status = 'closed'
             existing_open.closed_by = current_user.id
             existing_open.closed_at = datetime.utcnow()
+            rebuild_rollups([existing_open.id], include_closed=True)
         
         # Create new period
         new_period = FinancialPeriod(
@@ -2532,29 +2581,17 @@ def financial_period_detail(period_id):
     ).all()
     
     # Calculate statistics
-    total_revenue = period.get_total_revenue()
-    total_expenses = period.get_total_expenses()
-    net_balance = period.get_net_balance()
-    transaction_count = period.get_transaction_count()
-    
-    # Get category breakdown
-    category_breakdown = db.session.query(
-        FinancialCategory.name,
-        FinancialCategory.type,
-        db.func.sum(FinancialTransaction.amount).label('total')
-    ).join(FinancialTransaction).filter(
-        FinancialTransaction.financial_period_id == period.id
-    ).group_by(FinancialCategory.id, FinancialCategory.name, FinancialCategory.type).all()
+    totals = period_totals([period.id])[period.id]
     
     return render_template('admin/financial_period_detail.html',
                          period=period,
                          transactions=transactions,
                          categories=categories,
-                         total_revenue=total_revenue,
-                         total_expenses=total_expenses,
-                         net_balance=net_balance,
-                         transaction_count=transaction_count,
-                         category_breakdown=category_breakdown,
+                         total_revenue=totals.revenue,
+                         total_expenses=totals.expenses,
+                         net_balance=totals.net,
+                         transaction_count=totals.count,
+                         category_breakdown=category_breakdown(period.id),
                          current_type=transaction_type,
                          current_category_id=category_id)
 
@@ -2573,6 +2610,8 @@ def close_financial_period(period_id):
     period.status = 'closed'
     period.closed_by = current_user.id
     period.closed_at = datetime.utcnow()
+    # Freeze the period's totals as a snapshot
+    rebuild_rollups([period.id], include_closed=True)
     
     db.session.commit()
     
@@ -2600,6 +2639,7 @@ def reopen_financial_period(period_id):
     period.status = 'open'
     period.closed_by = None
     period.closed_at = None
+    rebuild_rollups([period.id])
     
     db.session.commit()
     
@@ -2760,7 +2800,8 @@ def financial_categories():
         FinancialCategory.type.asc(), FinancialCategory.name.asc()
     ).all()
     
-    return render_template('admin/financial_categories.html', categories=categories)
+    return render_template('admin/financial_categories.html', categories=categories,
+                         category_totals=category_totals())
 
 
 @admin_bp.route('/financial/categories/add', methods=['GET', 'POST'])
@@ -2806,6 +2847,7 @@ def add_financial_category():
 def edit_financial_category(category_id):
     """Edit a financial category"""
     category = FinancialCategory.query.get_or_404(category_id)
+    totals = category_totals([category.id])[category.id]
     
     if category.is_builtin:
         flash('Built-in categories cannot be edited.', 'error')
@@ -2817,7 +2859,7 @@ def edit_financial_category(category_id):
         
         if not name:
             flash('Name is required.', 'error')
-            return render_template('admin/edit_financial_category.html', category=category)
+            return render_template('admin/edit_financial_category.html', category=category, totals=totals)
         
         # Check if another category with same name and type exists
         existing = FinancialCategory.query.filter(
@@ -2828,7 +2870,7 @@ def edit_financial_category(category_id):
         
         if existing:
             flash('A category with this name and type already exists.', 'warning')
-            return render_template('admin/edit_financial_category.html', category=category)
+            return render_template('admin/edit_financial_category.html', category=category, totals=totals)
         
         category.name = name
         category.description = description
@@ -2838,7 +2880,7 @@ def edit_financial_category(category_id):
         flash(f'Category "{name}" updated successfully!', 'success')
         return redirect(url_for('admin.financial_categories'))
     
-    return render_template('admin/edit_financial_category.html', category=category)
+    return render_template('admin/edit_financial_category.html', category=category, totals=totals)
 
 
 @admin_bp.route('/financial/categories/<int:category_id>/toggle', methods=['POST'])
@@ -2868,32 +2910,17 @@ def financial_reports():
     # Get all periods
     periods = FinancialPeriod.query.order_by(FinancialPeriod.start_date.desc()).all()
     
-    # Calculate all-time totals
-    all_time_revenue = db.session.query(db.func.sum(FinancialTransaction.amount)).filter(
-        FinancialTransaction.transaction_type == 'revenue'
-    ).scalar() or 0
-    
-    all_time_expenses = db.session.query(db.func.sum(FinancialTransaction.amount)).filter(
-        FinancialTransaction.transaction_type == 'expense'
-    ).scalar() or 0
-    
-    all_time_balance = all_time_revenue - all_time_expenses
-    
-    # Get category totals across all periods
-    category_totals = db.session.query(
-        FinancialCategory.name,
-        FinancialCategory.type,
-        db.func.sum(FinancialTransaction.amount).label('total')
-    ).join(FinancialTransaction).group_by(
-        FinancialCategory.id, FinancialCategory.name, FinancialCategory.type
-    ).order_by(db.func.sum(FinancialTransaction.amount).desc()).all()
+    # Per-period and all-time totals from the rollup table
+    totals = period_totals()
+    all_time = combined_totals(totals)
     
     return render_template('admin/financial_reports.html',
                          periods=periods,
-                         all_time_revenue=all_time_revenue,
-                         all_time_expenses=all_time_expenses,
-                         all_time_balance=all_time_balance,
-                         category_totals=category_totals)
+                         period_totals=totals,
+                         all_time_revenue=all_time.revenue,
+                         all_time_expenses=all_time.expenses,
+                         all_time_balance=all_time.net,
+                         category_totals=category_breakdown())
 
 
 @admin_bp.route('/financial/export/<int:period_id>')
@@ -2935,9 +2962,10 @@ def export_financial_period(period_id):
         # Add summary
         writer.writerow([])
         writer.writerow(['SUMMARY'])
-        writer.writerow(['Total Revenue', f"Tsh {period.get_total_revenue():.2f}"])
-        writer.writerow(['Total Expenses', f"Tsh {period.get_total_expenses():.2f}"])
-        writer.writerow(['Net Balance', f"Tsh {period.get_net_balance():.2f}"])
+        totals = period_totals([period.id])[period.id]
+        writer.writerow(['Total Revenue', f"Tsh {totals.revenue:.2f}"])
+        writer.writerow(['Total Expenses', f"Tsh {totals.expenses:.2f}"])
+        writer.writerow(['Net Balance', f"Tsh {totals.net:.2f}"])
         
         # Prepare response
         output.seek(0)
@@ -3540,6 +3568,7 @@ def competitions_finalize(competition_id):
 
     competition.status = 'finalized'
     db.session.commit()
+    invalidate_guards()
 
     # Notify top 3 ranked members by SMS.
     try:
@@ -1,13 +1,27 @@
 from flask import render_template, request, flash, redirect, url_for, jsonify, current_app
 from app.routes import main_bp
 from app.models import News, Event, Project, Gallery, Topic, Member, Leader, Newsletter, Blog, RSVP, User, Technology
-from app import db
-from datetime import datetime
+from app import db, directory, metrics, project_tags
+from app.database import retry_on_lock
+from app.instrumentation import perf_budget
+from app.blog_views import counts_blog_views
+from app.page_cache import cached_page
+from app.search import search_content
+from sqlalchemy.orm import joinedload
+from datetime import datetime, timedelta
 import urllib.parse
 import urllib.request
 import json
 
+EVENT_CATEGORIES = ('workshop', 'hackathon', 'tech_talk', 'social_event')
+EVENTS_PER_PAGE = 12
+DIRECTORY_PER_PAGE = 24
+CALENDAR_MAX_DAYS = 92
+CALENDAR_MAX_AGE = 300
+SEARCH_MAX_LIMIT = 50
+
 @main_bp.route('/')
+@cached_page(News, Event, Project)
 def index():
     try:
         # Get latest news (limit to 3)
@@ -33,10 +47,12 @@ def index():
                          featured_projects=featured_projects)
 
 @main_bp.route('/about')
+@cached_page()
 def about():
     return render_template('about.html')
 
 @main_bp.route('/leaders')
+@cached_page(Leader, Member)
 def leaders():
     try:
         from sqlalchemy.orm import joinedload
@@ -47,45 +63,28 @@ def leaders():
     return render_template('leaders.html', leaders=leaders)
 
 @main_bp.route('/alumni')
+@perf_budget(queries=9, ms=500)
 def alumni():
     try:
         page = request.args.get('page', 1, type=int)
         course_filter = request.args.get('course', '')
         year_filter = request.args.get('year', '')
-        
-        # Query only alumni members
-        query = Member.query.join(Member.user).filter(
-            Member.user.has(is_approved=True),
-            Member.status == 'alumni'
-        )
-        
-        if course_filter:
-            query = query.filter(Member.course.ilike(f'%{course_filter}%'))
-        if year_filter:
-            query = query.filter(Member.year.ilike(f'%{year_filter}%'))
-        
-        alumni = query.all()
-        
-        # Get unique courses and years for filter dropdowns
-        courses = db.session.query(Member.course).filter(Member.status == 'alumni').distinct().all()
-        years = db.session.query(Member.year).filter(Member.status == 'alumni').distinct().all()
-        
-        # Add trophy data to each alumni member
-        for alumnus in alumni:
-            alumnus.trophies = alumnus.get_current_trophies()
-        
-        # Calculate statistics
-        alumni_count = Member.query.filter(Member.status == 'alumni').count()
-        companies_count = len(set([m.title for m in Member.query.filter(Member.status == 'alumni', Member.title.isnot(None)).all() if m.title]))
+        search_query = request.args.get('search', '').strip()
+
+        alumni = directory.directory_query('alumni', course_filter, year_filter, search_query) \
+            .paginate(page=page, per_page=DIRECTORY_PER_PAGE, error_out=False)
+        directory.attach_badges(alumni.items)
+        stats = directory.directory_stats('alumni')
         countries_count = 1  # Default to 1, can be enhanced later
         current_year = datetime.now().year
         
         return render_template('alumni.html', 
                              alumni=alumni,
-                             courses=[c[0] for c in courses if c[0]],
-                             years=[y[0] for y in years if y[0]],
-                             alumni_count=alumni_count,
-                             companies_count=companies_count,
+                             courses=stats['courses'],
+                             years=stats['years'],
+                             search_query=search_query,
+                             alumni_count=stats['count'],
+                             companies_count=stats['companies_count'],
                              countries_count=countries_count,
                              current_year=current_year)
     except Exception as e:
@@ -137,51 +136,41 @@ def members():
                                            course_counts=[]), 200)
 
 @main_bp.route('/students')
+@perf_budget(queries=9, ms=500)
 def students():
     try:
         page = request.args.get('page', 1, type=int)
         course_filter = request.args.get('course', '')
         year_filter = request.args.get('year', '')
-        
-        # Query only student members
-        query = Member.query.join(Member.user).filter(
-            Member.user.has(is_approved=True),
-            Member.status == 'student'
-        )
-        
-        if course_filter:
-            query = query.filter(Member.course.ilike(f'%{course_filter}%'))
-        if year_filter:
-            query = query.filter(Member.year.ilike(f'%{year_filter}%'))
-        
-        students = query.all()
-        
-        # Get unique courses and years for filter dropdowns
-        courses = db.session.query(Member.course).filter(Member.status == 'student').distinct().all()
-        years = db.session.query(Member.year).filter(Member.status == 'student').distinct().all()
-        
-        # Add trophy data and statistics
-        for student in students:
-            student.trophies = student.get_current_trophies()
+        search_query = request.args.get('search', '').strip()
+
+        students = directory.directory_query('student', course_filter, year_filter, search_query) \
+            .paginate(page=page, per_page=DIRECTORY_PER_PAGE, error_out=False)
+        directory.attach_badges(students.items)
+        stats = directory.directory_stats('student')
         
         # Calculate current year for statistics
         current_year = datetime.now().year
         
         return render_template('students.html', 
                              students=students,
-                             courses=[c[0] for c in courses if c[0]],
-                             years=[y[0] for y in years if y[0]],
+                             students_count=stats['count'],
+                             courses=stats['courses'],
+                             years=stats['years'],
+                             search_query=search_query,
                              current_year=current_year)
     except Exception as e:
         # Return empty results if database is not ready
         from flask import make_response
         return make_response(render_template('students.html', 
                                            students=None,
+                                           students_count=0,
                                            courses=[],
                                            years=[],
                                            current_year=datetime.now().year), 200)
 
 @main_bp.route('/news')
+@cached_page(News)
 def news():
     try:
         page = request.args.get('page', 1, type=int)
@@ -203,65 +192,94 @@ def news_detail(news_id):
     return render_template('news_detail.html', news_item=news_item)
 
 @main_bp.route('/events')
+@perf_budget(queries=6, ms=500)
+@cached_page(Event)
 def events():
+    category_filter = request.args.get('category', '')
+    page = request.args.get('page', 1, type=int)
     try:
-        # Get filter parameters
-        category_filter = request.args.get('category', '')
-        
         query = Event.query.filter(Event.target_audience == 'everyone')
-        
-        # Apply category filter
         if category_filter:
             query = query.filter_by(category=category_filter)
-        
-        # Get all events
-        all_events = query.order_by(Event.event_date.desc()).all()
-        
-        # Separate upcoming and past events
+
+        # Upcoming soonest first; past events most recent first, paginated
         now = datetime.utcnow()
-        upcoming_events = [e for e in all_events if e.event_date > now]
-        past_events = [e for e in all_events if e.event_date <= now]
-        
-        # Sort upcoming events ascending (soonest first)
-        upcoming_events.sort(key=lambda x: x.event_date)
-        # Sort past events descending (most recent first)
-        past_events.sort(key=lambda x: x.event_date, reverse=True)
-        
-        # Get category counts for the category cards
-        category_counts = {
-            'workshop': Event.query.filter_by(category='workshop', target_audience='everyone').count(),
-            'hackathon': Event.query.filter_by(category='hackathon', target_audience='everyone').count(),
-            'tech_talk': Event.query.filter_by(category='tech_talk', target_audience='everyone').count(),
-            'social_event': Event.query.filter_by(category='social_event', target_audience='everyone').count()
-        }
-        
-        # Get events for calendar (all events with dates)
-        calendar_events = []
-        for event in all_events:
-            calendar_events.append({
-                'id': event.id,
-                'title': event.title,
-                'date': event.event_date.strftime('%Y-%m-%d'),
-                'time': event.event_date.strftime('%H:%M'),
-                'category': event.category,
-                'location': event.location
-            })
-        
+        upcoming_events = query.filter(Event.event_date > now).order_by(Event.event_date.asc()).all()
+        past_events = query.filter(Event.event_date <= now).order_by(Event.event_date.desc()).paginate(
+            page=page, per_page=EVENTS_PER_PAGE, error_out=False
+        )
+
+        # Category card counts from one grouped query
+        category_counts = dict.fromkeys(EVENT_CATEGORIES, 0)
+        category_counts.update(
+            db.session.query(Event.category, db.func.count(Event.id))
+            .filter(Event.target_audience == 'everyone')
+            .group_by(Event.category)
+            .all()
+        )
     except Exception as e:
         print(f"Error loading events: {e}")
         upcoming_events = []
-        past_events = []
-        category_counts = {'workshop': 0, 'hackathon': 0, 'tech_talk': 0, 'social_event': 0}
-        calendar_events = []
-    
-    return render_template('events.html', 
+        past_events = None
+        category_counts = dict.fromkeys(EVENT_CATEGORIES, 0)
+
+    return render_template('events.html',
                          upcoming_events=upcoming_events,
                          past_events=past_events,
                          category_counts=category_counts,
-                         calendar_events=calendar_events,
                          current_category=category_filter)
 
+@main_bp.route('/events/calendar.json')
+@perf_budget(queries=2, ms=250)
+def events_calendar():
+    """Public events between ``start`` and ``end`` (YYYY-MM-DD, end exclusive) for the calendar widget
+
+    Without parameters the window is the current month; a ``start`` alone runs to the end of its month.
+    """
+    today = datetime.utcnow().date()
+    try:
+        start = datetime.strptime(request.args['start'], '%Y-%m-%d') if request.args.get('start') \
+            else datetime(today.year, today.month, 1)
+        end = datetime.strptime(request.args['end'], '%Y-%m-%d') if request.args.get('end') \
+            else (start.replace(day=1) + timedelta(days=32)).replace(day=1)
+    except ValueError:
+        return jsonify({'error': 'start and end must be YYYY-MM-DD dates'}), 400
+    if end <= start or end - start > timedelta(days=CALENDAR_MAX_DAYS):
+        return jsonify({'error': f'The date window must be between 1 and {CALENDAR_MAX_DAYS} days'}), 400
+
+    query = db.session.query(
+        Event.id, Event.title, Event.event_date, Event.category, Event.location
+    ).filter(
+        Event.target_audience == 'everyone',
+        Event.event_date >= start,
+        Event.event_date < end,
+    )
+    category_filter = request.args.get('category', '')
+    if category_filter:
+        query = query.filter(Event.category == category_filter)
+
+    response = jsonify({
+        'start': start.strftime('%Y-%m-%d'),
+        'end': end.strftime('%Y-%m-%d'),
+        'events': [
+            {
+                'id': row.id,
+                'title': row.title,
+                'date': row.event_date.strftime('%Y-%m-%d'),
+                'time': row.event_date.strftime('%H:%M'),
+                'category': row.category,
+                'location': row.location,
+            }
+            for row in query.order_by(Event.event_date.asc())
+        ],
+    })
+    response.cache_control.public = True
+    response.cache_control.max_age = CALENDAR_MAX_AGE
+    response.add_etag()
+    return response.make_conditional(request)
+
 @main_bp.route('/projects')
+@cached_page(Project, Technology)
 def projects():
     try:
         # Get filter parameter
@@ -270,54 +288,21 @@ def projects():
         # Get all public projects (both admin and member projects), featured first
         query = Project.query.filter_by(is_public=True)
         
-        # Apply category filter based on technologies
+        # Projects tagged with an active technology in the category (indexed join on project_technology)
         if category_filter:
-            # Get technologies for this category from the database
-            category_technologies = Technology.query.filter_by(category=category_filter, is_active=True).all()
-            
-            if category_technologies:
-                # Create a list of technology names for this category
-                tech_names = [tech.name.lower() for tech in category_technologies]
-                
-                # Filter projects that contain any of these technologies
-                query = query.filter(
-                    db.or_(*[Project.technologies.ilike(f'%{tech_name}%') for tech_name in tech_names])
-                )
-            else:
-                # Fallback to hardcoded lists if no technologies in database
-                if category_filter == 'web':
-                    web_techs = ['html', 'css', 'javascript', 'react', 'vue', 'angular', 'node', 'express', 'django', 'flask', 'php', 'laravel', 'wordpress', 'bootstrap', 'tailwind']
-                    query = query.filter(
-                        db.or_(*[Project.technologies.ilike(f'%{tech}%') for tech in web_techs])
-                    )
-                elif category_filter == 'mobile':
-                    mobile_techs = ['react native', 'flutter', 'swift', 'kotlin', 'android', 'ios', 'xamarin', 'ionic', 'cordova']
-                    query = query.filter(
-                        db.or_(*[Project.technologies.ilike(f'%{tech}%') for tech in mobile_techs])
-                    )
-                elif category_filter == 'ai':
-                    ai_techs = ['python', 'tensorflow', 'pytorch', 'keras', 'scikit-learn', 'opencv', 'numpy', 'pandas', 'machine learning', 'deep learning', 'neural network', 'ai', 'artificial intelligence']
-                    query = query.filter(
-                        db.or_(*[Project.technologies.ilike(f'%{tech}%') for tech in ai_techs])
-                    )
-                elif category_filter == 'iot':
-                    iot_techs = ['arduino', 'raspberry pi', 'esp32', 'esp8266', 'sensors', 'mqtt', 'iot', 'internet of things', 'embedded', 'microcontroller']
-                    query = query.filter(
-                        db.or_(*[Project.technologies.ilike(f'%{tech}%') for tech in iot_techs])
-                    )
-                elif category_filter == 'data':
-                    data_techs = ['python', 'r', 'sql', 'pandas', 'numpy', 'matplotlib', 'seaborn', 'plotly', 'jupyter', 'data science', 'analytics', 'visualization', 'machine learning']
-                    query = query.filter(
-                        db.or_(*[Project.technologies.ilike(f'%{tech}%') for tech in data_techs])
-                    )
+            query = query.filter(project_tags.in_category(category_filter))
         
         projects = query.order_by(Project.is_featured.desc(), Project.created_at.desc()).all()
+        tag_counts = project_tags.category_counts()
     except Exception as e:
         print(f"Error loading projects: {e}")
         projects = []
-    return render_template('projects.html', projects=projects, current_category=category_filter)
+        tag_counts = {}
+    return render_template('projects.html', projects=projects, tag_counts=tag_counts,
+                           current_category=category_filter)
 
 @main_bp.route('/gallery')
+@cached_page(Gallery)
 def gallery():
     try:
         gallery_items = Gallery.query.order_by(Gallery.uploaded_at.desc()).all()
@@ -326,6 +311,7 @@ def gallery():
     return render_template('gallery.html', gallery_items=gallery_items)
 
 @main_bp.route('/topics')
+@cached_page(Topic)
 def topics():
     try:
         topics = Topic.query.all()
@@ -376,11 +362,13 @@ def newsletter_subscribe():
 
 # Blog Routes
 @main_bp.route('/blogs')
+@cached_page(Blog)
 def blogs():
     page = request.args.get('page', 1, type=int)
     category = request.args.get('category', '')
     
-    query = Blog.query.filter_by(is_published=True)
+    # Authors are rendered on every card; load them with the page instead of one query each
+    query = Blog.query.options(joinedload(Blog.author)).filter_by(is_published=True)
     
     if category:
         query = query.filter_by(category=category)
@@ -395,14 +383,41 @@ def blogs():
     
     return render_template('blogs.html', blogs=blogs, categories=categories, current_category=category)
 
+@main_bp.route('/search')
+@perf_budget(queries=3, ms=250)
+def search():
+    """Full-text search over blog posts (type=blog) or news (type=news), JSON with keyset pagination"""
+    kind = request.args.get('type', 'blog')
+    limit = max(1, min(request.args.get('limit', 10, type=int) or 10, SEARCH_MAX_LIMIT))
+    try:
+        results, next_cursor = search_content(kind, request.args.get('q', ''), request.args.get('cursor'), limit)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # Results are shared with the search cache; build new dicts for the response
+    return jsonify({
+        'results': [
+            {
+                'id': result['id'],
+                'title': result['title'],
+                'category': result['category'],
+                'published_date': result['published_date'],
+                'snippet': result['snippet'],
+                'url': url_for('main.blog_post', slug=result['slug']) if kind == 'blog'
+                else url_for('main.news_detail', news_id=result['id']),
+            }
+            for result in results
+        ],
+        'next_cursor': next_cursor,
+    })
+
 @main_bp.route('/blogs/<slug>')
+@counts_blog_views
+@cached_page(Blog)
 def blog_post(slug):
+    # Views are buffered per worker and flushed in batches (app/blog_views.py)
     blog = Blog.query.filter_by(slug=slug, is_published=True).first_or_404()
     
-    # Increment view count
-    blog.views += 1
-    db.session.commit()
-    
     # Get related posts
     related_posts = Blog.query.filter(
         Blog.category == blog.category,
@@ -429,9 +444,10 @@ def _verify_turnstile(response_token, remote_ip=None):
             data=data,
             method='POST'
         )
-        with urllib.request.urlopen(req, timeout=8) as resp:
-            result = json.loads(resp.read().decode('utf-8'))
-            return bool(result.get('success'))
+        with metrics.track_outbound('turnstile'):
+            with urllib.request.urlopen(req, timeout=8) as resp:
+                result = json.loads(resp.read().decode('utf-8'))
+        return bool(result.get('success'))
     except Exception:
         return False
 
@@ -519,8 +535,10 @@ def event_rsvp(event_id):
             additional_notes=additional_notes
         )
         
-        db.session.add(rsvp)
-        db.session.commit()
+        def save_rsvp():
+            db.session.add(rsvp)
+            db.session.commit()
+        retry_on_lock(save_rsvp)
         
         flash('RSVP submitted successfully! You will receive an email/SMS once approved.', 'success')
         return redirect(url_for('main.events'))
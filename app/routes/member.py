@@ -28,12 +28,16 @@ from app.models import (
     Event,
 )
 from app import db
-from app.id_generator import generate_digital_id, delete_digital_id
+from app.id_generator import generate_digital_id, delete_digital_id, get_back_filename
 from app.member_requirements import is_allowed_course
+from app.instrumentation import perf_budget
+from app.financial_rollup import period_totals as rollup_period_totals
+from app.search import search_members
 import os
 import json
 from datetime import datetime
 from sqlalchemy import inspect
+from sqlalchemy.orm import contains_eager
 from sqlalchemy.exc import SQLAlchemyError
 
 def _normalize_name(value):
@@ -74,18 +78,7 @@ def members_search():
     limit = max(1, min(limit, 30))
 
     query = Member.query.join(User).filter(User.is_approved == True)
-    if q:
-        like = f"%{q}%"
-        query = query.filter(
-            db.or_(
-                Member.full_name.ilike(like),
-                Member.member_id_number.ilike(like),
-                User.email.ilike(like),
-                Member.course.ilike(like),
-            )
-        )
-
-    members = query.order_by(Member.full_name.asc()).limit(limit).all()
+    members = search_members(query, q, limit)
     return jsonify({
         'results': [
             {
@@ -188,15 +181,14 @@ def profile():
     current_period = FinancialPeriod.query.filter_by(status='open').order_by(FinancialPeriod.start_date.desc()).first()
     period_totals = None
     if current_period:
-        total_revenue = current_period.get_total_revenue()
-        total_expenses = current_period.get_total_expenses()
+        totals = rollup_period_totals([current_period.id])[current_period.id]
         period_totals = {
-            'revenue': total_revenue,
-            'expenses': total_expenses,
-            'net': total_revenue - total_expenses,
-            'revenue_count': current_period.transactions.filter_by(transaction_type='revenue').count(),
-            'expense_count': current_period.transactions.filter_by(transaction_type='expense').count(),
-            'transaction_count': current_period.get_transaction_count(),
+            'revenue': totals.revenue,
+            'expenses': totals.expenses,
+            'net': totals.net,
+            'revenue_count': totals.revenue_count,
+            'expense_count': totals.expense_count,
+            'transaction_count': totals.count,
         }
     
     return render_template(
@@ -451,10 +443,7 @@ def download_id(side='front'):
     
     # Determine which side to download
     if side == 'back':
-        filename = member.digital_id_path.replace('_front.png', '_back.png')
-        if not filename.endswith('_back.png'):
-            # Handle old format
-            filename = member.digital_id_path.replace('.png', '_back.png')
+        filename = get_back_filename(member.digital_id_path)
         download_name = f'DigitalClub_ID_{member.member_id_number}_back.png'
     else:
         filename = member.digital_id_path
@@ -574,6 +563,7 @@ def membership():
 
 
 @member_bp.route('/competitions/rankings')
+@perf_budget(queries=6, ms=500)
 @login_required
 def competitions_rankings():
     points_rows = db.session.query(
@@ -588,13 +578,20 @@ def competitions_rankings():
 
     top_member = points_rows[0] if points_rows else None
 
+    # Submission count and best rank for every member in one grouped query
+    submission_stats = {
+        member_id: (count, best_rank)
+        for member_id, count, best_rank in db.session.query(
+            CompetitionSubmission.member_id,
+            db.func.count(CompetitionSubmission.id),
+            db.func.min(db.func.nullif(CompetitionSubmission.rank, 0)),
+        ).group_by(CompetitionSubmission.member_id)
+    }
+
     leaderboard = []
     my_entry = None
     for idx, (member, points) in enumerate(points_rows, start=1):
-        submissions = CompetitionSubmission.query.filter_by(member_id=member.id).all()
-        competitions_count = len(submissions)
-        ranks = [s.rank for s in submissions if s.rank]
-        best_rank = min(ranks) if ranks else None
+        competitions_count, best_rank = submission_stats.get(member.id, (0, None))
         entry = {
             'rank': idx,
             'member': member,
@@ -607,10 +604,10 @@ def competitions_rankings():
         leaderboard.append(entry)
 
     teams = Team.query.order_by(Team.rating.desc(), Team.name.asc()).all()
-    team_members = {}
-    for team in teams:
-        members = team.members.join(Member).order_by(TeamMember.is_leader.desc(), Member.full_name.asc()).all()
-        team_members[team.id] = members
+    team_members = {team.id: [] for team in teams}
+    for team_member in TeamMember.query.join(Member).options(contains_eager(TeamMember.member)) \
+            .order_by(TeamMember.is_leader.desc(), Member.full_name.asc()):
+        team_members.setdefault(team_member.team_id, []).append(team_member)
 
     return render_template(
         'member/competitions_rankings.html',
@@ -630,15 +627,16 @@ def events():
     query = Event.query.filter(Event.target_audience.in_(['members', 'paid_members']))
     if not (member and member.has_valid_membership()):
         query = query.filter(Event.target_audience == 'members')
-    events_all = query.order_by(Event.event_date.asc()).all()
-    upcoming_events = [e for e in events_all if e.event_date >= now]
-    past_events = [e for e in events_all if e.event_date < now]
+    query = query.order_by(Event.event_date.asc())
+    upcoming_events = query.filter(Event.event_date >= now).all()
+    past_events = query.filter(Event.event_date < now).all()
 
     my_rsvps = {}
-    if member and events_all:
+    event_ids = [e.id for e in upcoming_events + past_events]
+    if member and event_ids:
         rsvps = RSVP.query.filter(
             RSVP.member_id == member.id,
-            RSVP.event_id.in_([e.id for e in events_all]),
+            RSVP.event_id.in_(event_ids),
         ).all()
         my_rsvps = {r.event_id: r for r in rsvps}
 
@@ -974,6 +972,7 @@ def competition_submit(competition_id):
 
 
 @member_bp.route('/competitions/<int:competition_id>/leaderboard')
+@perf_budget(queries=30, ms=750)
 @login_required
 def competition_leaderboard(competition_id):
     competition = Competition.query.get_or_404(competition_id)
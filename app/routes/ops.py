@@ -0,0 +1,67 @@
+"""
+Operational routes
+/healthz for container readiness checks and /metrics for Prometheus scrapes.
+/metrics is closed unless a token or an allowlist is configured.
+
+Settings (environment):
+    METRICS_TOKEN             scrapers send it as a Bearer token
+    METRICS_ALLOWED_NETWORKS  comma-separated addresses/CIDRs allowed without the
+                              token, e.g. 127.0.0.1/32 (matched on remote_addr)
+"""
+
+import hmac
+import ipaddress
+import os
+from flask import Blueprint, Response, abort, current_app, jsonify, request
+from sqlalchemy import text
+from app import db
+from app import metrics
+
+ops_bp = Blueprint('ops', __name__)
+
+
+def _allowed_networks():
+    networks = []
+    for entry in os.environ.get('METRICS_ALLOWED_NETWORKS', '').split(','):
+        if entry.strip():
+            try:
+                networks.append(ipaddress.ip_network(entry.strip(), strict=False))
+            except ValueError:
+                current_app.logger.warning('Ignoring invalid METRICS_ALLOWED_NETWORKS entry %r', entry)
+    return networks
+
+
+def _metrics_allowed():
+    """A matching METRICS_TOKEN, or a scraper inside METRICS_ALLOWED_NETWORKS; nobody when neither is set"""
+    token = os.environ.get('METRICS_TOKEN', '')
+    if token:
+        supplied = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+        if hmac.compare_digest(supplied.encode(), token.encode()):
+            return True
+    try:
+        address = ipaddress.ip_address(request.remote_addr or '')
+    except ValueError:
+        return False
+    return any(address in network for network in _allowed_networks())
+
+
+@ops_bp.route('/healthz')
+def healthz():
+    """Readiness probe: the worker is up and can reach the database"""
+    try:
+        with db.engine.connect() as conn:
+            conn.execute(text('SELECT 1'))
+    except Exception as e:
+        return jsonify({'status': 'unavailable', 'error': type(e).__name__}), 503
+    return jsonify({'status': 'ok'})
+
+
+@ops_bp.route('/metrics')
+def prometheus_metrics():
+    if not _metrics_allowed():
+        abort(404)
+    if not metrics.enabled():
+        return Response('prometheus_client is not installed\n', status=503, mimetype='text/plain')
+    metrics.record_pool_status()
+    body, content_type = metrics.render_latest()
+    return Response(body, content_type=content_type)
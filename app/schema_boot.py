@@ -0,0 +1,278 @@
+"""
+Boot-time schema reconciliation
+Compatibility migrations for databases that predate the Alembic revisions.
+They run once per deployment: the first worker takes a database advisory lock
+(or a lock file for SQLite), applies them and records a fingerprint, and every
+later worker sees the fingerprint and skips the schema probes entirely. Each
+step commits on its own; the fingerprint is only recorded once all succeed, so
+a failing step is retried on the next boot without blocking the others.
+"""
+
+import hashlib
+import os
+import time
+import zlib
+from contextlib import contextmanager
+from datetime import datetime
+from sqlalchemy import inspect, text
+from app import db
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+FINGERPRINT_SETTING_KEY = 'schema_boot_fingerprint'
+ADVISORY_LOCK_KEY = zlib.crc32(b'digital-club-schema-boot')
+
+# Bump when a step changes behaviour without being renamed
+RECONCILE_VERSION = 2
+
+# Databases already reconciled by this process (create_app() also runs in background threads)
+_reconciled = set()
+
+
+def _migrate_password_hash_column(conn, inspector):
+    """Migrate password_hash column from varchar(128) to varchar(256) if needed"""
+    # SQLite doesn't need migration as it doesn't enforce length constraints
+    if conn.dialect.name != 'postgresql':
+        return
+    # Check current column type
+    result = conn.execute(text("""
+        SELECT character_maximum_length
+        FROM information_schema.columns
+        WHERE table_name = 'user'
+        AND column_name = 'password_hash'
+    """))
+    row = result.fetchone()
+
+    if row and row[0] == 128:
+        print("Migrating password_hash column from varchar(128) to varchar(256)...")
+        conn.execute(text("ALTER TABLE \"user\" ALTER COLUMN password_hash TYPE VARCHAR(256)"))
+        print("✓ Successfully migrated password_hash column to VARCHAR(256)")
+
+
+def _migrate_user_active_account_column(conn, inspector):
+    """Compatibility migration: add user.is_active_account if missing."""
+    if 'user' not in inspector.get_table_names():
+        return
+
+    cols = {c['name'] for c in inspector.get_columns('user')}
+    if 'is_active_account' in cols:
+        return
+
+    if conn.dialect.name == 'postgresql':
+        conn.execute(
+            text('ALTER TABLE "user" ADD COLUMN is_active_account BOOLEAN NOT NULL DEFAULT TRUE')
+        )
+    else:
+        # SQLite and others
+        conn.execute(
+            text('ALTER TABLE "user" ADD COLUMN is_active_account BOOLEAN NOT NULL DEFAULT 1')
+        )
+
+
+def _migrate_event_target_audience_column(conn, inspector):
+    """Compatibility migration: add event.target_audience if missing."""
+    if 'event' not in inspector.get_table_names():
+        return
+
+    cols = {c['name'] for c in inspector.get_columns('event')}
+    if 'target_audience' in cols:
+        return
+
+    conn.execute(
+        text("ALTER TABLE event ADD COLUMN target_audience VARCHAR(20) NOT NULL DEFAULT 'everyone'")
+    )
+
+
+def _migrate_rsvp_attendee_fields(conn, inspector):
+    """Compatibility migration: add RSVP attendee fields if missing."""
+    if 'rsvp' not in inspector.get_table_names():
+        return
+    cols = {c['name'] for c in inspector.get_columns('rsvp')}
+    if 'attendee_type' not in cols:
+        conn.execute(text("ALTER TABLE rsvp ADD COLUMN attendee_type VARCHAR(20)"))
+    if 'study_field' not in cols:
+        conn.execute(text("ALTER TABLE rsvp ADD COLUMN study_field VARCHAR(100)"))
+    if 'study_year' not in cols:
+        conn.execute(text("ALTER TABLE rsvp ADD COLUMN study_year VARCHAR(20)"))
+    if 'non_student_role' not in cols:
+        conn.execute(text("ALTER TABLE rsvp ADD COLUMN non_student_role VARCHAR(30)"))
+
+
+def _migrate_competition_enrollment_notice_fields(conn, inspector):
+    """Compatibility migration: add competition enrollment notice fields if missing."""
+    if 'competition_enrollment' not in inspector.get_table_names():
+        return
+    cols = {c['name'] for c in inspector.get_columns('competition_enrollment')}
+    if 'admin_notice' not in cols:
+        conn.execute(text("ALTER TABLE competition_enrollment ADD COLUMN admin_notice TEXT"))
+    if 'admin_notice_by' not in cols:
+        conn.execute(text("ALTER TABLE competition_enrollment ADD COLUMN admin_notice_by INTEGER"))
+    if 'admin_notice_at' not in cols:
+        conn.execute(text("ALTER TABLE competition_enrollment ADD COLUMN admin_notice_at DATETIME"))
+
+
+def _migrate_checkin_manifest_columns(conn, inspector):
+    """Compatibility migration: add the check-in manifest version columns if missing."""
+    tables = set(inspector.get_table_names())
+    if 'event' in tables and 'manifest_version' not in {c['name'] for c in inspector.get_columns('event')}:
+        conn.execute(text("ALTER TABLE event ADD COLUMN manifest_version INTEGER NOT NULL DEFAULT 0"))
+    if 'rsvp' in tables and 'manifest_version' not in {c['name'] for c in inspector.get_columns('rsvp')}:
+        conn.execute(text("ALTER TABLE rsvp ADD COLUMN manifest_version INTEGER NOT NULL DEFAULT 0"))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_rsvp_event_manifest_version ON rsvp (event_id, manifest_version)"
+        ))
+
+
+def _migrate_checkin_points_column(conn, inspector):
+    """Compatibility migration: add rsvp.points_processed_at; existing check-ins were already rewarded."""
+    if 'rsvp' not in inspector.get_table_names():
+        return
+    if 'points_processed_at' in {c['name'] for c in inspector.get_columns('rsvp')}:
+        return
+    column_type = 'TIMESTAMP' if conn.dialect.name == 'postgresql' else 'DATETIME'
+    conn.execute(text(f"ALTER TABLE rsvp ADD COLUMN points_processed_at {column_type}"))
+    conn.execute(text(
+        "UPDATE rsvp SET points_processed_at = COALESCE(checked_in_at, CURRENT_TIMESTAMP) WHERE checked_in = :yes"
+    ), {'yes': True})
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_rsvp_points_processed_at ON rsvp (points_processed_at)"))
+
+
+def _install_search_indexes(conn, inspector):
+    """Member search indexes: pg_trgm GIN indexes on PostgreSQL, an FTS5 table on SQLite"""
+    from app.search import install_search_indexes
+    install_search_indexes(conn, inspector)
+
+
+RECONCILE_STEPS = [
+    _migrate_password_hash_column,
+    _migrate_user_active_account_column,
+    _migrate_event_target_audience_column,
+    _migrate_rsvp_attendee_fields,
+    _migrate_competition_enrollment_notice_fields,
+    _migrate_checkin_manifest_columns,
+    _migrate_checkin_points_column,
+    _install_search_indexes,
+]
+
+
+def schema_fingerprint():
+    """Identifies the set of reconcile steps shipped with this deployment"""
+    names = ','.join(step.__name__ for step in RECONCILE_STEPS)
+    return hashlib.sha1(f'{RECONCILE_VERSION}:{names}'.encode('utf-8')).hexdigest()
+
+
+def _read_fingerprint(conn):
+    from app.models import SystemSettings
+    table = SystemSettings.__table__
+    try:
+        return conn.execute(
+            table.select().with_only_columns(table.c.setting_value)
+            .where(table.c.setting_key == FINGERPRINT_SETTING_KEY)
+        ).scalar()
+    except Exception:
+        # Settings table not created yet (fresh database before `flask db upgrade`)
+        return None
+
+
+def _write_fingerprint(conn, fingerprint):
+    from app.models import SystemSettings
+    table = SystemSettings.__table__
+    values = {
+        'setting_value': fingerprint,
+        'description': 'Schema reconciliation fingerprint (written at boot)',
+        'updated_at': datetime.utcnow(),
+    }
+    updated = conn.execute(
+        table.update().where(table.c.setting_key == FINGERPRINT_SETTING_KEY).values(**values)
+    ).rowcount
+    if not updated:
+        conn.execute(table.insert().values(setting_key=FINGERPRINT_SETTING_KEY, **values))
+
+
+@contextmanager
+def _boot_lock(engine):
+    """Serialise reconciliation across workers: advisory lock on PostgreSQL, lock file for SQLite"""
+    if engine.dialect.name == 'postgresql':
+        with engine.connect() as lock_conn:
+            lock_conn.execute(text('SELECT pg_advisory_lock(:key)'), {'key': ADVISORY_LOCK_KEY})
+            try:
+                yield
+            finally:
+                lock_conn.execute(text('SELECT pg_advisory_unlock(:key)'), {'key': ADVISORY_LOCK_KEY})
+                lock_conn.commit()
+        return
+
+    database = engine.url.database
+    if engine.dialect.name != 'sqlite' or fcntl is None or not database or database == ':memory:':
+        yield
+        return
+
+    with open(f'{database}.boot.lock', 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _run_steps(engine):
+    """Run each step in its own transaction so one failure does not undo the others; True if all succeeded"""
+    succeeded = True
+    for step in RECONCILE_STEPS:
+        try:
+            with engine.begin() as conn:
+                step(conn, inspect(conn))
+        except Exception as e:
+            succeeded = False
+            print(f"[boot] Schema step {step.__name__} failed (pid {os.getpid()}): {e}")
+    return succeeded
+
+
+def reconcile_schema(app):
+    """
+    Apply the compatibility migrations once per deployment
+
+    Returns:
+        str: 'cached' (already done in this process), 'skipped' (fingerprint matched),
+        'applied', or 'failed'
+    """
+    from app.models import SystemSettings
+
+    with app.app_context():
+        engine = db.engine
+        cache_key = str(engine.url)
+        if cache_key in _reconciled:
+            return 'cached'
+
+        started = time.perf_counter()
+        fingerprint = schema_fingerprint()
+        outcome = 'skipped'
+        try:
+            with engine.connect() as conn:
+                current = _read_fingerprint(conn)
+
+            if current != fingerprint:
+                with _boot_lock(engine):
+                    with engine.connect() as conn:
+                        has_settings = SystemSettings.__tablename__ in inspect(conn).get_table_names()
+                        # Another worker may have finished while we waited for the lock
+                        done = has_settings and _read_fingerprint(conn) == fingerprint
+                    if not done:
+                        outcome = 'applied' if _run_steps(engine) else 'failed'
+                        # A failed step is retried by the next boot
+                        if outcome == 'applied' and has_settings:
+                            with engine.begin() as conn:
+                                _write_fingerprint(conn, fingerprint)
+        except Exception as e:
+            # Keep startup resilient; proper Alembic migrations still exist.
+            outcome = 'failed'
+            print(f"[boot] Schema reconciliation failed (pid {os.getpid()}): {e}")
+
+        if outcome != 'failed':
+            _reconciled.add(cache_key)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        print(f"[boot] Schema reconciliation {outcome} in {elapsed_ms:.1f} ms (pid {os.getpid()})")
+        return outcome
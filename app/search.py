@@ -0,0 +1,496 @@
+"""
+Search backends
+Member lookups (admin/member live search, the members list, digital IDs and
+exports) go through filter_members() and search_members() so they can use an
+index instead of ILIKE '%q%' scans:
+
+    PostgreSQL  pg_trgm GIN indexes on the searched columns; ILIKE and
+                word-similarity (typo tolerant) matches both use them
+    SQLite      an FTS5 table (trigram tokenizer) kept in sync by triggers
+    otherwise   the original ILIKE filters
+
+Blog and news full-text search (search_content) uses a generated tsvector
+column with a GIN index on PostgreSQL and external-content FTS5 tables kept in
+sync by triggers on SQLite, so edits are reindexed row by row as they commit.
+
+The indexes are installed by schema_boot (install_search_indexes) and are not
+part of the model metadata, so Alembic autogenerate is told to ignore them.
+"""
+
+import base64
+import binascii
+import json
+import os
+import re
+from types import SimpleNamespace
+from markupsafe import Markup, escape
+from sqlalchemy import and_, column, func, inspect, literal, literal_column, or_, select, table, text, union
+from app import db
+from app.cache import TTLCache
+from app.models import Blog, Member, News, User
+from app.page_cache import model_versions, track_versions
+
+MEMBER_FTS_TABLE = 'member_search'
+
+# Trigram indexes created on PostgreSQL: name -> (table, column)
+TRGM_INDEXES = {
+    'ix_member_full_name_trgm': ('member', 'full_name'),
+    'ix_member_member_id_number_trgm': ('member', 'member_id_number'),
+    'ix_member_course_trgm': ('member', 'course'),
+    'ix_user_email_trgm': ('user', 'email'),
+}
+
+# Fields searched by the list/export filters (the live search endpoints also match course)
+FILTER_FIELDS = ('full_name', 'member_id_number', 'email')
+SEARCH_FIELDS = FILTER_FIELDS + ('course',)
+
+# Trigram overlap needed for a typo-tolerant (fuzzy) match on SQLite
+FUZZY_MIN_OVERLAP = 0.5
+
+# Full-text sources: FTS5 table, indexed columns with bm25 weights, tsvector weights on PostgreSQL
+CONTENT_SOURCES = {
+    'blog': SimpleNamespace(
+        model=Blog, table='blog', fts='blog_search',
+        columns=(('title', 10.0, 'A'), ('excerpt', 4.0, 'B'), ('tags', 4.0, 'B'), ('content', 1.0, 'D')),
+    ),
+    'news': SimpleNamespace(
+        model=News, table='news', fts='news_search',
+        columns=(('title', 10.0, 'A'), ('content', 1.0, 'D')),
+    ),
+}
+SEARCH_VECTOR_COLUMN = 'search_vector'
+
+# Highlight markers placed by snippet()/ts_headline, turned into <mark> after escaping
+_MARK_START, _MARK_END = '\x02', '\x03'
+
+_results_cache = TTLCache(
+    'content_search', ttl=int(os.environ.get('CONTENT_SEARCH_CACHE_TTL', '3600')), max_entries=1000
+)
+
+_member_fts = table(MEMBER_FTS_TABLE, column('rowid'), column('rank'), *(column(name) for name in SEARCH_FIELDS))
+_backends = {}
+
+
+def _sqlite_member_ddl():
+    source = (
+        "SELECT new.id, new.full_name, new.member_id_number, new.course, "
+        '(SELECT email FROM "user" WHERE id = new.user_id)'
+    )
+    columns = 'rowid, full_name, member_id_number, course, email'
+    return [
+        f"CREATE VIRTUAL TABLE {MEMBER_FTS_TABLE} USING fts5("
+        f"full_name, member_id_number, course, email, tokenize='trigram')",
+        f"INSERT INTO {MEMBER_FTS_TABLE} ({columns}) "
+        'SELECT member.id, member.full_name, member.member_id_number, member.course, "user".email '
+        'FROM member LEFT JOIN "user" ON "user".id = member.user_id',
+        f"CREATE TRIGGER {MEMBER_FTS_TABLE}_ai AFTER INSERT ON member BEGIN "
+        f"INSERT INTO {MEMBER_FTS_TABLE} ({columns}) {source}; END",
+        f"CREATE TRIGGER {MEMBER_FTS_TABLE}_au AFTER UPDATE OF full_name, member_id_number, course, user_id "
+        f"ON member BEGIN DELETE FROM {MEMBER_FTS_TABLE} WHERE rowid = old.id; "
+        f"INSERT INTO {MEMBER_FTS_TABLE} ({columns}) {source}; END",
+        f"CREATE TRIGGER {MEMBER_FTS_TABLE}_ad AFTER DELETE ON member BEGIN "
+        f"DELETE FROM {MEMBER_FTS_TABLE} WHERE rowid = old.id; END",
+        f'CREATE TRIGGER {MEMBER_FTS_TABLE}_user_au AFTER UPDATE OF email ON "user" BEGIN '
+        f"UPDATE {MEMBER_FTS_TABLE} SET email = new.email "
+        "WHERE rowid IN (SELECT id FROM member WHERE user_id = new.id); END",
+    ]
+
+
+def _fts5_trigram_supported(conn):
+    try:
+        conn.execute(text("CREATE VIRTUAL TABLE temp._fts5_probe USING fts5(x, tokenize='trigram')"))
+        conn.execute(text("DROP TABLE temp._fts5_probe"))
+        return True
+    except Exception:
+        return False
+
+
+def _sqlite_content_ddl(source):
+    """External-content FTS5 table over the source table, reindexed row by row by triggers"""
+    fts, columns = source.fts, ', '.join(name for name, _weight, _pg in source.columns)
+    new = ', '.join(f'new.{name}' for name, _weight, _pg in source.columns)
+    old = ', '.join(f'old.{name}' for name, _weight, _pg in source.columns)
+    delete_old = f"INSERT INTO {fts} ({fts}, rowid, {columns}) VALUES ('delete', old.id, {old});"
+    insert_new = f"INSERT INTO {fts} (rowid, {columns}) VALUES (new.id, {new});"
+    return [
+        f"CREATE VIRTUAL TABLE {fts} USING fts5({columns}, content='{source.table}', content_rowid='id', "
+        "tokenize='porter unicode61 remove_diacritics 2')",
+        f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')",
+        f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {source.table} BEGIN {insert_new} END",
+        f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {source.table} BEGIN {delete_old} END",
+        f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {columns} ON {source.table} BEGIN {delete_old} {insert_new} END",
+    ]
+
+
+def _postgres_content_ddl(source):
+    """Generated tsvector column (recomputed on every row write) with a GIN index"""
+    vector = ' || '.join(
+        f"setweight(to_tsvector('english', coalesce({name}, '')), '{weight}')"
+        for name, _bm25, weight in source.columns
+    )
+    return [
+        f"ALTER TABLE {source.table} ADD COLUMN IF NOT EXISTS {SEARCH_VECTOR_COLUMN} tsvector "
+        f"GENERATED ALWAYS AS ({vector}) STORED",
+        f"CREATE INDEX IF NOT EXISTS ix_{source.table}_{SEARCH_VECTOR_COLUMN} "
+        f"ON {source.table} USING gin ({SEARCH_VECTOR_COLUMN})",
+    ]
+
+
+def _install_member_index(conn, tables):
+    if 'member' not in tables or 'user' not in tables:
+        return
+    if conn.dialect.name == 'postgresql':
+        # Needs CREATE privilege on the database; searches fall back to ILIKE without it
+        try:
+            with conn.begin_nested():
+                conn.execute(text('CREATE EXTENSION IF NOT EXISTS pg_trgm'))
+        except Exception as e:
+            print(f"[boot] pg_trgm unavailable, member search uses ILIKE: {e}")
+            return
+        for name, (table_name, column_name) in TRGM_INDEXES.items():
+            conn.execute(text(
+                f'CREATE INDEX IF NOT EXISTS {name} ON "{table_name}" USING gin ({column_name} gin_trgm_ops)'
+            ))
+    elif conn.dialect.name == 'sqlite':
+        if MEMBER_FTS_TABLE not in tables and _fts5_trigram_supported(conn):
+            for statement in _sqlite_member_ddl():
+                conn.execute(text(statement))
+
+
+def _install_content_indexes(conn, tables):
+    for source in CONTENT_SOURCES.values():
+        if source.table not in tables:
+            continue
+        if conn.dialect.name == 'postgresql':
+            statements = _postgres_content_ddl(source)
+        elif conn.dialect.name == 'sqlite' and source.fts not in tables:
+            statements = _sqlite_content_ddl(source)
+        else:
+            continue
+        for statement in statements:
+            conn.execute(text(statement))
+
+
+def install_search_indexes(conn, inspector=None):
+    """Create the search indexes for this database if missing (idempotent)"""
+    tables = set((inspector or inspect(conn)).get_table_names())
+    _install_member_index(conn, tables)
+    _install_content_indexes(conn, tables)
+    _backends.clear()
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    """Alembic autogenerate filter: leave the search tables, columns and indexes alone"""
+    if reflected and compare_to is None and name:
+        search_tables = (MEMBER_FTS_TABLE,) + tuple(source.fts for source in CONTENT_SOURCES.values())
+        return not (
+            name.startswith(search_tables) or name in TRGM_INDEXES or name == SEARCH_VECTOR_COLUMN
+            or name.endswith(f'_{SEARCH_VECTOR_COLUMN}')
+        )
+    return True
+
+
+def _detect(name, probe):
+    """Run ``probe(conn, dialect)`` once per database and remember its answer"""
+    engine = db.engine
+    key = (str(engine.url), name)
+    if key not in _backends:
+        try:
+            with engine.connect() as conn:
+                _backends[key] = probe(conn, engine.dialect.name)
+        except Exception:
+            _backends[key] = None
+    return _backends[key]
+
+
+def _table_exists(conn, name):
+    return conn.execute(text("SELECT 1 FROM sqlite_master WHERE name = :name"), {'name': name}).first() is not None
+
+
+def member_backend():
+    """'pg_trgm', 'fts5' or None (ILIKE), detected once per database"""
+    def probe(conn, dialect):
+        if dialect == 'postgresql':
+            if conn.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).first():
+                return 'pg_trgm'
+        elif dialect == 'sqlite' and _table_exists(conn, MEMBER_FTS_TABLE):
+            return 'fts5'
+        return None
+    return _detect('member', probe)
+
+
+def content_backend(kind):
+    """'tsvector', 'fts5' or None (ILIKE) for a CONTENT_SOURCES entry"""
+    source = CONTENT_SOURCES[kind]
+
+    def probe(conn, dialect):
+        if dialect == 'postgresql':
+            found = conn.execute(text(
+                "SELECT 1 FROM information_schema.columns WHERE table_name = :table AND column_name = :column"
+            ), {'table': source.table, 'column': SEARCH_VECTOR_COLUMN}).first()
+            return 'tsvector' if found else None
+        if dialect == 'sqlite' and _table_exists(conn, source.fts):
+            return 'fts5'
+        return None
+    return _detect(kind, probe)
+
+
+def _phrase(q):
+    return '"' + q.replace('"', '""') + '"'
+
+
+def _trigrams(value, padded=True):
+    """Trigrams of each word, padded like pg_trgm so word starts and ends weigh in"""
+    grams = set()
+    for word in (value or '').lower().split():
+        if padded:
+            word = f'  {word} '
+        grams.update(word[i:i + 3] for i in range(len(word) - 2))
+    return grams
+
+
+def _like_criteria(q, fields):
+    like = f'%{q}%'
+    columns = {'full_name': Member.full_name, 'member_id_number': Member.member_id_number,
+               'course': Member.course, 'email': User.email}
+    return [columns[field].ilike(like) for field in fields]
+
+
+def _matching_ids(q, fields, backend):
+    """Subquery of member ids whose ``fields`` contain ``q`` (case-insensitive)"""
+    if backend == 'fts5' and len(q) >= 3:
+        match = '{' + ' '.join(fields) + '} : ' + _phrase(q)
+        return select(_member_fts.c.rowid).where(literal_column(MEMBER_FTS_TABLE).op('MATCH')(match))
+
+    # One branch per table so PostgreSQL can use each trigram index (BitmapOr) instead of a join scan
+    member_fields = [field for field in fields if field != 'email']
+    branches = [select(Member.id).where(or_(*_like_criteria(q, member_fields)))]
+    if 'email' in fields:
+        branches.append(select(Member.id).join(User, User.id == Member.user_id).where(User.email.ilike(f'%{q}%')))
+    return union(*branches)
+
+
+def filter_members(query, q, fields=FILTER_FIELDS):
+    """Restrict a Member query to members whose ``fields`` contain ``q``"""
+    q = (q or '').strip()
+    if not q:
+        return query
+    return query.filter(Member.id.in_(_matching_ids(q, fields, member_backend())))
+
+
+def _fuzzy_fts_ids(q, limit):
+    """SQLite: members sharing most of the query's trigrams (typos, transpositions), best first"""
+    grams = _trigrams(q)
+    candidates = _trigrams(q, padded=False)
+    if len(candidates) < 2:
+        return []
+    match = ' OR '.join(_phrase(gram) for gram in sorted(candidates))
+    rows = db.session.execute(
+        select(_member_fts.c.rowid, *(_member_fts.c[field] for field in SEARCH_FIELDS))
+        .where(literal_column(MEMBER_FTS_TABLE).op('MATCH')(match))
+        .order_by(_member_fts.c.rank)
+        .limit(200)
+    )
+    scored = []
+    for row in rows:
+        best = max(len(grams & _trigrams(value)) / len(grams) for value in row[1:])
+        if best >= FUZZY_MIN_OVERLAP:
+            scored.append((-best, row.rowid))
+    return [member_id for _score, member_id in sorted(scored)[:limit]]
+
+
+def search_members(query, q, limit):
+    """
+    Ranked, prefix and typo tolerant member search for the live-search endpoints
+
+    ``query`` must already join User (it may add filters such as is_approved).
+
+    Returns:
+        list: up to ``limit`` Member rows, best match first
+    """
+    q = (q or '').strip()
+    if not q:
+        return query.order_by(Member.full_name.asc()).limit(limit).all()
+
+    backend = member_backend()
+    if backend == 'pg_trgm':
+        word_score = func.greatest(
+            func.word_similarity(q, Member.full_name),
+            func.word_similarity(q, User.email),
+            func.word_similarity(q, func.coalesce(Member.member_id_number, '')),
+            func.word_similarity(q, func.coalesce(Member.course, '')),
+        )
+        fuzzy = union(
+            select(Member.id).where(or_(Member.full_name.op('%>')(q), Member.course.op('%>')(q))),
+            select(Member.id).join(User, User.id == Member.user_id).where(User.email.op('%>')(q)),
+        )
+        substring = or_(*_like_criteria(q, SEARCH_FIELDS))
+        return query.filter(
+            or_(Member.id.in_(_matching_ids(q, SEARCH_FIELDS, backend)), Member.id.in_(fuzzy))
+        ).order_by(
+            func.coalesce(substring, False).desc(), Member.full_name.ilike(f'{q}%').desc(),
+            word_score.desc(), Member.full_name.asc(),
+        ).limit(limit).all()
+
+    if backend == 'fts5' and len(q) >= 3:
+        members = query.join(_member_fts, _member_fts.c.rowid == Member.id).filter(
+            literal_column(MEMBER_FTS_TABLE).op('MATCH')(_phrase(q))
+        ).order_by(
+            # bm25 adds little for substring hits and costs more than the join at 50k members
+            Member.full_name.ilike(f'{q}%').desc(), Member.full_name.asc(),
+        ).limit(limit).all()
+        if not members:
+            # No exact hits: probably a typo, rank by shared trigrams instead
+            fuzzy_ids = _fuzzy_fts_ids(q, limit)
+            if fuzzy_ids:
+                found = {member.id: member for member in query.filter(Member.id.in_(fuzzy_ids))}
+                members = [found[member_id] for member_id in fuzzy_ids if member_id in found]
+        return members
+
+    return query.filter(or_(*_like_criteria(q, SEARCH_FIELDS))).order_by(
+        Member.full_name.ilike(f'{q}%').desc(), Member.full_name.asc()
+    ).limit(limit).all()
+
+
+def encode_cursor(score, row_id):
+    raw = json.dumps([score, row_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Returns:
+        tuple: (score, id) of the last result already shown
+
+    Raises:
+        ValueError: the cursor was not produced by encode_cursor
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        score, row_id = json.loads(raw)
+        return float(score), int(row_id)
+    except (binascii.Error, TypeError, ValueError) as e:
+        raise ValueError('Invalid search cursor') from e
+
+
+def _words(q):
+    return re.findall(r'\w+', (q or '').lower())
+
+
+def _fts5_query(words):
+    """All words, the last one as a prefix (search as you type)"""
+    return ' '.join(_phrase(word) for word in words[:-1]) + f' {_phrase(words[-1])}*'
+
+
+def _tsquery(words):
+    return ' & '.join(words[:-1] + [f'{words[-1]}:*'])
+
+
+def highlight(snippet):
+    """Escape a raw snippet (HTML stripped) and turn the match markers into <mark> tags"""
+    text_only = re.sub(r'<[^>]*>?', ' ', snippet or '')
+    text_only = ' '.join(text_only.split())
+    return Markup(str(escape(text_only)).replace(_MARK_START, '<mark>').replace(_MARK_END, '</mark>'))
+
+
+def _python_snippet(content, words, width=160):
+    """Snippet for the ILIKE fallback: text around the first matching word, marked"""
+    plain = ' '.join(re.sub(r'<[^>]*>', ' ', content or '').split())
+    lowered = plain.lower()
+    positions = [lowered.find(word) for word in words if word in lowered]
+    start = max(min(positions) - width // 3, 0) if positions else 0
+    fragment = plain[start:start + width]
+    for word in sorted(set(words), key=len, reverse=True):
+        fragment = re.sub(f'({re.escape(word)})', f'{_MARK_START}\\1{_MARK_END}', fragment, flags=re.IGNORECASE)
+    return ('…' if start else '') + fragment + ('…' if start + width < len(plain) else '')
+
+
+def _content_statement(source, words, backend):
+    """SELECT of matching published rows with ``score`` (higher is better) and a raw ``snippet``"""
+    model = source.model
+    columns = [model.id, model.title, model.category, model.published_date]
+    if model is Blog:
+        columns.append(model.slug)
+    published = [model.is_published == True] if model is Blog else []
+
+    if backend == 'fts5':
+        fts = table(source.fts, column('rowid'))
+        match = literal_column(source.fts)
+        score = -func.bm25(match, *(literal(weight) for _name, weight, _pg in source.columns))
+        snippet = func.snippet(match, -1, _MARK_START, _MARK_END, '…', 24)
+        return select(*columns, score.label('score'), snippet.label('snippet')).select_from(fts).join(
+            model, model.id == fts.c.rowid
+        ).where(match.op('MATCH')(_fts5_query(words)), *published), score
+
+    if backend == 'tsvector':
+        query = func.to_tsquery('english', _tsquery(words))
+        vector = literal_column(f'{source.table}.{SEARCH_VECTOR_COLUMN}')
+        score = func.ts_rank_cd(vector, query)
+        options = (f'StartSel={_MARK_START}, StopSel={_MARK_END}, MaxWords=30, MinWords=12, '
+                   'MaxFragments=2, FragmentDelimiter=" … "')
+        snippet = func.ts_headline('english', model.content, query, options)
+        return select(*columns, score.label('score'), snippet.label('snippet')).where(
+            vector.op('@@')(query), *published
+        ), score
+
+    # No index: every word must appear in the title or content
+    criteria = [or_(model.title.ilike(f'%{word}%'), model.content.ilike(f'%{word}%')) for word in words]
+    score = literal(0.0)
+    return select(*columns, score.label('score'), model.content.label('snippet')).where(
+        *criteria, *published
+    ), score
+
+
+def _run_content_search(kind, words, cursor, limit):
+    source = CONTENT_SOURCES[kind]
+    backend = content_backend(kind)
+    stmt, score = _content_statement(source, words, backend)
+    model = source.model
+    if cursor is not None:
+        last_score, last_id = cursor
+        stmt = stmt.where(or_(score < last_score, and_(score == last_score, model.id < last_id)))
+    rows = db.session.execute(stmt.order_by(score.desc(), model.id.desc()).limit(limit + 1)).all()
+
+    results = []
+    for row in rows[:limit]:
+        raw = row.snippet if backend else _python_snippet(row.snippet, words)
+        results.append({
+            'id': row.id,
+            'slug': getattr(row, 'slug', None),
+            'title': row.title,
+            'category': row.category,
+            'published_date': row.published_date.isoformat() if row.published_date else None,
+            'snippet': str(highlight(raw)),
+            'score': float(row.score),
+        })
+    next_cursor = encode_cursor(results[-1]['score'], results[-1]['id']) if len(rows) > limit else None
+    return results, next_cursor
+
+
+def search_content(kind, q, cursor=None, limit=10):
+    """
+    Full-text search over published blog posts or news (``kind`` is a CONTENT_SOURCES key)
+
+    Results are ranked (title matches first) and paginated with keyset cursors:
+    pass the returned ``next_cursor`` back to get the following page. Pages are
+    cached until the next commit touching that model, in any worker.
+
+    Returns:
+        tuple: (results, next_cursor); each result is a dict with id, slug (blogs), title,
+        category, published_date, score and an HTML ``snippet`` with matches in <mark>
+
+    Raises:
+        ValueError: unknown ``kind`` or malformed ``cursor``
+    """
+    if kind not in CONTENT_SOURCES:
+        raise ValueError(f'Unknown search type: {kind}')
+    position = decode_cursor(cursor) if cursor else None
+    words = _words(q)
+    if not words:
+        return [], None
+
+    key = (kind, ' '.join(words), cursor or '', limit, model_versions(CONTENT_SOURCES[kind].model))
+    return _results_cache.get_or_set(key, lambda: _run_content_search(kind, words, position, limit))
+
+
+track_versions(*(source.model for source in CONTENT_SOURCES.values()))
@@ -4,6 +4,7 @@ import base64
 import os
 import dotenv
 from flask import current_app
+from app import metrics
 
 dotenv.load_dotenv()
 
@@ -39,13 +40,14 @@ def send_sms(phone_number, message):
         "Authorization": f"Basic {auth_value}",
     }
     try:
-        response = requests.post(
-            url=URL,
-            data=json.dumps(payload),
-            headers=headers,
-            timeout=10  # Reasonable timeout to avoid hanging
-        )
-        response.raise_for_status()  # Will raise for 4xx/5xx responses
+        with metrics.track_outbound('beem'):
+            response = requests.post(
+                url=URL,
+                data=json.dumps(payload),
+                headers=headers,
+                timeout=10  # Reasonable timeout to avoid hanging
+            )
+            response.raise_for_status()  # Will raise for 4xx/5xx responses
         return response.status_code
     except requests.exceptions.SSLError as ssl_err:
         current_app.logger.error(f"SSL Error: {ssl_err}. Please ensure your system has up-to-date CA certificates.")
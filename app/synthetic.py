@@ -0,0 +1,403 @@
+"""
+Synthetic club data for load testing
+Generates a realistic club at a chosen scale with bulk INSERTs (SQLite or
+PostgreSQL): users and members, events and RSVPs, reward transactions,
+payments across financial periods, competitions with judges, criteria and
+scores, and session weeks. Every synthetic account shares one password and
+an email under the ``loadtest.invalid`` domain, so runs are easy to spot.
+"""
+
+import random
+import string
+import uuid
+from datetime import datetime, time, timedelta
+from sqlalchemy import insert, select
+from app import db
+from app.financial_rollup import rebuild_rollups
+from app.member_requirements import ALLOWED_COURSES, ALLOWED_YEARS
+from app.models import (
+    User, Member, Event, RSVP, RewardTransaction, Trophy, News, Blog,
+    FinancialPeriod, FinancialCategory, FinancialTransaction, MembershipPayment,
+    Competition, CompetitionJudge, CompetitionCriteria, CompetitionEnrollment,
+    CompetitionSubmission, CompetitionScore, SessionWeek, SessionSchedule,
+)
+
+SYNTHETIC_DOMAIN = 'loadtest.invalid'
+SYNTHETIC_PASSWORD = 'loadtest-password'
+
+SCALES = {
+    'small': {
+        'users': 500, 'admins': 3, 'events': 20, 'rsvps': 3000, 'rewards': 2500,
+        'periods': 4, 'competitions': 3, 'weeks': 8, 'posts': 20,
+    },
+    'medium': {
+        'users': 2500, 'admins': 5, 'events': 80, 'rsvps': 25000, 'rewards': 12000,
+        'periods': 6, 'competitions': 8, 'weeks': 26, 'posts': 60,
+    },
+    'large': {
+        'users': 10000, 'admins': 8, 'events': 200, 'rsvps': 100000, 'rewards': 50000,
+        'periods': 8, 'competitions': 20, 'weeks': 52, 'posts': 150,
+    },
+}
+
+FIRST_NAMES = ['Amani', 'Baraka', 'Neema', 'Juma', 'Rehema', 'Zawadi', 'Imani', 'Hassan',
+               'Faraja', 'Upendo', 'Daudi', 'Mwajuma', 'Tumaini', 'Salma', 'Elia', 'Grace']
+LAST_NAMES = ['Mushi', 'Mollel', 'Kimaro', 'Mwakyusa', 'Nyerere', 'Massawe', 'Lyimo',
+              'Shirima', 'Mrema', 'Temba', 'Swai', 'Urio', 'Minja', 'Kessy']
+EVENT_CATEGORIES = ['workshop', 'hackathon', 'tech_talk', 'social_event']
+REWARD_TYPES = ['event_checkin', 'manual', 'achievement', 'competition']
+PAYMENT_METHODS = ['cash', 'mobile_money', 'bank_transfer']
+
+BATCH_SIZE = 5000
+
+
+def _bulk_insert(model, rows, returning=False):
+    """Insert rows in batches; optionally return the new primary keys in row order"""
+    # Core inserts on the table: the ORM bulk path re-splices RETURNING rows per batch
+    table = model.__table__
+    ids = []
+    for start in range(0, len(rows), BATCH_SIZE):
+        batch = rows[start:start + BATCH_SIZE]
+        if returning:
+            stmt = insert(table).returning(table.c.id, sort_by_parameter_order=True)
+            ids.extend(db.session.execute(stmt, batch).scalars())
+        else:
+            db.session.execute(insert(table), batch)
+    return ids
+
+
+def _acceptance_codes(count, rng):
+    taken = set(db.session.execute(
+        select(RSVP.acceptance_code).where(RSVP.acceptance_code.isnot(None))
+    ).scalars())
+    alphabet = string.ascii_uppercase + string.digits
+    codes = []
+    while len(codes) < count:
+        code = ''.join(rng.choices(alphabet, k=6))
+        if code not in taken:
+            taken.add(code)
+            codes.append(code)
+    return codes
+
+
+def seed_club(scale='small', overrides=None, seed=None, progress=print):
+    """
+    Generate a synthetic club and commit it
+
+    Args:
+        scale: one of SCALES
+        overrides: dict of counts overriding the preset (users, events, rsvps, ...)
+        seed: random seed for reproducible data
+        progress: callable receiving one-line progress messages
+
+    Returns:
+        dict: manifest with the run tag, row counts and sample ids for the load harness
+    """
+    counts = dict(SCALES[scale])
+    counts.update({k: v for k, v in (overrides or {}).items() if v is not None})
+    rng = random.Random(seed)
+    run = uuid.uuid4().hex[:6] if seed is None else f'{seed:06x}'[-6:]
+    now = datetime.utcnow()
+    today = now.date()
+    manifest = {'run': run, 'password': SYNTHETIC_PASSWORD, 'counts': {}}
+
+    # One hash for every synthetic account; hashing 10k passwords would dominate the run
+    template = User(email='template')
+    template.set_password(SYNTHETIC_PASSWORD)
+    password_hash = template.password_hash
+
+    # Users: admins first, then members
+    user_rows = []
+    for i in range(counts['admins']):
+        user_rows.append({
+            'email': f'lt-{run}-admin{i}@{SYNTHETIC_DOMAIN}', 'password_hash': password_hash,
+            'role': 'admin', 'is_approved': True, 'is_active_account': True,
+            'created_at': now - timedelta(days=rng.randint(200, 900)),
+        })
+    for i in range(counts['users']):
+        user_rows.append({
+            'email': f'lt-{run}-{i}@{SYNTHETIC_DOMAIN}', 'password_hash': password_hash,
+            'role': 'student', 'is_approved': rng.random() < 0.95, 'is_active_account': rng.random() < 0.98,
+            'created_at': now - timedelta(days=rng.randint(0, 900)),
+        })
+    user_ids = _bulk_insert(User, user_rows, returning=True)
+    admin_ids = user_ids[:counts['admins']]
+    student_user_ids = user_ids[counts['admins']:]
+    progress(f'users: {len(user_ids)}')
+
+    member_rows = []
+    for i, user_id in enumerate(student_user_ids):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        created = user_rows[counts['admins'] + i]['created_at']
+        member_rows.append({
+            'user_id': user_id,
+            'full_name': f'{first} {last}',
+            'course': rng.choice(ALLOWED_COURSES),
+            'year': rng.choice(ALLOWED_YEARS[:4]),
+            'status': 'alumni' if rng.random() < 0.2 else 'student',
+            'phone': f'+2557{rng.randint(10000000, 99999999)}',
+            'areas_of_interest': ', '.join(rng.sample(['Web', 'AI', 'Mobile', 'Security', 'Cloud', 'IoT'], 2)),
+            'member_id_number': f'LT-{run}-{i:05d}',
+            'created_at': created,
+            'updated_at': created,
+        })
+    member_ids = _bulk_insert(Member, member_rows, returning=True)
+    progress(f'members: {len(member_ids)}')
+
+    # Events: two years back, three months ahead
+    event_rows = []
+    for i in range(counts['events']):
+        event_rows.append({
+            'title': f'{rng.choice(["Intro to", "Deep dive:", "Hands-on", "Build with"])} '
+                     f'{rng.choice(["Flask", "React", "PyTorch", "Kotlin", "Docker", "Postgres"])} #{i}',
+            'description': 'Synthetic event generated for load testing.',
+            'event_date': now + timedelta(days=rng.randint(-730, 90), hours=rng.randint(8, 18)),
+            'location': rng.choice(['Computer Lab 1', 'Main Auditorium', 'Innovation Hub', 'Online']),
+            'category': rng.choice(EVENT_CATEGORIES),
+            'target_audience': rng.choices(['everyone', 'members', 'paid_members'], [6, 3, 1])[0],
+            'allows_check_in': True,
+            'check_in_points': rng.choice([0, 5, 10, 20]),
+            'created_at': now - timedelta(days=rng.randint(0, 800)),
+        })
+    event_ids = _bulk_insert(Event, event_rows, returning=True)
+    progress(f'events: {len(event_ids)}')
+
+    # RSVPs: unique (event, member) pairs, mostly from members
+    rsvp_rows = []
+    seen = set()
+    approved_total = 0
+    while len(rsvp_rows) < counts['rsvps'] and len(seen) < len(event_ids) * len(member_ids):
+        event_index = rng.randrange(len(event_ids))
+        member_index = rng.randrange(len(member_ids))
+        if (event_index, member_index) in seen:
+            continue
+        seen.add((event_index, member_index))
+        member = member_rows[member_index]
+        event_date = event_rows[event_index]['event_date']
+        status = rng.choices(['approved', 'pending', 'rejected'], [6, 3, 1])[0]
+        is_member = rng.random() < 0.8
+        checked_in = status == 'approved' and event_date < now and rng.random() < 0.7
+        approved_total += status == 'approved'
+        rsvp_rows.append({
+            'event_id': event_ids[event_index],
+            'member_id': member_ids[member_index] if is_member else None,
+            'status': status,
+            'full_name': member['full_name'],
+            'email': user_rows[counts['admins'] + member_index]['email'],
+            'phone': member['phone'],
+            'course': member['course'],
+            'year': member['year'],
+            'attendee_type': 'student',
+            'study_field': member['course'],
+            'study_year': member['year'],
+            'submitted_at': event_date - timedelta(days=rng.randint(1, 20)),
+            'approved_at': event_date - timedelta(days=1) if status == 'approved' else None,
+            'approved_by': rng.choice(admin_ids) if status == 'approved' else None,
+            'checked_in': checked_in,
+            'checked_in_at': event_date + timedelta(minutes=rng.randint(0, 90)) if checked_in else None,
+            'checked_in_by': rng.choice(admin_ids) if checked_in else None,
+        })
+    codes = iter(_acceptance_codes(approved_total, rng))
+    for row in rsvp_rows:
+        row['acceptance_code'] = next(codes) if row['status'] == 'approved' else None
+        # Rewards are seeded below; the check-in reward batch must not award them again
+        row['points_processed_at'] = row['checked_in_at']
+    rsvp_ids = _bulk_insert(RSVP, rsvp_rows, returning=True)
+    progress(f'rsvps: {len(rsvp_ids)}')
+
+    # Reward transactions and a trophy ladder if none exists
+    reward_rows = [{
+        'member_id': rng.choice(member_ids),
+        'points': rng.choice([5, 10, 10, 20, 50, -5]),
+        'transaction_type': rng.choice(REWARD_TYPES),
+        'reason': 'Synthetic reward',
+        'event_id': rng.choice(event_ids) if rng.random() < 0.5 else None,
+        'admin_id': rng.choice(admin_ids),
+        'created_at': now - timedelta(days=rng.randint(0, 720), minutes=rng.randint(0, 1440)),
+    } for _ in range(counts['rewards'])]
+    _bulk_insert(RewardTransaction, reward_rows)
+    if not db.session.execute(select(Trophy.id).limit(1)).first():
+        _bulk_insert(Trophy, [
+            {'name': name, 'points_required': points, 'icon': icon, 'display_order': order}
+            for order, (name, points, icon) in enumerate([
+                ('Bronze', 50, '🥉'), ('Silver', 150, '🥈'), ('Gold', 300, '🥇'),
+                ('Platinum', 600, '💎'), ('Legend', 1000, '🏆'),
+            ])
+        ])
+    progress(f'reward transactions: {len(reward_rows)}')
+
+    # Financial periods (semesters, all but the latest closed) with payments
+    membership_category = db.session.execute(
+        select(FinancialCategory).where(FinancialCategory.name == 'Membership Fees',
+                                        FinancialCategory.type == 'revenue')
+    ).scalar()
+    if membership_category is None:
+        membership_category = FinancialCategory(name='Membership Fees', type='revenue',
+                                                description='Membership fee payments from members',
+                                                is_builtin=True)
+        db.session.add(membership_category)
+        db.session.flush()
+    expense_category = db.session.execute(
+        select(FinancialCategory).where(FinancialCategory.type == 'expense')
+    ).scalars().first()
+    if expense_category is None:
+        expense_category = FinancialCategory(name='Event Costs', type='expense',
+                                             description='Costs for organizing events and workshops',
+                                             is_builtin=True)
+        db.session.add(expense_category)
+        db.session.flush()
+
+    period_rows = []
+    period_length = 182
+    first_start = today - timedelta(days=period_length * (counts['periods'] - 1) + 90)
+    for i in range(counts['periods']):
+        start = first_start + timedelta(days=i * period_length)
+        end = start + timedelta(days=period_length - 1)
+        closed = i < counts['periods'] - 1
+        period_rows.append({
+            'name': f'LT {run} term {i + 1}', 'start_date': start, 'end_date': end,
+            'status': 'closed' if closed else 'open', 'opened_by': admin_ids[0],
+            'opened_at': datetime.combine(start, time(9)),
+            'closed_by': admin_ids[0] if closed else None,
+            'closed_at': datetime.combine(end, time(17)) if closed else None,
+        })
+    period_ids = _bulk_insert(FinancialPeriod, period_rows, returning=True)
+
+    payment_rows = []
+    for member_id in member_ids:
+        if rng.random() > 0.6:
+            continue
+        for index in sorted(rng.sample(range(len(period_ids)), k=rng.randint(1, min(3, len(period_ids))))):
+            period = period_rows[index]
+            paid = period['start_date'] + timedelta(days=rng.randint(0, 60))
+            payment_rows.append({
+                'member_id': member_id, 'amount': float(rng.choice([10000, 15000, 20000])),
+                'payment_date': paid, 'start_date': paid, 'end_date': paid + timedelta(days=365),
+                'payment_method': rng.choice(PAYMENT_METHODS), 'recorded_by': rng.choice(admin_ids),
+                'financial_period_id': period_ids[index],
+                'created_at': datetime.combine(paid, time(12)), 'updated_at': datetime.combine(paid, time(12)),
+            })
+    payment_ids = _bulk_insert(MembershipPayment, payment_rows, returning=True)
+
+    transaction_rows = [{
+        'financial_period_id': payment['financial_period_id'], 'category_id': membership_category.id,
+        'transaction_type': 'revenue', 'amount': payment['amount'], 'transaction_date': payment['payment_date'],
+        'description': 'Membership fee payment', 'reference_type': 'payment', 'reference_id': payment_id,
+        'recorded_by': payment['recorded_by'],
+    } for payment, payment_id in zip(payment_rows, payment_ids)]
+    for period_id, period in zip(period_ids, period_rows):
+        for _ in range(rng.randint(10, 30)):
+            transaction_rows.append({
+                'financial_period_id': period_id, 'category_id': expense_category.id,
+                'transaction_type': 'expense', 'amount': float(rng.randint(5, 200) * 1000),
+                'transaction_date': period['start_date'] + timedelta(days=rng.randint(0, period_length - 1)),
+                'description': 'Synthetic expense', 'reference_type': 'manual', 'reference_id': None,
+                'recorded_by': admin_ids[0],
+            })
+    _bulk_insert(FinancialTransaction, transaction_rows)
+    # Core inserts skip the ORM rollup hook; snapshot these periods directly
+    rebuild_rollups(period_ids, include_closed=True)
+    progress(f'payments: {len(payment_rows)}, financial transactions: {len(transaction_rows)}')
+
+    # Competitions: judges, four weighted criteria, enrollments, submissions and scores
+    score_total = 0
+    for c in range(counts['competitions']):
+        # The first one is always finalized so there is a leaderboard to load
+        status = 'finalized' if c == 0 else rng.choice(['published', 'judging', 'finalized'])
+        starts = now - timedelta(days=rng.randint(7, 400))
+        competition = Competition(
+            title=f'LT {run} challenge {c + 1}', description='Synthetic competition',
+            category=rng.choice(['Web', 'AI', 'Mobile', 'Design']),
+            frequency=rng.choice(['weekly', 'monthly']), level=rng.randint(1, 3),
+            status=status, submission_type='github',
+            starts_at=starts, ends_at=starts + timedelta(days=7), created_by=admin_ids[0],
+        )
+        db.session.add(competition)
+        db.session.flush()
+        judges = rng.sample(admin_ids, k=min(3, len(admin_ids)))
+        _bulk_insert(CompetitionJudge, [
+            {'competition_id': competition.id, 'user_id': judge, 'is_chair': i == 0}
+            for i, judge in enumerate(judges)
+        ])
+        criteria_ids = _bulk_insert(CompetitionCriteria, [
+            {'competition_id': competition.id, 'name': name, 'max_points': 10, 'weight_percent': 25}
+            for name in ('Functionality', 'Code quality', 'Design', 'Presentation')
+        ], returning=True)
+        entrants = rng.sample(member_ids, k=min(len(member_ids), rng.randint(20, 80)))
+        _bulk_insert(CompetitionEnrollment, [
+            {'competition_id': competition.id, 'member_id': member_id, 'enrolled_at': starts}
+            for member_id in entrants
+        ])
+        submitters = entrants[:int(len(entrants) * 0.7)]
+        submission_ids = _bulk_insert(CompetitionSubmission, [
+            {'competition_id': competition.id, 'member_id': member_id, 'submission_type': 'github',
+             'submission_value': f'https://github.com/example/lt-{run}-{member_id}',
+             'submitted_at': starts + timedelta(days=rng.randint(0, 6)), 'status': 'submitted'}
+            for member_id in submitters
+        ], returning=True)
+        score_rows = [
+            {'submission_id': submission_id, 'judge_id': judge, 'criteria_id': criteria_id,
+             'score': float(rng.randint(3, 10))}
+            for submission_id in submission_ids for judge in judges for criteria_id in criteria_ids
+        ]
+        _bulk_insert(CompetitionScore, score_rows)
+        score_total += len(score_rows)
+    progress(f'competitions: {counts["competitions"]}, scores: {score_total}')
+
+    # Session weeks with three sessions each
+    monday = today - timedelta(days=today.weekday())
+    week_ids = _bulk_insert(SessionWeek, [
+        {'title': f'LT {run} week {w + 1}', 'week_start': monday - timedelta(weeks=w),
+         'week_end': monday - timedelta(weeks=w) + timedelta(days=6),
+         'status': 'published', 'published_by': admin_ids[0]}
+        for w in range(counts['weeks'])
+    ], returning=True)
+    session_rows = []
+    for w, week_id in enumerate(week_ids):
+        week_start = monday - timedelta(weeks=w)
+        for day in rng.sample(range(5), 3):
+            session_rows.append({
+                'week_id': week_id, 'session_date': week_start + timedelta(days=day), 'day_of_week': day,
+                'start_time': time(rng.choice([16, 17, 18])), 'topic': rng.choice(['Git basics', 'REST APIs', 'SQL joins', 'Testing']),
+                'category': rng.choice(['Web', 'Data', 'Tools']), 'mode': rng.choice(['online', 'physical']),
+                'instructor_user_id': rng.choice(student_user_ids), 'created_by': admin_ids[0],
+                'status': 'completed' if w else 'scheduled',
+            })
+    _bulk_insert(SessionSchedule, session_rows)
+    progress(f'session weeks: {len(week_ids)}, sessions: {len(session_rows)}')
+
+    # Public content
+    _bulk_insert(News, [
+        {'title': f'LT {run} news {i}', 'content': 'Synthetic news body. ' * 20,
+         'category': rng.choice(['general', 'hackathon', 'achievement']), 'author_id': admin_ids[0],
+         'published_date': now - timedelta(days=rng.randint(0, 700))}
+        for i in range(counts['posts'])
+    ])
+    _bulk_insert(Blog, [
+        {'title': f'LT {run} post {i}', 'slug': f'lt-{run}-post-{i}', 'content': 'Synthetic blog body. ' * 50,
+         'excerpt': 'Synthetic excerpt', 'author_id': rng.choice(student_user_ids),
+         'category': rng.choice(['tutorial', 'general', 'career']), 'is_published': True,
+         'published_date': now - timedelta(days=rng.randint(0, 700)), 'views': rng.randint(0, 5000)}
+        for i in range(counts['posts'])
+    ])
+
+    db.session.commit()
+
+    # Sample ids the load harness replays against
+    approved_unchecked = [rid for rid, row in zip(rsvp_ids, rsvp_rows) if row['status'] == 'approved' and not row['checked_in']]
+    pending = [rid for rid, row in zip(rsvp_ids, rsvp_rows) if row['status'] == 'pending']
+    manifest['counts'] = {
+        'users': len(user_ids), 'members': len(member_ids), 'events': len(event_ids), 'rsvps': len(rsvp_ids),
+        'reward_transactions': len(reward_rows), 'payments': len(payment_rows),
+        'financial_transactions': len(transaction_rows), 'competition_scores': score_total,
+        'session_weeks': len(week_ids),
+    }
+    manifest.update({
+        'admin_user_ids': admin_ids,
+        'member_user_ids': rng.sample(student_user_ids, k=min(200, len(student_user_ids))),
+        'member_id_numbers': [row['member_id_number'] for row in rng.sample(member_rows, k=min(500, len(member_rows)))],
+        'event_ids': event_ids,
+        'checkin_rsvp_ids': rng.sample(approved_unchecked, k=min(5000, len(approved_unchecked))),
+        'pending_rsvp_ids': rng.sample(pending, k=min(5000, len(pending))),
+    })
+    return manifest
@@ -9,6 +9,7 @@ from email.message import EmailMessage
 from flask import current_app
 import logging
 from app.sms import send_sms
+from app import metrics
 
 class NotificationService:
     """Service for sending email and SMS notifications"""
@@ -75,7 +76,12 @@ class NotificationService:
                 args=(to_email, subject, message, is_html, app),
                 daemon=True  # Daemon thread will not prevent app shutdown
             )
-            thread.start()
+            metrics.NOTIFICATIONS_IN_FLIGHT.inc()
+            try:
+                thread.start()
+            except Exception:
+                metrics.NOTIFICATIONS_IN_FLIGHT.dec()
+                raise
             return True  # Return immediately, email is being sent in background
         
         # Send email synchronously (original behavior)
@@ -83,6 +89,12 @@ class NotificationService:
     
     def _send_email_background(self, to_email, subject, message, is_html, app=None):
         """Send email in background thread with app context"""
+        try:
+            return self._send_email_in_app(to_email, subject, message, is_html, app)
+        finally:
+            metrics.NOTIFICATIONS_IN_FLIGHT.dec()
+    
+    def _send_email_in_app(self, to_email, subject, message, is_html, app=None):
         # Get the Flask app instance for background thread
         if app is None:
             # If no app instance provided, create a new one
@@ -188,40 +200,41 @@ class NotificationService:
                     old_timeout = socket_module.getdefaulttimeout()
                     socket_module.setdefaulttimeout(connection_timeout)
                     
-                    try:
-                        # Use a timeout so Docker/network issues don't hang forever
-                        server = smtplib.SMTP(smtp_host, self.smtp_port, timeout=connection_timeout)
-                        server.set_debuglevel(0)  # Disable debug output
+                    with metrics.track_outbound('smtp'):
+                        try:
+                            # Use a timeout so Docker/network issues don't hang forever
+                            server = smtplib.SMTP(smtp_host, self.smtp_port, timeout=connection_timeout)
+                            server.set_debuglevel(0)  # Disable debug output
                         
-                        # Set timeout for all operations
-                        server.timeout = operation_timeout
+                            # Set timeout for all operations
+                            server.timeout = operation_timeout
                         
-                        server.ehlo()
-                        server.starttls()
-                        server.ehlo()
-                        server.login(self.smtp_username, self.smtp_password)
+                            server.ehlo()
+                            server.starttls()
+                            server.ehlo()
+                            server.login(self.smtp_username, self.smtp_password)
                         
-                        server.sendmail(
-                            self.from_email,
-                            [to_email],
-                            msg.as_string()
-                        )
+                            server.sendmail(
+                                self.from_email,
+                                [to_email],
+                                msg.as_string()
+                            )
 
                                                 
-                        # Success - break out of retry loop
-                        break
-                    finally:
-                        # Restore original socket timeout
-                        socket_module.setdefaulttimeout(old_timeout)
-                        # Close connection properly
-                        if server:
-                            try:
-                                server.quit()
-                            except:
+                            # Success - break out of retry loop
+                            break
+                        finally:
+                            # Restore original socket timeout
+                            socket_module.setdefaulttimeout(old_timeout)
+                            # Close connection properly
+                            if server:
                                 try:
-                                    server.close()
+                                    server.quit()
                                 except:
-                                    pass
+                                    try:
+                                        server.close()
+                                    except:
+                                        pass
                     
                 except socket.gaierror as e:
                     # DNS resolution error during connection
@@ -0,0 +1,46 @@
+"""
+Process warm-up
+Builds read-only assets up front. Under gunicorn preload mode this runs once in
+the master, and the forked workers share the result copy-on-write.
+"""
+
+import time
+
+
+def compile_templates(app):
+    """Compile every Jinja template into the environment cache"""
+    env = app.jinja_env
+    names = env.list_templates(filter_func=lambda name: name.endswith('.html'))
+    # Make sure the cache can hold all of them
+    if env.cache is not None and getattr(env.cache, 'capacity', 0) < len(names):
+        env.cache.capacity = len(names) + 50
+    compiled = 0
+    for name in names:
+        try:
+            env.get_template(name)
+            compiled += 1
+        except Exception as e:
+            print(f"[boot] Template {name} failed to compile: {e}")
+    return compiled
+
+
+def warm_caches(app):
+    """Compile templates, load fonts/logo rasters and the member index; returns elapsed milliseconds"""
+    from app.id_generator import warm_assets
+    from app.member_index import member_index
+
+    started = time.perf_counter()
+    compiled = compile_templates(app)
+    try:
+        warm_assets(app)
+    except Exception as e:
+        print(f"[boot] ID card assets could not be preloaded: {e}")
+    try:
+        with app.app_context():
+            members = member_index.build()
+        print(f"[boot] Member index loaded with {members} members")
+    except Exception as e:
+        print(f"[boot] Member index could not be preloaded: {e}")
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    print(f"[boot] Warmed {compiled} templates and ID card assets in {elapsed_ms:.1f} ms")
+    return elapsed_ms
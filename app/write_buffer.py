@@ -0,0 +1,119 @@
+"""
+Write-coalescing buffers
+Hot-path writes are merged in memory per worker and flushed in batches by a
+background thread, every few seconds or as soon as enough entries pile up.
+"""
+
+import abc
+import atexit
+import logging
+import os
+import threading
+
+_buffers = []
+
+
+class CoalescingBuffer(abc.ABC):
+    """Per-worker buffer that merges writes by key and flushes them in batches"""
+
+    def __init__(self, name, flush_interval=5.0, max_entries=200):
+        self.name = name
+        self.flush_interval = flush_interval
+        self.max_entries = max_entries
+        self.app = None
+        self.flushed_entries = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._pid = None
+        _buffers.append(self)
+
+    def init_app(self, app):
+        """Bind the buffer to the app whose engine receives the flushed writes"""
+        if self.app is None:
+            self.app = app
+
+    def merge(self, current, value):
+        """Combine a buffered value with a new one for the same key (override)"""
+        return value
+
+    @abc.abstractmethod
+    def write(self, connection, entries):
+        """Persist ``entries`` (a dict of key -> value) on ``connection``"""
+
+    def add(self, key, value):
+        """Buffer a write; it reaches the database on the next flush"""
+        self._ensure_thread()
+        with self._lock:
+            if key in self._entries:
+                value = self.merge(self._entries[key], value)
+            self._entries[key] = value
+            full = len(self._entries) >= self.max_entries
+        if full:
+            self._wake.set()
+
+    def pending(self):
+        return len(self._entries)
+
+    def flush(self):
+        """Write every buffered entry in one transaction; entries are kept if the write fails"""
+        if self.app is None:
+            return 0
+        with self._flush_lock:
+            with self._lock:
+                entries, self._entries = self._entries, {}
+            if not entries:
+                return 0
+            try:
+                with self.app.app_context():
+                    from app import db
+                    from app.database import retry_on_lock
+
+                    def write_batch():
+                        with db.engine.begin() as connection:
+                            self.write(connection, entries)
+
+                    retry_on_lock(write_batch, rollback=False)
+            except Exception:
+                logging.getLogger(__name__).exception('Failed to flush %s buffer', self.name)
+                # Put the entries back so the next flush retries them
+                with self._lock:
+                    for key, value in entries.items():
+                        if key in self._entries:
+                            value = self.merge(value, self._entries[key])
+                        self._entries[key] = value
+                return 0
+            self.flushed_entries += len(entries)
+            return len(entries)
+
+    def _ensure_thread(self):
+        # Threads do not survive fork, so each gunicorn worker starts its own flusher
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            self._pid = pid
+            self._entries = {}
+            self._wake = threading.Event()
+            self._thread = threading.Thread(target=self._run, name=f'{self.name}-flusher', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+
+def flush_all_buffers():
+    """Drain every buffer in this process (called on worker shutdown)"""
+    for buffer in _buffers:
+        if buffer._pid == os.getpid():
+            buffer.flush()
+
+
+atexit.register(flush_all_buffers)
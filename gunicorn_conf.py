@@ -1,6 +1,8 @@
 #Note: Do not touch if you don't understand anything
 import multiprocessing
 import os
+import random
+import time
 
 
 def env_int(name: str, default: int) -> int:
@@ -18,6 +20,13 @@ def env_str(name: str, default: str) -> str:
     return value if value is not None and value.strip() != "" else default
 
 
+def env_bool(name: str, default: bool) -> bool:
+    value = os.environ.get(name)
+    if value is None or value.strip() == "":
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
 bind = f"0.0.0.0:{env_int('PORT', 5051)}"
 
 # Calculate workers: 2-4 x CPU cores is common. We'll use 2 * cores + 1
@@ -34,6 +43,15 @@ keepalive = env_int("GUNICORN_KEEPALIVE", 5)
 timeout = env_int("GUNICORN_TIMEOUT", 60)
 graceful_timeout = env_int("GUNICORN_GRACEFUL_TIMEOUT", 30)
 
+# Prometheus multiprocess mode: every worker writes metric samples here and /metrics merges them.
+# Must be set before prometheus_client is imported anywhere.
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", env_str("PROMETHEUS_MULTIPROC_DIR", "/tmp/digital-club-metrics"))
+
+# Preload mode: import the app, run boot reconciliation and warm templates/fonts once in the
+# master; workers are forked from it and share that memory copy-on-write.
+# Note: code changes then need a full restart (HUP reload re-forks from the old master image).
+preload_app = env_bool("GUNICORN_PRELOAD", False)
+
 # Log to stdout/stderr for container visibility
 accesslog = "-"
 errorlog = "-"
@@ -45,3 +63,73 @@ limit_request_fields = 100
 limit_request_field_size = 8190
 
 
+
+
+def worker_exit(server, worker):
+    # Drain buffered writes (e.g. daily active users) before the worker goes away
+    try:
+        from app.write_buffer import flush_all_buffers
+        flush_all_buffers()
+    except Exception:
+        server.log.exception("Failed to flush write buffers on worker exit")
+
+
+def on_starting(server):
+    # Samples from a previous run would otherwise be merged into the new one
+    metrics_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    os.makedirs(metrics_dir, exist_ok=True)
+    for name in os.listdir(metrics_dir):
+        if name.endswith(".db"):
+            os.remove(os.path.join(metrics_dir, name))
+
+    # Pages rendered by the previous release may use old templates
+    page_cache_dir = os.environ.get("PAGE_CACHE_DIR") or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "instance", "page_cache"
+    )
+    if os.path.isdir(page_cache_dir):
+        for name in os.listdir(page_cache_dir):
+            if name.endswith(".page"):
+                os.remove(os.path.join(page_cache_dir, name))
+
+
+def child_exit(server, worker):
+    try:
+        from app.metrics import mark_process_dead
+        mark_process_dead(worker.pid)
+    except Exception:
+        server.log.exception("Failed to mark worker metrics as dead")
+
+
+def when_ready(server):
+    if not preload_app:
+        return
+    # Runs in the master after the app is loaded and before any worker is forked
+    try:
+        from main import app
+        from app.warmup import warm_caches
+        warm_caches(app)
+    except Exception:
+        server.log.exception("Failed to warm caches in the master")
+
+
+def post_fork(server, worker):
+    worker.boot_started = time.perf_counter()
+    # Fresh RNG state per worker (acceptance codes, tokens, sampling)
+    random.seed()
+    if not preload_app:
+        return
+    # Connections opened by the master must not be shared across processes
+    try:
+        from main import app
+        from app import db
+        with app.app_context():
+            db.engine.dispose(close=False)
+    except Exception:
+        server.log.exception("Failed to reset the database pool after fork")
+
+
+def post_worker_init(worker):
+    elapsed_ms = (time.perf_counter() - getattr(worker, "boot_started", time.perf_counter())) * 1000
+    worker.log.info(
+        "Worker %s ready in %.1f ms (preload=%s)", worker.pid, elapsed_ms, preload_app
+    )
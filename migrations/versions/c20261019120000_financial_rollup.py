@@ -0,0 +1,54 @@
+"""add financial rollup table
+
+Revision ID: c20261019120000
+Revises: c20260212173000
+Create Date: 2026-10-19 12:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'c20261019120000'
+down_revision = 'c20260212173000'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    tables = set(inspector.get_table_names())
+    if 'financial_rollup' in tables:
+        return
+
+    op.create_table(
+        'financial_rollup',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('financial_period_id', sa.Integer(), sa.ForeignKey('financial_period.id'), nullable=False),
+        sa.Column('category_id', sa.Integer(), sa.ForeignKey('financial_category.id'), nullable=False),
+        sa.Column('transaction_type', sa.String(length=20), nullable=False),
+        sa.Column('total_amount', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('transaction_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.UniqueConstraint('financial_period_id', 'category_id', 'transaction_type', name='uq_financial_rollup')
+    )
+
+    # Backfill from existing transactions (closed periods become their frozen snapshot)
+    if 'financial_transaction' in tables:
+        op.execute(
+            "INSERT INTO financial_rollup "
+            "(financial_period_id, category_id, transaction_type, total_amount, transaction_count, updated_at) "
+            "SELECT financial_period_id, category_id, transaction_type, SUM(amount), COUNT(id), CURRENT_TIMESTAMP "
+            "FROM financial_transaction "
+            "GROUP BY financial_period_id, category_id, transaction_type"
+        )
+
+
+def downgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    tables = set(inspector.get_table_names())
+    if 'financial_rollup' not in tables:
+        return
+    op.drop_table('financial_rollup')
@@ -0,0 +1,35 @@
+"""index event dates
+
+Revision ID: c20261019130000
+Revises: c20261019120000
+Create Date: 2026-10-19 13:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'c20261019130000'
+down_revision = 'c20261019120000'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if 'event' not in set(inspector.get_table_names()):
+        return
+    indexes = {index['name'] for index in inspector.get_indexes('event')}
+    if 'ix_event_event_date' not in indexes:
+        op.create_index('ix_event_event_date', 'event', ['event_date'])
+
+
+def downgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if 'event' not in set(inspector.get_table_names()):
+        return
+    indexes = {index['name'] for index in inspector.get_indexes('event')}
+    if 'ix_event_event_date' in indexes:
+        op.drop_index('ix_event_event_date', table_name='event')
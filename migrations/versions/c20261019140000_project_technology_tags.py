@@ -0,0 +1,63 @@
+"""normalize project technology tags
+
+Revision ID: c20261019140000
+Revises: c20261019130000
+Create Date: 2026-10-19 14:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'c20261019140000'
+down_revision = 'c20261019130000'
+branch_labels = None
+depends_on = None
+
+
+def _normalize(name):
+    return ' '.join((name or '').lower().split())
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    tables = set(inspector.get_table_names())
+    if 'project_technology' in tables or 'project' not in tables or 'technology' not in tables:
+        return
+
+    op.create_table(
+        'project_technology',
+        sa.Column('project_id', sa.Integer(), sa.ForeignKey('project.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('technology_id', sa.Integer(), sa.ForeignKey('technology.id', ondelete='CASCADE'),
+                  primary_key=True),
+    )
+    op.create_index('ix_project_technology_technology_id', 'project_technology', ['technology_id'])
+    if 'ix_technology_category' not in {index['name'] for index in inspector.get_indexes('technology')}:
+        op.create_index('ix_technology_category', 'technology', ['category'])
+
+    technology = sa.table('technology', sa.column('id', sa.Integer), sa.column('name', sa.String))
+
+    # Link existing projects from their comma-separated technologies
+    technology_ids = {
+        _normalize(name): technology_id
+        for technology_id, name in bind.execute(sa.select(technology.c.id, technology.c.name))
+    }
+    links = []
+    for project_id, technologies in bind.execute(sa.text('SELECT id, technologies FROM project')):
+        names = {_normalize(name) for name in (technologies or '').split(',')}
+        links.extend(
+            {'project_id': project_id, 'technology_id': technology_ids[name]}
+            for name in names if name in technology_ids
+        )
+    if links:
+        op.bulk_insert(sa.table('project_technology', sa.column('project_id'), sa.column('technology_id')), links)
+
+
+def downgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if 'project_technology' in set(inspector.get_table_names()):
+        op.drop_table('project_technology')
+    if 'ix_technology_category' in {index['name'] for index in inspector.get_indexes('technology')}:
+        op.drop_index('ix_technology_category', table_name='technology')
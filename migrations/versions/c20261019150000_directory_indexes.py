@@ -0,0 +1,40 @@
+"""index member directory and reward lookups
+
+Revision ID: c20261019150000
+Revises: c20261019140000
+Create Date: 2026-10-19 15:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'c20261019150000'
+down_revision = 'c20261019140000'
+branch_labels = None
+depends_on = None
+
+INDEXES = (
+    ('member', 'ix_member_status_full_name', ['status', 'full_name']),
+    ('reward_transaction', 'ix_reward_transaction_member_id', ['member_id']),
+)
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    tables = set(inspector.get_table_names())
+    for table, name, columns in INDEXES:
+        if table not in tables:
+            continue
+        if name not in {index['name'] for index in inspector.get_indexes(table)}:
+            op.create_index(name, table, columns)
+
+
+def downgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    tables = set(inspector.get_table_names())
+    for table, name, _columns in INDEXES:
+        if table in tables and name in {index['name'] for index in inspector.get_indexes(table)}:
+            op.drop_index(name, table_name=table)
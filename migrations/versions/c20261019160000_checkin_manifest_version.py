@@ -0,0 +1,41 @@
+"""add check-in manifest versions
+
+Revision ID: c20261019160000
+Revises: c20261019150000
+Create Date: 2026-10-19 16:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'c20261019160000'
+down_revision = 'c20261019150000'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    tables = set(inspector.get_table_names())
+    if 'event' in tables and 'manifest_version' not in {c['name'] for c in inspector.get_columns('event')}:
+        op.add_column('event', sa.Column('manifest_version', sa.Integer(), nullable=False, server_default='0'))
+    if 'rsvp' in tables:
+        if 'manifest_version' not in {c['name'] for c in inspector.get_columns('rsvp')}:
+            op.add_column('rsvp', sa.Column('manifest_version', sa.Integer(), nullable=False, server_default='0'))
+        if 'ix_rsvp_event_manifest_version' not in {index['name'] for index in inspector.get_indexes('rsvp')}:
+            op.create_index('ix_rsvp_event_manifest_version', 'rsvp', ['event_id', 'manifest_version'])
+
+
+def downgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    tables = set(inspector.get_table_names())
+    if 'rsvp' in tables:
+        if 'ix_rsvp_event_manifest_version' in {index['name'] for index in inspector.get_indexes('rsvp')}:
+            op.drop_index('ix_rsvp_event_manifest_version', table_name='rsvp')
+        if 'manifest_version' in {c['name'] for c in inspector.get_columns('rsvp')}:
+            op.drop_column('rsvp', 'manifest_version')
+    if 'event' in tables and 'manifest_version' in {c['name'] for c in inspector.get_columns('event')}:
+        op.drop_column('event', 'manifest_version')
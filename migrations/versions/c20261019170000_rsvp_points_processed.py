@@ -0,0 +1,41 @@
+"""track deferred check-in rewards
+
+Revision ID: c20261019170000
+Revises: c20261019160000
+Create Date: 2026-10-19 17:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'c20261019170000'
+down_revision = 'c20261019160000'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if 'rsvp' not in set(inspector.get_table_names()):
+        return
+    if 'points_processed_at' not in {c['name'] for c in inspector.get_columns('rsvp')}:
+        op.add_column('rsvp', sa.Column('points_processed_at', sa.DateTime(), nullable=True))
+        # Check-ins made before rewards were deferred were rewarded on the spot
+        op.execute(sa.text(
+            "UPDATE rsvp SET points_processed_at = COALESCE(checked_in_at, CURRENT_TIMESTAMP) WHERE checked_in = :yes"
+        ).bindparams(yes=True))
+    if 'ix_rsvp_points_processed_at' not in {index['name'] for index in inspector.get_indexes('rsvp')}:
+        op.create_index('ix_rsvp_points_processed_at', 'rsvp', ['points_processed_at'])
+
+
+def downgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if 'rsvp' not in set(inspector.get_table_names()):
+        return
+    if 'ix_rsvp_points_processed_at' in {index['name'] for index in inspector.get_indexes('rsvp')}:
+        op.drop_index('ix_rsvp_points_processed_at', table_name='rsvp')
+    if 'points_processed_at' in {c['name'] for c in inspector.get_columns('rsvp')}:
+        op.drop_column('rsvp', 'points_processed_at')
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+SQLite write-contention benchmark
+Runs 2*cores+1 worker processes (the gunicorn default) against one SQLite file,
+each doing a mix of RSVP inserts, blog view increments and DAU upserts, and
+compares the stock configuration with the tuned one (WAL + busy_timeout + retry).
+
+Usage:
+    python scripts/benchmarks/sqlite_contention.py [--seconds 10] [--workers N]
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+MODES = {
+    # Before: default rollback journal, no busy_timeout, no retry
+    'baseline': {'SQLITE_TUNING': '0', 'DB_LOCK_RETRIES': '1'},
+    'tuned': {'SQLITE_TUNING': '1'},
+}
+
+
+def _seed(database_url):
+    os.environ['DATABASE_URL'] = database_url
+    from app import create_app, db
+    from app.models import User, Event, Blog
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        user = User(email='bench@example.com', role='admin', is_approved=True)
+        user.set_password('bench')
+        db.session.add(user)
+        db.session.flush()
+        db.session.add(Event(title='Bench event', event_date=datetime.utcnow() + timedelta(days=7)))
+        db.session.add(Blog(title='Bench', slug='bench', content='x', author_id=user.id, is_published=True))
+        db.session.commit()
+        return user.id
+
+
+def _worker(worker_index, database_url, user_id, seconds, results):
+    os.environ['DATABASE_URL'] = database_url
+    from sqlalchemy.exc import OperationalError
+    from app import create_app, db
+    from app.activity import DailyActivityBuffer
+    from app.database import retry_on_lock
+    from app.models import Blog, Event, RSVP
+
+    app = create_app()
+    dau = DailyActivityBuffer('bench-dau')
+    ops = errors = 0
+    with app.app_context():
+        event_id = Event.query.first().id
+        blog_id = Blog.query.first().id
+
+        def insert_rsvp():
+            db.session.add(RSVP(event_id=event_id, full_name='Bench', email=f'w{worker_index}-{ops}@x.com'))
+            db.session.commit()
+
+        def count_view():
+            Blog.query.filter_by(id=blog_id).update({Blog.views: Blog.views + 1})
+            db.session.commit()
+
+        def upsert_dau():
+            now = datetime.utcnow()
+            with db.engine.begin() as connection:
+                dau.write(connection, {(user_id, now.date()): (now, now)})
+
+        workload = [insert_rsvp, count_view, upsert_dau]
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            work = workload[ops % len(workload)]
+            try:
+                retry_on_lock(work, rollback=work is not upsert_dau)
+                ops += 1
+            except OperationalError:
+                db.session.rollback()
+                errors += 1
+    results.put((ops, errors))
+
+
+def run_mode(name, env, workers, seconds):
+    os.environ.update(env)
+    directory = tempfile.mkdtemp(prefix=f'sqlite-bench-{name}-')
+    database_url = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+    user_id = _seed(database_url)
+
+    ctx = multiprocessing.get_context('spawn')
+    results = ctx.Queue()
+    processes = [
+        ctx.Process(target=_worker, args=(i, database_url, user_id, seconds, results))
+        for i in range(workers)
+    ]
+    started = time.perf_counter()
+    for process in processes:
+        process.start()
+    totals = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - started
+
+    ops = sum(t[0] for t in totals)
+    errors = sum(t[1] for t in totals)
+    return {'mode': name, 'ops': ops, 'errors': errors, 'ops_per_sec': ops / seconds, 'wall': elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--workers', type=int, default=2 * (os.cpu_count() or 1) + 1)
+    parser.add_argument('--mode', choices=sorted(MODES), action='append')
+    args = parser.parse_args()
+
+    rows = [run_mode(mode, MODES[mode], args.workers, args.seconds) for mode in (args.mode or MODES)]
+
+    print()
+    print(f"{args.workers} worker processes, {args.seconds:g}s per mode")
+    print(f"{'mode':<10} {'writes':>8} {'writes/s':>10} {'lock errors':>12}")
+    for row in rows:
+        print(f"{row['mode']:<10} {row['ops']:>8} {row['ops_per_sec']:>10.1f} {row['errors']:>12}")
+
+
+if __name__ == '__main__':
+    main()
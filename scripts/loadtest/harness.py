@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Load-test harness
+Replays the hot flows against a running instance seeded with
+``flask --app main synthetic seed`` and reports throughput and p50/p95/p99 per flow.
+
+Logins go through Turnstile, so the harness signs Flask session cookies for the
+synthetic admin/member accounts itself: run it with the same SECRET_KEY as the
+server (staging only, never production data).
+
+Usage:
+    python scripts/loadtest/harness.py --url http://127.0.0.1:5051 \\
+        --manifest instance/loadtest_manifest.json --concurrency 8 --duration 30
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from flask import Flask
+from flask.sessions import SecureCookieSessionInterface
+
+FLOWS = [
+    'public_home', 'public_events', 'member_dashboard', 'admin_members',
+    'checkin_scan', 'bulk_approve', 'exports',
+]
+
+
+def session_cookie(secret_key, user_id):
+    """A signed Flask session cookie that Flask-Login accepts as ``user_id``"""
+    signer = Flask('loadtest')
+    signer.secret_key = secret_key
+    serializer = SecureCookieSessionInterface().get_signing_serializer(signer)
+    return serializer.dumps({'_user_id': str(user_id), '_fresh': True, '_permanent': True})
+
+
+class Context:
+    """Shared state: manifest samples and the queues write flows consume"""
+
+    def __init__(self, base_url, manifest, secret_key):
+        self.base_url = base_url.rstrip('/')
+        self.manifest = manifest
+        self.secret_key = secret_key
+        self._lock = threading.Lock()
+        self._checkins = iter(manifest.get('checkin_rsvp_ids', []))
+        self._pending = iter(manifest.get('pending_rsvp_ids', []))
+        self._local = threading.local()
+
+    def take(self, source, count=1):
+        with self._lock:
+            return list(itertools.islice(getattr(self, source), count))
+
+    def client(self, role):
+        """Per-thread HTTP session for 'anon', 'member' or 'admin'"""
+        clients = getattr(self._local, 'clients', None)
+        if clients is None:
+            clients = self._local.clients = {}
+        if role not in clients:
+            client = requests.Session()
+            if role == 'admin':
+                user_id = random.choice(self.manifest['admin_user_ids'])
+            elif role == 'member':
+                user_id = random.choice(self.manifest['member_user_ids'])
+            else:
+                user_id = None
+            if user_id is not None:
+                client.cookies.set('session', session_cookie(self.secret_key, user_id))
+            clients[role] = client
+        return clients[role]
+
+    def get(self, role, path, **kwargs):
+        return self.client(role).get(self.base_url + path, allow_redirects=False, timeout=60, **kwargs)
+
+    def post(self, role, path, **kwargs):
+        return self.client(role).post(self.base_url + path, allow_redirects=False, timeout=60, **kwargs)
+
+
+def run_flow(ctx, name):
+    """One iteration of a flow; returns the last response, or None when its input is exhausted"""
+    if name == 'public_home':
+        return ctx.get('anon', '/')
+    if name == 'public_events':
+        return ctx.get('anon', '/events')
+    if name == 'member_dashboard':
+        return ctx.get('member', '/member/')
+    if name == 'admin_members':
+        return ctx.get('admin', '/admin/members', params={'page': random.randint(1, 5)})
+    if name == 'checkin_scan':
+        ctx.post('admin', '/admin/rewards/member-lookup',
+                 json={'member_id_number': random.choice(ctx.manifest['member_id_numbers'])})
+        rsvp_ids = ctx.take('_checkins')
+        if not rsvp_ids:
+            return None
+        return ctx.post('admin', f'/admin/rsvps/checkin/{rsvp_ids[0]}')
+    if name == 'bulk_approve':
+        rsvp_ids = ctx.take('_pending', 10)
+        if not rsvp_ids:
+            return None
+        return ctx.post('admin', '/admin/rsvps/bulk-approve', json={'rsvp_ids': rsvp_ids})
+    if name == 'exports':
+        ctx.get('admin', '/admin/members/export', params={'report_type': 'all_members'})
+        return ctx.get('admin', '/admin/payments/export')
+    raise ValueError(f'Unknown flow {name}')
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def measure(ctx, name, concurrency, duration, max_requests):
+    latencies, errors = [], 0
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+    issued = itertools.count()
+
+    def worker():
+        nonlocal errors
+        while time.perf_counter() < deadline and next(issued) < max_requests:
+            started = time.perf_counter()
+            try:
+                response = run_flow(ctx, name)
+            except requests.RequestException:
+                response = False
+            elapsed = time.perf_counter() - started
+            if response is None:
+                return
+            with lock:
+                if response is False or response.status_code >= 300:
+                    errors += 1
+                else:
+                    latencies.append(elapsed * 1000)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(worker)
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'flow': name,
+        'requests': len(latencies) + errors,
+        'errors': errors,
+        'throughput_rps': round(len(latencies) / wall, 2) if wall else 0.0,
+        'p50_ms': round(percentile(latencies, 50), 1),
+        'p95_ms': round(percentile(latencies, 95), 1),
+        'p99_ms': round(percentile(latencies, 99), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--url', default='http://127.0.0.1:5051')
+    parser.add_argument('--manifest', default=os.path.join('instance', 'loadtest_manifest.json'))
+    parser.add_argument('--secret-key', default=os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production'))
+    parser.add_argument('--flow', action='append', choices=FLOWS, help='Flow to run (repeatable; default all).')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=20, help='Seconds per flow.')
+    parser.add_argument('--max-requests', type=int, default=10 ** 9, help='Cap per flow.')
+    parser.add_argument('--json', dest='json_path', help='Also write the results as JSON here.')
+    args = parser.parse_args()
+
+    with open(args.manifest) as f:
+        manifest = json.load(f)
+    ctx = Context(args.url, manifest, args.secret_key)
+
+    results = []
+    for name in args.flow or FLOWS:
+        print(f'running {name} ...', file=sys.stderr)
+        results.append(measure(ctx, name, args.concurrency, args.duration, args.max_requests))
+
+    print(f"\n{'flow':<18} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for row in results:
+        print(f"{row['flow']:<18} {row['requests']:>9} {row['errors']:>7} {row['throughput_rps']:>8} "
+              f"{row['p50_ms']:>8} {row['p95_ms']:>8} {row['p99_ms']:>8}")
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump({'url': args.url, 'run': manifest.get('run'), 'concurrency': args.concurrency,
+                       'duration': args.duration, 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Shared fixtures: the app runs against a throwaway SQLite database
+"""
+
+import os
+import tempfile
+
+import pytest
+
+_db_dir = tempfile.mkdtemp(prefix='digital-club-tests-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+os.environ['MEMBER_INDEX_DIR'] = os.path.join(_db_dir, 'member_index')
+
+from app import create_app, db  # noqa: E402
+from app.instrumentation import assert_max_queries  # noqa: E402
+from app.models import Member, User  # noqa: E402
+from app.search import install_search_indexes  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def app():
+    app = create_app()
+    app.config.update(
+        TESTING=True, SERVER_NAME='localhost', PREFERRED_URL_SCHEME='http',
+        # Query budgets measure rendering; tests/test_page_cache.py turns the cache on
+        PAGE_CACHE=False, PAGE_CACHE_DIR=os.path.join(_db_dir, 'page_cache'),
+    )
+    with app.app_context():
+        db.create_all()
+        # Normally installed by schema_boot once the tables exist
+        with db.engine.begin() as conn:
+            install_search_indexes(conn)
+    yield app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def query_budget():
+    """
+    Assert a query budget for an endpoint:
+
+        with query_budget(6, allow_repeats=2):
+            client.get('/events')
+    """
+    return assert_max_queries
+
+
+@pytest.fixture
+def make_user():
+    """
+    Create and flush an approved user, inside the caller's app context:
+
+        admin = make_user('admin@example.com', role='admin')
+    """
+    def make(email, role='student', is_approved=True, **fields):
+        user = User(email=email, role=role, is_approved=is_approved, **fields)
+        user.set_password('secret')
+        db.session.add(user)
+        db.session.flush()
+        return user
+    return make
+
+
+@pytest.fixture
+def make_member(make_user):
+    """
+    Create and flush a user with a member profile:
+
+        member = make_member('amina@example.com', 'Amina Index', member_id_number='DC-1')
+    """
+    def make(email, full_name, role='student', is_approved=True, **fields):
+        user = make_user(email, role=role, is_approved=is_approved)
+        member = Member(user_id=user.id, full_name=full_name, **fields)
+        db.session.add(member)
+        db.session.flush()
+        return member
+    return make
+
+
+@pytest.fixture
+def login(client):
+    """Log ``client`` in as a user id (no password round trip)"""
+    def log_in(user_id):
+        with client.session_transaction() as session:
+            session['_user_id'] = str(user_id)
+            session['_fresh'] = True
+    return log_in
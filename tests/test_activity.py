@@ -0,0 +1,49 @@
+"""
+Daily active users: page views coalesce per (user, day) in memory and are upserted in one batch
+"""
+
+from datetime import datetime
+
+import pytest
+
+from app import db
+from app.activity import DailyActivityBuffer
+from app.models import DailyActiveUser
+from app.write_buffer import CoalescingBuffer
+
+
+def test_buffer_requires_a_write_implementation():
+    with pytest.raises(TypeError):
+        CoalescingBuffer('incomplete')
+
+
+def test_views_coalesce_per_user_and_day_and_upsert(app, query_budget, make_user):
+    with app.app_context():
+        first, second = make_user('dau-first@example.com'), make_user('dau-second@example.com')
+        db.session.commit()
+        first_id, second_id = first.id, second.id
+    # Never flushed by its thread during the test
+    buffer = DailyActivityBuffer('test-dau', flush_interval=3600)
+    buffer.init_app(app)
+
+    buffer.record(first_id, datetime(2026, 3, 2, 9, 30))
+    buffer.record(first_id, datetime(2026, 3, 2, 8, 15))
+    buffer.record(first_id, datetime(2026, 3, 2, 17, 45))
+    buffer.record(first_id, datetime(2026, 3, 3, 10, 0))
+    buffer.record(second_id, datetime(2026, 3, 2, 12, 0))
+    assert buffer.pending() == 3
+    with app.app_context(), query_budget(1):
+        assert buffer.flush() == 3
+
+    # A later batch widens the stored window instead of replacing it
+    buffer.record(first_id, datetime(2026, 3, 2, 12, 0))
+    buffer.record(first_id, datetime(2026, 3, 2, 7, 0))
+    buffer.record(second_id, datetime(2026, 3, 2, 11, 0))
+    assert buffer.flush() == 2
+
+    with app.app_context():
+        rows = {
+            (row.user_id, row.activity_date.day): (row.first_seen_at.hour, row.last_seen_at.hour)
+            for row in DailyActiveUser.query.filter(DailyActiveUser.user_id.in_([first_id, second_id]))
+        }
+    assert rows == {(first_id, 2): (7, 17), (first_id, 3): (10, 10), (second_id, 2): (11, 12)}
@@ -0,0 +1,136 @@
+"""
+Endpoint benchmarks: wall time and SQL statement count for the heaviest pages,
+checked against the ``@perf_budget`` declared on each view.
+
+Budgets are checked on cold requests: every in-process cache is cleared before
+each timed round, so the queries behind a cached aggregate are measured too.
+The warm query count is recorded alongside for comparison.
+
+The dataset is a small, fixed synthetic club (app/synthetic.py) so query counts
+are reproducible. Results are written to .benchmarks/ (or BENCHMARK_RESULTS_DIR)
+as one JSON file per run for comparison over time; BENCHMARK_TIME_SCALE
+multiplies the latency budgets on slow machines.
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import time
+from datetime import datetime
+
+import pytest
+
+from app.cache import all_caches
+from app.instrumentation import QueryCounter, budget_for
+from app.models import Competition
+from app.synthetic import seed_club
+
+ROUNDS = 3
+TIME_SCALE = float(os.environ.get('BENCHMARK_TIME_SCALE', '1'))
+RESULTS_DIR = os.environ.get('BENCHMARK_RESULTS_DIR') or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.benchmarks'
+)
+
+DATASET = {
+    'users': 150, 'admins': 2, 'events': 12, 'rsvps': 600, 'rewards': 400,
+    'periods': 3, 'competitions': 2, 'weeks': 6, 'posts': 6,
+}
+
+# endpoint, who is logged in, path (``{competition}`` is filled from the dataset)
+ENDPOINTS = [
+    ('admin.dashboard', 'admin', '/admin/'),
+    ('admin.members', 'admin', '/admin/members'),
+    ('admin.payments', 'admin', '/admin/payments'),
+    ('admin.financial', 'admin', '/admin/financial'),
+    ('member.competitions_rankings', 'member', '/member/competitions/rankings'),
+    ('member.competition_leaderboard', 'member', '/member/competitions/{competition}/leaderboard'),
+    ('main.events', None, '/events'),
+    ('main.alumni', None, '/alumni'),
+]
+
+_results = []
+
+
+@pytest.fixture(scope='module')
+def dataset(app):
+    with app.app_context():
+        manifest = seed_club('small', overrides=DATASET, seed=38, progress=lambda message: None)
+        manifest['competition_id'] = (
+            Competition.query.filter_by(status='finalized').order_by(Competition.id).first().id
+        )
+    yield manifest
+    _write_results()
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=5,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _write_results():
+    if not _results:
+        return
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    captured_at = datetime.utcnow()
+    path = os.path.join(RESULTS_DIR, f"{captured_at.strftime('%Y%m%dT%H%M%S')}.json")
+    with open(path, 'w') as f:
+        json.dump({
+            'captured_at': captured_at.isoformat(timespec='seconds'),
+            'revision': _git_revision(),
+            'dataset': DATASET,
+            'rounds': ROUNDS,
+            'results': _results,
+        }, f, indent=2)
+
+
+def _clear_caches():
+    for cache in all_caches():
+        cache.invalidate()
+
+
+@pytest.mark.parametrize('endpoint,role,path', ENDPOINTS, ids=[e[0] for e in ENDPOINTS])
+def test_endpoint_within_budget(app, client, login, dataset, endpoint, role, path):
+    budget = budget_for(app, endpoint)
+    assert budget, f'{endpoint} has no @perf_budget'
+
+    if role:
+        login(dataset[f'{role}_user_ids'][0])
+    url = path.format(competition=dataset['competition_id'])
+
+    # First request compiles templates; it is not timed
+    assert client.get(url).status_code == 200
+
+    timings = []
+    for _ in range(ROUNDS):
+        _clear_caches()
+        with QueryCounter() as queries:
+            started = time.perf_counter()
+            response = client.get(url)
+            timings.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200
+    with QueryCounter() as warm:
+        assert client.get(url).status_code == 200
+
+    wall_ms = statistics.median(timings)
+    _results.append({
+        'endpoint': endpoint,
+        'path': url,
+        'queries': queries.count,
+        'warm_queries': warm.count,
+        'db_ms': round(queries.duration_ms, 2),
+        'wall_ms': round(wall_ms, 2),
+        'budget': budget,
+    })
+
+    assert queries.count <= budget['queries'], (
+        f'{endpoint} ran {queries.count} queries cold, budget is {budget["queries"]}; most repeated: '
+        + '; '.join(f"{i['count']}x {i['shape'][:120]}" for i in queries.repeated(2)[:3])
+    )
+    assert wall_ms <= budget['ms'] * TIME_SCALE, (
+        f'{endpoint} took {wall_ms:.0f} ms (median of {ROUNDS} cold requests), budget is {budget["ms"] * TIME_SCALE:.0f} ms'
+    )
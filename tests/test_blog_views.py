@@ -0,0 +1,34 @@
+"""
+Blog views are buffered, deduplicated per visitor, skip crawlers and are flushed in one batch
+"""
+
+from datetime import datetime
+
+from app import db
+from app.blog_views import blog_view_counter
+from app.models import Blog
+
+
+def test_views_are_buffered_and_deduplicated(app, client, query_budget, make_user):
+    with app.app_context():
+        author = make_user('views-author@example.com', role='admin')
+        db.session.add(Blog(title='Counting views', slug='counting-views', content='Body', author_id=author.id,
+                            is_published=True, views=10, published_date=datetime(2026, 1, 5)))
+        db.session.commit()
+    blog_view_counter.flush()
+
+    browser = {'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64)'}
+    assert client.get('/blogs/counting-views', headers=browser).status_code == 200
+    client.get('/blogs/counting-views', headers=browser)
+    client.get('/blogs/counting-views', headers={'User-Agent': 'Mozilla/5.0 (iPhone)'})
+    client.get('/blogs/counting-views', headers={'User-Agent': 'Googlebot/2.1'})
+    assert client.get('/blogs/no-such-post', headers=browser).status_code == 404
+
+    with app.app_context():
+        # Reading the post wrote nothing yet
+        assert db.session.get(Blog, Blog.query.filter_by(slug='counting-views').one().id).views == 10
+        # One batched UPDATE for every buffered post
+        with query_budget(1):
+            assert blog_view_counter.flush() == 1
+        db.session.expire_all()
+        assert Blog.query.filter_by(slug='counting-views').one().views == 12
@@ -0,0 +1,63 @@
+"""
+Offline check-in: versioned manifest, manifest deltas and idempotent batch check-ins
+"""
+
+from datetime import datetime, timedelta
+
+from app import db
+from app.models import Event, RewardTransaction, RSVP
+
+
+def _rsvp(event, name, code, status='approved'):
+    return RSVP(event=event, full_name=name, email=f'{code.lower()}@example.com', acceptance_code=code, status=status)
+
+
+def test_batch_checkins_are_idempotent_and_return_manifest_deltas(app, client, login, make_user):
+    with app.app_context():
+        admin = make_user('checkin-admin@example.com', role='admin')
+        event = Event(title='Offline Door Night', event_date=datetime(2031, 5, 1, 18, 0), check_in_points=0)
+        db.session.add(event)
+        db.session.flush()
+        db.session.add_all([_rsvp(event, 'Asha Door', 'CHKA01'), _rsvp(event, 'Bakari Door', 'CHKB02'),
+                            _rsvp(event, 'Pending Door', 'CHKP03', status='pending')])
+        db.session.commit()
+        admin_id, event_id = admin.id, event.id
+    login(admin_id)
+    page = client.get(f'/admin/events/{event_id}/checkin').get_data(as_text=True)
+    assert f'/admin/events/{event_id}/checkin/manifest.json' in page and 'Asha Door' not in page
+
+    full = client.get(f'/admin/events/{event_id}/checkin/manifest.json').json
+    assert full['full'] and [row[1] for row in full['rows']] == ['CHKA01', 'CHKB02']
+    # Scanner devices keep the manifest offline: codes, ids and names only
+    assert 'email' not in full['fields'] and '@' not in str(full['rows'])
+    version = full['version']
+    assert client.get(f'/admin/events/{event_id}/checkin/manifest.json',
+                      headers={'If-None-Match': f'"{event_id}-{version}-full"'}).status_code == 304
+
+    scanned_at = (datetime.utcnow() - timedelta(minutes=10)).strftime('%Y-%m-%dT%H:%M:%SZ')
+    batch = {'since': version, 'checkins': [
+        {'key': 'k1', 'code': 'chka01', 'scanned_at': scanned_at},
+        {'key': 'k2', 'code': 'CHKA01', 'scanned_at': scanned_at},
+        {'key': 'k3', 'code': 'CHKP03'},
+    ]}
+    response = client.post(f'/admin/events/{event_id}/checkin/batch', json=batch).json
+    assert [result['status'] for result in response['results']] == ['checked_in', 'already_checked_in', 'not_found']
+    delta = response['manifest']
+    assert not delta['full'] and delta['version'] > version
+    assert [(row[1], row[4], row[5]) for row in delta['rows']] == [('CHKA01', True, scanned_at)]
+
+    # Replaying the queue (e.g. the response was lost) changes nothing
+    replay = client.post(f'/admin/events/{event_id}/checkin/batch',
+                         json=dict(batch, since=delta['version'])).json
+    assert replay['results'][0]['status'] == 'already_checked_in'
+    assert replay['manifest']['rows'] == [] and replay['manifest']['version'] == delta['version']
+
+    with app.app_context():
+        rsvp = RSVP.query.filter_by(acceptance_code='CHKB02').one()
+        rsvp.status = 'rejected'
+        db.session.commit()
+        rejected_id = rsvp.id
+    removed = client.get(f"/admin/events/{event_id}/checkin/manifest.json?since={delta['version']}").json
+    assert removed['removed'] == [rejected_id] and removed['rows'] == []
+    with app.app_context():
+        assert RewardTransaction.query.filter_by(event_id=event_id).count() == 0
@@ -0,0 +1,134 @@
+"""
+Deferred check-in rewards: one batch awards points and newly crossed trophies for many check-ins
+"""
+
+from datetime import datetime, timedelta
+
+from app import db
+from app import checkin_rewards as rewards
+from app.checkin_rewards import TrophyLadder, award_pending, checkin_rewards
+from app.models import Event, Member, MemberTrophy, RewardTransaction, RSVP, Trophy
+
+
+def test_trophy_ladder_finds_crossed_thresholds():
+    ladder = TrophyLadder([(50, 3), (10, 1), (30, 2)])
+    assert ladder.crossed(5, 35) == [1, 2]
+    assert ladder.crossed(30, 50) == [3]
+    assert ladder.crossed(50, 50) == []
+
+
+def test_checkins_are_rewarded_in_one_batch(app, query_budget, make_user, make_member):
+    with app.app_context():
+        admin = make_user('rewards-admin@example.com', role='admin')
+        member = make_member('rewards-member@example.com', 'Reward Runner')
+        trophies = [Trophy(name=f'Rewards {points}', points_required=points) for points in (10, 30, 50)]
+        first = Event(title='Rewards Talk', event_date=datetime(2031, 6, 1), check_in_points=30)
+        second = Event(title='Rewards Lab', event_date=datetime(2031, 6, 2), check_in_points=30)
+        db.session.add_all([first, second, *trophies])
+        db.session.flush()
+        db.session.add(RewardTransaction(member_id=member.id, points=5, transaction_type='manual',
+                                         reason='Starting balance', admin_id=admin.id))
+        checked_in_at = datetime.utcnow() - timedelta(minutes=5)
+        rsvps = [
+            RSVP(event=event, member_id=member.id, full_name='Reward Runner', email='rewards-member@example.com',
+                 status='approved', checked_in=True, checked_in_at=checked_in_at + timedelta(seconds=n),
+                 checked_in_by=admin.id)
+            for n, event in enumerate((first, second))
+        ]
+        db.session.add_all(rsvps)
+        db.session.commit()
+        member_id, rsvp_ids = member.id, [rsvp.id for rsvp in rsvps]
+        # Nothing is awarded at the door
+        assert RewardTransaction.query.filter_by(member_id=member_id).count() == 1
+
+    for rsvp_id in rsvp_ids:
+        checkin_rewards.record(rsvp_id)
+    with query_budget(10):
+        checkin_rewards.flush()
+
+    with app.app_context():
+        member = db.session.get(Member, member_id)
+        assert member.get_total_points() == 65
+        earned = sorted(trophy.name for trophy in member.get_current_trophies())
+        assert [name for name in earned if name.startswith('Rewards')] == ['Rewards 10', 'Rewards 30', 'Rewards 50']
+        assert all(rsvp.points_processed_at for rsvp in RSVP.query.filter(RSVP.id.in_(rsvp_ids)))
+
+    # Running again awards nothing twice
+    checkin_rewards.record(rsvp_ids[0])
+    checkin_rewards.flush()
+    with app.app_context():
+        assert RewardTransaction.query.filter_by(member_id=member_id).count() == 3
+        assert MemberTrophy.query.filter_by(member_id=member_id).count() == len(earned)
+
+
+def test_checkins_without_an_admin_are_rewarded_under_the_first_admin(app, make_user, make_member):
+    with app.app_context():
+        make_user('rewards-fallback-admin@example.com', role='admin')
+        member = make_member('rewards-fallback@example.com', 'Walk In')
+        event = Event(title='Rewards Walk-in', event_date=datetime(2031, 6, 3), check_in_points=10)
+        db.session.add(event)
+        db.session.flush()
+        # Imported attendance: nobody recorded who approved or checked them in
+        rsvp = RSVP(event=event, member_id=member.id, full_name='Walk In', email='rewards-fallback@example.com',
+                    status='approved', checked_in=True, checked_in_at=datetime.utcnow())
+        db.session.add(rsvp)
+        db.session.commit()
+        member_id, rsvp_id = member.id, rsvp.id
+
+    checkin_rewards.record(rsvp_id)
+    checkin_rewards.flush()
+    with app.app_context():
+        transaction = RewardTransaction.query.filter_by(member_id=member_id).one()
+        assert transaction.points == 10 and transaction.admin_id is not None
+
+
+def test_batches_claiming_in_the_same_tick_keep_their_own_rows(app, monkeypatch, make_user, make_member):
+    tick = datetime(2031, 6, 4, 9, 0)
+    with app.app_context():
+        admin = make_user('rewards-tick-admin@example.com', role='admin')
+        member = make_member('rewards-tick@example.com', 'Same Tick')
+        events = [Event(title=f'Rewards tick {n}', event_date=datetime(2031, 6, 4), check_in_points=10)
+                  for n in range(2)]
+        db.session.add_all(events)
+        db.session.flush()
+        db.session.add_all([
+            RSVP(event=event, member_id=member.id, full_name='Same Tick', email='rewards-tick@example.com',
+                 status='approved', checked_in=True, checked_in_at=tick, checked_in_by=admin.id,
+                 # The first row was claimed by another worker's batch at the very same timestamp
+                 points_processed_at=tick if n == 0 else None)
+            for n, event in enumerate(events)
+        ])
+        db.session.commit()
+        member_id = member.id
+
+        monkeypatch.setattr(rewards, 'datetime', type('Clock', (), {'utcnow': staticmethod(lambda: tick)}))
+        with db.engine.begin() as connection:
+            award_pending(connection)
+        assert RewardTransaction.query.filter_by(member_id=member_id).count() == 1
+
+
+def test_undo_removes_awarded_points(app, client, login, make_user, make_member):
+    with app.app_context():
+        admin = make_user('rewards-undo-admin@example.com', role='admin')
+        member = make_member('rewards-undo@example.com', 'Undo Runner')
+        event = Event(title='Rewards Undo', event_date=datetime(2031, 6, 4), check_in_points=15)
+        db.session.add(event)
+        db.session.flush()
+        rsvp = RSVP(event=event, member_id=member.id, full_name='Undo Runner', email='rewards-undo@example.com',
+                    status='approved', checked_in=True, checked_in_at=datetime.utcnow(), checked_in_by=admin.id)
+        db.session.add(rsvp)
+        db.session.commit()
+        admin_id, member_id, rsvp_id = admin.id, member.id, rsvp.id
+    login(admin_id)
+
+    checkin_rewards.record(rsvp_id)
+    checkin_rewards.flush()
+    assert client.post(f'/admin/rsvps/checkin/{rsvp_id}/undo').json['success']
+    with app.app_context():
+        assert RewardTransaction.query.filter_by(member_id=member_id).count() == 0
+        assert db.session.get(RSVP, rsvp_id).points_processed_at is None
+    # The undone check-in is not picked up again
+    checkin_rewards.record(rsvp_id)
+    checkin_rewards.flush()
+    with app.app_context():
+        assert RewardTransaction.query.filter_by(member_id=member_id).count() == 0
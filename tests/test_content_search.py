@@ -0,0 +1,68 @@
+"""
+Blog/news full-text search: ranking, highlighted snippets, keyset cursors and reindexing on edit
+"""
+
+from datetime import datetime
+
+from app import db
+from app.models import Blog, News, User
+from app.search import content_backend
+
+
+def _author():
+    user = User.query.filter_by(email='search-author@example.com').first()
+    if user is None:
+        user = User(email='search-author@example.com', role='admin', is_approved=True)
+        user.set_password('secret')
+        db.session.add(user)
+        db.session.flush()
+    return user
+
+
+def test_blog_search_pages_with_cursors_and_follows_edits(app, client):
+    with app.app_context():
+        assert content_backend('blog') == 'fts5'
+        author = _author()
+        for n in range(5):
+            db.session.add(Blog(
+                title=f'Zanzibar robotics diary {n}', slug=f'zanzibar-robotics-{n}', author_id=author.id,
+                content=f'<p>Day {n}: soldering the <b>quadruped</b> robot controllers.</p>', is_published=True,
+                published_date=datetime(2026, 5, n + 1),
+            ))
+        db.session.add(Blog(title='Draft quadruped notes', slug='zanzibar-draft', author_id=author.id,
+                            content='quadruped', is_published=False))
+        db.session.commit()
+
+    first = client.get('/search?type=blog&q=quadrup&limit=3').json
+    assert len(first['results']) == 3 and first['next_cursor']
+    assert '<mark>quadruped</mark>' in first['results'][0]['snippet']
+    assert '<b>' not in first['results'][0]['snippet']
+    second = client.get(f"/search?type=blog&q=quadrup&limit=3&cursor={first['next_cursor']}").json
+    assert len(second['results']) == 2 and second['next_cursor'] is None
+    slugs = {r['url'] for r in first['results'] + second['results']}
+    assert len(slugs) == 5 and not any('draft' in url for url in slugs)
+
+    # Edits are reindexed and drop the cached pages
+    with app.app_context():
+        post = Blog.query.filter_by(slug='zanzibar-robotics-0').one()
+        post.content = 'Switched to drone work'
+        db.session.commit()
+    assert len(client.get('/search?type=blog&q=quadruped&limit=10').json['results']) == 4
+    assert len(client.get('/search?type=blog&q=drone').json['results']) == 1
+
+    assert client.get('/search?type=blog&q=x&cursor=not-a-cursor').status_code == 400
+    assert client.get('/search?type=events&q=x').status_code == 400
+
+
+def test_news_search_ranks_title_matches_first(app, client):
+    with app.app_context():
+        author = _author()
+        db.session.add_all([
+            News(title='Club update', content='The kilimanjaro hackathon results are in.', author_id=author.id),
+            News(title='Kilimanjaro hackathon winners', content='Congratulations to all teams.',
+                 author_id=author.id),
+        ])
+        db.session.commit()
+
+    results = client.get('/search?type=news&q=kilimanjaro hackathon').json['results']
+    assert [r['title'] for r in results] == ['Kilimanjaro hackathon winners', 'Club update']
@@ -0,0 +1,31 @@
+"""
+Admin dashboard statistics: aggregate queries, caching and invalidation on commit
+"""
+
+from app import db
+from app.dashboard_stats import get_dashboard_stats, invalidate_dashboard_stats
+from app.models import User
+
+
+def test_cold_load_is_a_few_aggregate_queries(app, query_budget):
+    with app.test_request_context():
+        invalidate_dashboard_stats()
+        with query_budget(5):
+            stats = get_dashboard_stats()
+        with query_budget(0):
+            assert get_dashboard_stats() == stats
+
+
+def test_approval_invalidates_counters(app, make_user):
+    with app.test_request_context():
+        make_user('dashboard-pending@example.com', is_approved=False)
+        db.session.commit()
+        before = get_dashboard_stats()
+        assert before['pending_approvals'] >= 1
+
+        user = User.query.filter_by(email='dashboard-pending@example.com').one()
+        user.is_approved = True
+        db.session.commit()
+        # Served from the cache unless the commit dropped the counters
+        after = get_dashboard_stats()
+        assert after['pending_approvals'] == before['pending_approvals'] - 1
@@ -0,0 +1,51 @@
+"""
+Public alumni and student directories: SQL pagination, batched badges and cached stats
+"""
+
+from app import db
+from app.models import MemberTrophy, RewardTransaction, Trophy, User
+from app.page_cache import get_store
+
+
+def _alumnus(make_member, n, course):
+    return make_member(f'directory-{n:02d}@example.com', f'Directory Alumnus {n:02d}', status='alumni',
+                       course=course, year='2020', title=f'Company {n % 3}')
+
+
+def test_alumni_directory_is_paginated_with_batched_badges(app, client, query_budget, make_member):
+    with app.app_context():
+        trophy = Trophy(name='Directory Star', points_required=10, icon='fas fa-star')
+        db.session.add(trophy)
+        members = [_alumnus(make_member, n, 'Directory Studies') for n in range(30)]
+        db.session.flush()
+        for member in members:
+            db.session.add(RewardTransaction(member_id=member.id, points=15, transaction_type='manual',
+                                             reason='Directory test', admin_id=member.user_id))
+            db.session.add(MemberTrophy(member_id=member.id, trophy_id=trophy.id))
+        db.session.commit()
+
+    client.get('/alumni?course=Directory+Studies')  # warm the stats cache
+    with query_budget(6, allow_repeats=1):
+        first = client.get('/alumni?course=Directory+Studies')
+    html = first.get_data(as_text=True)
+    assert first.status_code == 200
+    assert 'Directory Alumnus 00' in html and 'Directory Alumnus 23' in html
+    assert 'Directory Alumnus 24' not in html
+    assert 'Directory Star' in html
+    assert '<option value="Directory Studies"' in html
+
+    second = client.get('/alumni?course=Directory+Studies&page=2').get_data(as_text=True)
+    assert 'Directory Alumnus 29' in second and 'Directory Alumnus 00' not in second
+
+    searched = client.get('/alumni?search=Alumnus+07').get_data(as_text=True)
+    assert 'Directory Alumnus 07' in searched and 'Directory Alumnus 08' not in searched
+
+
+def test_approvals_in_any_worker_refresh_directory_stats(app, make_member):
+    with app.app_context():
+        # Registered at import, so a worker that never rendered a directory still bumps the version
+        before = get_store().version('User')
+        member = _alumnus(make_member, 99, 'Approval Studies')
+        db.session.get(User, member.user_id).is_approved = False
+        db.session.commit()
+        assert get_store().version('User') != before
@@ -0,0 +1,50 @@
+"""
+Public events page and calendar feed: SQL-side windows, pagination and caching headers
+"""
+
+from datetime import datetime
+
+from app import db
+from app.models import Event
+
+
+def _event(title, when, audience='everyone', category='tech_talk'):
+    return Event(title=title, event_date=when, category=category, target_audience=audience)
+
+
+def test_calendar_feed_returns_public_events_in_the_window(app, client):
+    with app.app_context():
+        db.session.add_all([
+            _event('Calendar talk', datetime(2031, 3, 10, 14, 0)),
+            _event('Calendar members-only', datetime(2031, 3, 12, 14, 0), audience='members'),
+            _event('Calendar next month', datetime(2031, 4, 2, 9, 30)),
+        ])
+        db.session.commit()
+
+    response = client.get('/events/calendar.json?start=2031-03-01&end=2031-04-01')
+    assert response.status_code == 200
+    assert [item['title'] for item in response.json['events']] == ['Calendar talk']
+    assert response.json['events'][0]['time'] == '14:00'
+    # Without an end the window stops at the end of the start's month
+    assert [item['title'] for item in client.get('/events/calendar.json?start=2031-03-05').json['events']] \
+        == ['Calendar talk']
+    assert 'max-age=300' in response.headers['Cache-Control']
+
+    revalidated = client.get('/events/calendar.json?start=2031-03-01&end=2031-04-01',
+                             headers={'If-None-Match': response.headers['ETag']})
+    assert revalidated.status_code == 304
+
+    assert client.get('/events/calendar.json?start=2031-03-01&end=2032-03-01').status_code == 400
+    assert client.get('/events/calendar.json?start=March').status_code == 400
+
+
+def test_past_events_are_paginated(app, client):
+    with app.app_context():
+        db.session.add_all([_event(f'Archive social {n:02d}', datetime(2001, 1, n + 1), category='social_event')
+                            for n in range(14)])
+        db.session.commit()
+
+    first = client.get('/events?category=social_event').get_data(as_text=True)
+    assert 'Archive social 13' in first and 'Archive social 01' not in first
+    second = client.get('/events?category=social_event&page=2').get_data(as_text=True)
+    assert 'Archive social 01' in second and 'Archive social 13' not in second
@@ -0,0 +1,57 @@
+"""
+Financial rollups follow transaction inserts, edits and deletes; closed periods are frozen
+"""
+
+from datetime import date
+
+from app import db
+from app.financial_rollup import period_totals, rebuild_rollups
+from app.models import FinancialCategory, FinancialPeriod, FinancialTransaction
+
+
+def _transaction(period, category, amount, transaction_type='revenue'):
+    return FinancialTransaction(
+        financial_period_id=period.id, category_id=category.id, transaction_type=transaction_type,
+        amount=amount, transaction_date=date(2026, 3, 1), description='Rollup test',
+        recorded_by=period.opened_by,
+    )
+
+
+def test_rollup_tracks_transactions_and_freezes_closed_periods(app, make_user):
+    with app.app_context():
+        admin = make_user('rollup-admin@example.com', role='admin')
+        period = FinancialPeriod(name='Rollup term', start_date=date(2026, 1, 1), end_date=date(2026, 12, 31),
+                                 opened_by=admin.id)
+        dues = FinancialCategory(name='Rollup dues', type='revenue')
+        venue = FinancialCategory(name='Rollup venue', type='expense')
+        db.session.add_all([period, dues, venue])
+        db.session.flush()
+
+        first = _transaction(period, dues, 100)
+        second = _transaction(period, dues, 50)
+        db.session.add_all([first, second, _transaction(period, venue, 30, 'expense')])
+        db.session.commit()
+        totals = period_totals([period.id])[period.id]
+        assert (totals.revenue, totals.expenses, totals.count) == (150, 30, 3)
+
+        first.amount = 120
+        second.transaction_type, second.category_id = 'expense', venue.id
+        db.session.commit()
+        totals = period_totals([period.id])[period.id]
+        assert (totals.revenue, totals.expenses, totals.revenue_count, totals.expense_count) == (120, 80, 1, 2)
+
+        db.session.delete(first)
+        db.session.commit()
+        assert period_totals([period.id])[period.id].revenue == 0
+
+        period.status = 'closed'
+        rebuild_rollups([period.id], include_closed=True)
+        db.session.commit()
+        db.session.add(_transaction(period, dues, 999))
+        db.session.commit()
+        assert period_totals([period.id])[period.id].revenue == 0
+
+        # An explicit rebuild re-snapshots it from the transactions
+        rebuild_rollups([period.id], include_closed=True)
+        db.session.commit()
+        assert period_totals([period.id])[period.id].revenue == 999
@@ -0,0 +1,36 @@
+"""
+Guards of the Week: the per-worker widget cache follows guard commits made in other workers
+"""
+
+from datetime import date, datetime
+
+from app import db
+from app.guards import get_current_guards
+from app.models import Competition, CompetitionGuard
+from app.page_cache import get_store
+
+
+def test_cached_guards_follow_commits_in_other_workers(app, make_member):
+    with app.app_context():
+        member = make_member('guards-winner@example.com', 'Guard Winner')
+        runner_up = make_member('guards-next@example.com', 'Next Guard')
+        competition = Competition(title='Guards weekly', description='Weekly', category='web', frequency='weekly',
+                                  level=1, submission_type='link', status='finalized',
+                                  starts_at=datetime(2031, 5, 5), ends_at=datetime(2031, 5, 11),
+                                  created_by=member.user_id)
+        db.session.add(competition)
+        db.session.flush()
+        db.session.add(CompetitionGuard(competition_id=competition.id, member_id=member.id, level=1,
+                                        week_start=date(2031, 5, 5), week_end=date(2031, 5, 11),
+                                        created_at=datetime(2031, 5, 12)))
+        db.session.commit()
+        assert [guard.member.full_name for guard in get_current_guards() if guard.level == 1] == ['Guard Winner']
+
+        # Another worker finalizes the next week: the row lands and its commit bumps the shared version
+        db.session.execute(CompetitionGuard.__table__.insert().values(
+            competition_id=competition.id, member_id=runner_up.id, level=1, week_start=date(2031, 5, 12),
+            week_end=date(2031, 5, 18), created_at=datetime(2031, 5, 19)))
+        db.session.commit()
+        assert [guard.member.full_name for guard in get_current_guards() if guard.level == 1] == ['Guard Winner']
+        get_store().bump('CompetitionGuard')
+        assert [guard.member.full_name for guard in get_current_guards() if guard.level == 1] == ['Next Guard']
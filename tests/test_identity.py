@@ -0,0 +1,40 @@
+"""
+Identity cache: role and profile changes committed in another worker reach this worker's cached sessions
+"""
+
+from app import db
+from app.identity import load_identity
+from app.models import Member, User
+from app.page_cache import get_store
+
+
+def test_cached_identity_follows_user_commits_in_other_workers(app, make_user):
+    with app.test_request_context():
+        user = make_user('identity-admin@example.com', role='admin')
+        db.session.commit()
+        user_id = user.id
+        assert load_identity(user_id).role == 'admin'
+
+        # Another worker demotes the user: the row changes and its commit bumps the shared User version
+        db.session.execute(User.__table__.update().where(User.__table__.c.id == user_id).values(role='student'))
+        db.session.commit()
+        db.session.expunge_all()
+        assert load_identity(user_id).role == 'admin'  # still this worker's cached copy
+        get_store().bump('User')
+        assert load_identity(user_id).role == 'student'
+
+
+def test_cached_identity_follows_member_profile_commits_in_other_workers(app, make_member):
+    with app.test_request_context():
+        member = make_member('identity-member@example.com', 'Before Rename')
+        db.session.commit()
+        user_id = member.user_id
+        assert load_identity(user_id).member.full_name == 'Before Rename'
+
+        db.session.execute(Member.__table__.update().where(Member.__table__.c.id == member.id)
+                           .values(full_name='After Rename'))
+        db.session.commit()
+        db.session.expunge_all()
+        assert load_identity(user_id).member.full_name == 'Before Rename'
+        get_store().bump('Member')
+        assert load_identity(user_id).member.full_name == 'After Rename'
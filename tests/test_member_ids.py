@@ -0,0 +1,58 @@
+"""
+Member-ID gallery: membership-status filter in SQL, back-side filenames and cached card thumbnails
+"""
+
+import os
+from datetime import date, timedelta
+
+from PIL import Image
+
+from app import db
+from app.models import MembershipPayment
+
+
+def _card(folder, filename):
+    Image.new('RGB', (1200, 760), 'navy').save(os.path.join(folder, filename))
+
+
+def _paid(member, admin, start, end):
+    db.session.add(MembershipPayment(member_id=member.id, amount=1000, payment_date=start, start_date=start,
+                                     end_date=end, recorded_by=admin.id))
+
+
+def test_gallery_filters_by_status_and_serves_thumbnails(app, client, login, make_user, make_member, tmp_path,
+                                                          monkeypatch):
+    monkeypatch.setitem(app.config, 'UPLOAD_FOLDER', str(tmp_path))
+    cards = tmp_path / 'digital_ids'
+    cards.mkdir()
+    today = date.today()
+    with app.app_context():
+        admin = make_user('gallery-admin@example.com', role='admin')
+        valid = make_member('gallery-valid@example.com', 'Gallery Valid', digital_id_path='GV1_front.png')
+        expired = make_member('gallery-expired@example.com', 'Gallery Expired', digital_id_path='GE1_front.png')
+        # Cards generated before the _front/_back naming
+        make_member('gallery-none@example.com', 'Gallery Unpaid', digital_id_path='GN1.png')
+        _paid(valid, admin, today - timedelta(days=30), today + timedelta(days=30))
+        _paid(expired, admin, today - timedelta(days=400), today - timedelta(days=35))
+        db.session.commit()
+        admin_id = admin.id
+    for filename in ('GV1_front.png', 'GV1_back.png', 'GE1_front.png', 'GN1.png', 'GN1_back.png'):
+        _card(cards, filename)
+    login(admin_id)
+
+    def names(status):
+        html = client.get(f'/admin/member-ids?search=Gallery&status={status}').get_data(as_text=True)
+        return [name for name in ('Gallery Valid', 'Gallery Expired', 'Gallery Unpaid') if name in html]
+
+    assert names('valid') == ['Gallery Valid']
+    assert names('expired') == ['Gallery Expired']
+    assert names('none') == ['Gallery Unpaid']
+    html = client.get('/admin/member-ids?search=Gallery+Unpaid').get_data(as_text=True)
+    assert '/admin/member-ids/thumbnail/GN1_back.png' in html
+
+    response = client.get('/admin/member-ids/thumbnail/GV1_back.png')
+    assert response.status_code == 200 and response.mimetype == 'image/jpeg'
+    assert 'private' in response.headers['Cache-Control'] and 'immutable' in response.headers['Cache-Control']
+    with Image.open(cards / 'thumbs' / 'GV1_back.jpg') as thumbnail:
+        assert thumbnail.width == 360
+    assert client.get('/admin/member-ids/thumbnail/GE1_back.png').status_code == 404
@@ -0,0 +1,44 @@
+"""
+Member index for QR scans: dictionary hits, DB fallback and cross-worker updates via the change log
+"""
+
+from app import db
+from app.member_index import MemberIndex, member_index
+from app.models import RewardTransaction, User
+
+
+def test_scans_hit_the_index_and_follow_writes_in_any_worker(app, query_budget, make_member):
+    with app.app_context():
+        member = make_member('index-amina@example.com', 'Amina Index', member_id_number='DC-2031-0001')
+        db.session.add(RewardTransaction(member_id=member.id, points=20, transaction_type='manual',
+                                         reason='Index test', admin_id=member.user_id))
+        db.session.commit()
+
+        # A second worker reading the same change log
+        other_worker = MemberIndex()
+        other_worker.init_app(app)
+        other_worker.build()
+        member_index.build()
+
+        with query_budget(0):
+            summary = other_worker.lookup('DC-2031-0001')
+        assert summary.full_name == 'Amina Index'
+        assert summary.to_dict()['total_points'] == 20
+        assert summary.to_dict()['membership_status'] == 'none'
+
+        db.session.add(RewardTransaction(member_id=member.id, points=5, transaction_type='manual',
+                                         reason='Index test', admin_id=member.user_id))
+        db.session.commit()
+        assert other_worker.lookup('DC-2031-0001').total_points == 25
+
+        user = User.query.filter_by(email='index-amina@example.com').one()
+        user.email = 'index-amina-renamed@example.com'
+        db.session.commit()
+        assert other_worker.lookup('DC-2031-0001').email == 'index-amina-renamed@example.com'
+
+        # Members added after the build are found through the database fallback
+        make_member('index-late@example.com', 'Late Joiner', member_id_number='DC-2031-0002')
+        db.session.commit()
+        assert other_worker.lookup('DC-2031-0002').full_name == 'Late Joiner'
+        assert other_worker.lookup('DC-2031-9999') is None
+        assert other_worker.stats()['hits'] >= 1 and other_worker.stats()['misses'] >= 3
@@ -0,0 +1,36 @@
+"""
+Member search: FTS5 index kept in sync by triggers, substring filters and typo-tolerant ranking
+"""
+
+from app import db
+from app.models import Member, User
+from app.search import filter_members, member_backend, search_members
+
+
+def _approved():
+    return Member.query.join(User).filter(User.is_approved == True)
+
+
+def test_member_search_uses_the_index_and_follows_writes(app, make_member):
+    with app.app_context():
+        assert member_backend() == 'fts5'
+        make_member('search-wanjiru@example.com', 'Wanjiru Kamau', course='Computer Science')
+        make_member('search-other@example.com', 'Baraka Otieno', course='Search Engineering Studies')
+        db.session.commit()
+
+        assert [m.full_name for m in filter_members(_approved(), 'njiru KAM')] == ['Wanjiru Kamau']
+        assert [m.full_name for m in search_members(_approved(), 'Wanj', 5)][:1] == ['Wanjiru Kamau']
+        # Transposed letters still find her
+        assert 'Wanjiru Kamau' in [m.full_name for m in search_members(_approved(), 'Wanjrui', 5)]
+        # The list filters do not search course; the live search does
+        assert not filter_members(_approved(), 'Engineering Stud').count()
+        assert [m.full_name for m in search_members(_approved(), 'Engineering Stud', 5)] == ['Baraka Otieno']
+
+        user = User.query.filter_by(email='search-other@example.com').one()
+        user.email = 'search-renamed@example.com'
+        db.session.commit()
+        assert [m.full_name for m in filter_members(_approved(), 'search-renamed')] == ['Baraka Otieno']
+
+        db.session.delete(user.member)
+        db.session.commit()
+        assert not filter_members(_approved(), 'search-renamed').count()
@@ -0,0 +1,37 @@
+"""
+Operational routes: /healthz readiness and /metrics access control
+"""
+
+import pytest
+
+from app import metrics
+
+
+def test_healthz_reports_database_reachable(client):
+    response = client.get('/healthz')
+    assert response.status_code == 200 and response.json == {'status': 'ok'}
+
+
+def test_metrics_are_closed_without_token_or_allowlist(client, monkeypatch):
+    monkeypatch.delenv('METRICS_TOKEN', raising=False)
+    monkeypatch.delenv('METRICS_ALLOWED_NETWORKS', raising=False)
+    # Loopback and private addresses are what every client looks like behind a proxy
+    for address in ('127.0.0.1', '10.0.0.7', '172.18.0.2'):
+        assert client.get('/metrics', environ_base={'REMOTE_ADDR': address}).status_code == 404
+
+
+def test_metrics_accept_the_token_or_an_allowed_network(client, monkeypatch):
+    ok = 503 if not metrics.enabled() else 200
+    monkeypatch.setenv('METRICS_TOKEN', 'scrape-secret')
+    monkeypatch.setenv('METRICS_ALLOWED_NETWORKS', '10.1.0.0/16, not-a-network')
+    assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 404
+    assert client.get('/metrics', headers={'Authorization': 'Bearer scrape-secret'}).status_code == ok
+    assert client.get('/metrics', environ_base={'REMOTE_ADDR': '10.1.4.2'}).status_code == ok
+    assert client.get('/metrics', environ_base={'REMOTE_ADDR': '10.2.4.2'}).status_code == 404
+
+
+def test_metrics_expose_the_connection_pool_gauge(client, monkeypatch):
+    pytest.importorskip('prometheus_client')
+    monkeypatch.setenv('METRICS_TOKEN', 'scrape-secret')
+    body = client.get('/metrics', headers={'Authorization': 'Bearer scrape-secret'}).get_data(as_text=True)
+    assert 'db_pool_connections{state="checked_out"}' in body
@@ -0,0 +1,61 @@
+"""
+Anonymous full-page cache: hits, conditional requests and invalidation on commit
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+
+from app import db
+from app.models import Event
+
+
+@pytest.fixture
+def page_cache(app):
+    app.config['PAGE_CACHE'] = True
+    yield
+    app.config['PAGE_CACHE'] = False
+
+
+def test_anonymous_pages_are_cached_and_revalidated(app, client, page_cache, query_budget):
+    first = client.get('/events?category=workshop')
+    assert first.status_code == 200
+    assert first.headers['X-Page-Cache'] == 'miss'
+    assert first.headers['ETag']
+
+    with query_budget(0):
+        second = client.get('/events?category=workshop')
+    assert second.headers['X-Page-Cache'] == 'hit'
+    assert second.get_data() == first.get_data()
+
+    not_modified = client.get('/events?category=workshop', headers={'If-None-Match': first.headers['ETag']})
+    assert not_modified.status_code == 304
+
+
+def test_commit_to_a_dependency_invalidates_the_page(app, client, page_cache):
+    client.get('/events?category=hackathon')
+    assert client.get('/events?category=hackathon').headers['X-Page-Cache'] == 'hit'
+
+    with app.app_context():
+        db.session.add(Event(title='Cache-busting hackathon', category='hackathon',
+                             event_date=datetime.now() + timedelta(days=3)))
+        db.session.commit()
+
+    response = client.get('/events?category=hackathon')
+    assert response.headers['X-Page-Cache'] == 'miss'
+    assert b'Cache-busting hackathon' in response.get_data()
+
+
+def test_fallback_pages_after_a_database_error_are_not_cached(app, client, page_cache):
+    with app.app_context(), db.engine.begin() as conn:
+        conn.execute(text('ALTER TABLE topic RENAME TO topic_offline'))
+    try:
+        degraded = client.get('/topics')
+    finally:
+        with app.app_context(), db.engine.begin() as conn:
+            conn.execute(text('ALTER TABLE topic_offline RENAME TO topic'))
+    # The view falls back to an empty list, which must not be served for the next PAGE_CACHE_TTL
+    assert degraded.status_code == 200 and 'no-store' in degraded.headers['Cache-Control']
+    assert 'X-Page-Cache' not in degraded.headers
+    assert client.get('/topics').headers['X-Page-Cache'] == 'miss'
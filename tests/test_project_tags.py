@@ -0,0 +1,90 @@
+"""
+Project technology tags: links follow project and technology writes; category filters use them
+"""
+
+from app import db
+from app.models import Project, Technology
+from app.page_cache import get_store
+from app.project_tags import category_counts
+
+
+def _titles(client, category):
+    return client.get(f'/projects?category={category}').get_data(as_text=True)
+
+
+def test_category_filter_uses_exact_technology_tags(app, client):
+    with app.app_context():
+        db.session.add_all([
+            Technology(name='Tags Flask', category='web'),
+            Technology(name='Tags R', category='data'),
+        ])
+        db.session.commit()
+        before = category_counts()
+        db.session.add_all([
+            Project(title='Tagged web app', description='Web', technologies='tags flask, Postgres', is_public=True),
+            # Substring matching used to file this under data ('r' in 'Tags Rust')
+            Project(title='Tagged rust tool', description='CLI', technologies='Tags Rust', is_public=True),
+        ])
+        db.session.commit()
+        assert category_counts()['web'] == before.get('web', 0) + 1
+        assert category_counts().get('data', 0) == before.get('data', 0)
+
+    web = _titles(client, 'web')
+    assert 'Tagged web app' in web and 'Tagged rust tool' not in web
+    assert 'Tagged rust tool' not in _titles(client, 'data')
+
+    # Adding or renaming a technology relinks the projects that name it
+    with app.app_context():
+        db.session.add(Technology(name='tags rust', category='iot'))
+        db.session.commit()
+    assert 'Tagged rust tool' in _titles(client, 'iot')
+
+    with app.app_context():
+        technology = Technology.query.filter_by(name='tags rust').one()
+        technology.name = 'Tags Go'
+        db.session.commit()
+        project = Project.query.filter_by(title='Tagged rust tool').one()
+        assert project.technology_tags == []
+
+
+def test_deleting_a_member_account_removes_its_project_tags(app, make_member):
+    from app.models import project_technology
+    from app.routes.admin import _delete_member_account_data
+
+    with app.app_context():
+        member = make_member('tags-owner@example.com', 'Tags Owner')
+        user = member.user
+        db.session.add(Technology(name='Tags Owner Kit', category='web'))
+        project = Project(title='Owned project', description='Owned', technologies='Tags Owner Kit', member_id=member.id)
+        db.session.add(project)
+        db.session.commit()
+        project_id = project.id
+        assert db.session.query(project_technology).filter_by(project_id=project_id).count() == 1
+
+        _delete_member_account_data(user)
+        db.session.commit()
+        assert db.session.get(Project, project_id) is None
+        assert db.session.query(project_technology).filter_by(project_id=project_id).count() == 0
+
+
+def test_categories_without_technologies_use_the_fallback_lists(app, client):
+    with app.app_context():
+        db.session.add(Project(title='Fallback mobile app', description='App', technologies='Flutter, Firebase',
+                               is_public=True))
+        db.session.commit()
+        assert category_counts()['mobile'] >= 1
+        assert Technology.query.filter_by(category='mobile').count() == 0
+    assert 'Fallback mobile app' in _titles(client, 'mobile')
+    assert 'Fallback mobile app' not in _titles(client, 'iot')
+
+
+def test_category_counts_follow_project_commits_in_other_workers(app):
+    with app.app_context():
+        total = category_counts()['all']
+        # Another worker adds a project: the row lands and its commit bumps the shared Project version
+        db.session.execute(Project.__table__.insert().values(title='Other worker project', description='Elsewhere',
+                                                             is_public=True))
+        db.session.commit()
+        assert category_counts()['all'] == total  # still this worker's cached counts
+        get_store().bump('Project')
+        assert category_counts()['all'] == total + 1
@@ -0,0 +1,50 @@
+"""
+Query budgets for public pages, using the per-request SQL instrumentation
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import db
+from app.instrumentation import statement_shape
+from app.models import Blog, Event, User
+
+
+@pytest.fixture(scope='module')
+def content(app):
+    with app.app_context():
+        for i in range(6):
+            author = User(email=f'budget-author{i}@example.com', role='member', is_approved=True)
+            author.set_password('secret')
+            db.session.add(author)
+            db.session.flush()
+            db.session.add(Blog(
+                title=f'Budget post {i}', slug=f'budget-post-{i}', content='Body',
+                author_id=author.id, is_published=True, published_date=datetime.now(),
+            ))
+            db.session.add(Event(title=f'Budget event {i}', event_date=datetime.now() + timedelta(days=i + 1)))
+        db.session.commit()
+
+
+def test_statement_shape_ignores_parameters():
+    first = statement_shape("SELECT * FROM member WHERE id IN (?, ?, ?) AND name = 'a'")
+    second = statement_shape("SELECT *  FROM member WHERE id IN (?) AND name = 'bob'")
+    assert first == second
+
+
+def test_blogs_loads_authors_with_the_page(client, content, query_budget):
+    with query_budget(4, allow_repeats=1):
+        response = client.get('/blogs')
+    assert response.status_code == 200
+
+
+def test_events_within_budget(client, content, query_budget):
+    with query_budget(6):
+        response = client.get('/events')
+    assert response.status_code == 200
+
+
+def test_server_timing_header(client, content):
+    response = client.get('/blogs')
+    assert 'db;dur=' in response.headers['Server-Timing']
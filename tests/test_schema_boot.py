@@ -0,0 +1,61 @@
+"""
+Boot schema reconciliation: steps commit independently, the fingerprint skips later boots, the lock serialises workers
+"""
+
+import fcntl
+
+import pytest
+from sqlalchemy import text
+
+from app import db, schema_boot
+
+
+def _probe(name):
+    def step(conn, inspector):
+        conn.execute(text('CREATE TABLE IF NOT EXISTS boot_probe (step VARCHAR(40))'))
+        conn.execute(text('INSERT INTO boot_probe (step) VALUES (:step)'), {'step': name})
+    step.__name__ = name
+    return step
+
+
+def _failing(conn, inspector):
+    raise RuntimeError('broken step')
+
+
+def _probe_rows(app):
+    with app.app_context(), db.engine.connect() as conn:
+        return [row[0] for row in conn.execute(text('SELECT step FROM boot_probe ORDER BY rowid'))]
+
+
+@pytest.fixture
+def fresh_boot(monkeypatch):
+    # As if each call were a new worker process
+    monkeypatch.setattr(schema_boot, '_reconciled', set())
+    return lambda steps: monkeypatch.setattr(schema_boot, 'RECONCILE_STEPS', steps)
+
+
+def test_failed_step_does_not_undo_the_others_and_is_retried(app, fresh_boot):
+    fresh_boot([_failing, _probe('probe_after_failure')])
+    assert schema_boot.reconcile_schema(app) == 'failed'
+    assert _probe_rows(app) == ['probe_after_failure']
+
+    fresh_boot([_probe('probe_first'), _probe('probe_second')])
+    assert schema_boot.reconcile_schema(app) == 'applied'
+    schema_boot._reconciled.clear()
+    # Fingerprint recorded: the next worker runs no step
+    assert schema_boot.reconcile_schema(app) == 'skipped'
+    assert _probe_rows(app) == ['probe_after_failure', 'probe_first', 'probe_second']
+    with app.app_context(), db.engine.begin() as conn:
+        conn.execute(text('DROP TABLE boot_probe'))
+
+
+def test_boot_lock_is_exclusive_across_processes(app):
+    with app.app_context():
+        engine = db.engine
+        with schema_boot._boot_lock(engine):
+            with open(f'{engine.url.database}.boot.lock', 'a') as other_worker:
+                with pytest.raises(BlockingIOError):
+                    fcntl.flock(other_worker, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        with open(f'{engine.url.database}.boot.lock', 'a') as other_worker:
+            fcntl.flock(other_worker, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            fcntl.flock(other_worker, fcntl.LOCK_UN)